@@ -1,15 +1,17 @@
 # chatbot_api.py (Auto-detect Gemini models + hybrid RAG)
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import os, time, traceback
+import os, time, json, traceback
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import Client
+from scripts.supabase_client import create_db_client
+from scripts.warmup import registry, warm_embedding_model
 load_dotenv()
 
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase: Client = create_db_client(SUPABASE_URL, SUPABASE_KEY)
 
 
 
@@ -149,18 +151,44 @@ def login_user():
 
 
 
-# --- Load RAG ---
-answer_query = None
+# --- Answer cache (exact + near-duplicate queries, cleared when the KB artifact changes) ---
+answer_cache = None
 try:
-    # Try to import with error handling
-    from scripts.query import answer_query
-    print("✅ RAG system loaded successfully.")
+    from scripts.cache import ANSWER_CACHE_ENABLED, AnswerCache
+    from scripts.embedding_service import get_embedding_service
+    from scripts.artifacts import KB_ARTIFACT, artifact_fingerprint
+    if ANSWER_CACHE_ENABLED:
+        answer_cache = AnswerCache(get_embedding_service(), fingerprint=lambda: artifact_fingerprint(KB_ARTIFACT))
+        print("✅ Answer cache enabled.")
 except Exception as e:
-    print(f"⚠️ Could not import RAG system: {e}")
-    # Create a fallback function
-    def answer_query_fallback(query):
-        return f"RAG system temporarily unavailable. Original query: {query}"
-    answer_query = answer_query_fallback
+    print(f"⚠️ Answer cache unavailable: {e}")
+
+
+# --- Load RAG (in the background; see init_rag) ---
+answer_query = None
+rag_retrieve = None
+rag_resolve_answer = None
+rag_stream_answer = None
+
+def init_rag():
+    global answer_query, rag_retrieve, rag_resolve_answer, rag_stream_answer
+    try:
+        # Try to import with error handling
+        from scripts.query import answer_query as _answer_query
+        from scripts.query import retrieve, resolve_answer, stream_answer
+        answer_query = _answer_query
+        rag_retrieve, rag_resolve_answer, rag_stream_answer = retrieve, resolve_answer, stream_answer
+        print("✅ RAG system loaded successfully.")
+    except Exception as e:
+        print(f"⚠️ Could not import RAG system: {e}")
+        # Create a fallback function
+        def answer_query_fallback(query):
+            return f"RAG system temporarily unavailable. Original query: {query}"
+        answer_query = answer_query_fallback
+        raise
+
+registry.register("embedding_model", warm_embedding_model)
+registry.register("rag", init_rag)
 
     
 # --- Configure Gemini ---
@@ -200,12 +228,13 @@ def is_rag_answer_valid(txt: str):
     return not any(b in s for b in bad)
 
 
-# --- Gemini call ---
-def call_gemini_for_legal_check_and_answer(user_query: str):
-    if not gemini_available:
-        return None
+NOT_A_LEGAL_TOKEN = "NOT_A_LEGAL_QUERY"
+NOT_A_LEGAL_RESPONSE = "⚖️ Please ask a legal question (IPC, procedure, FIR, bail, etc.)."
+
 
-    prompt = f"""
+# --- Gemini call ---
+def legal_check_prompt(user_query: str):
+    return f"""
 You are a legal AI assistant for Indian police and legal professionals.
 1️⃣ If the user's question is related to **law, legal procedure, IPC sections, evidence, FIR, bail, or court process**, 
 then answer factually and concisely, referencing relevant IPC sections or legal procedures.
@@ -214,6 +243,13 @@ reply EXACTLY with this token: NOT_A_LEGAL_QUERY
 User question: "{user_query}"
     """.strip()
 
+
+def call_gemini_for_legal_check_and_answer(user_query: str):
+    if not gemini_available:
+        return None
+
+    prompt = legal_check_prompt(user_query)
+
     try:
         model = genai.GenerativeModel(detected_model)
         resp = model.generate_content([{"role": "user", "parts": [prompt]}])
@@ -233,8 +269,27 @@ User question: "{user_query}"
         return None
 
 
+def stream_gemini_for_legal_check_and_answer(user_query: str):
+    """Streaming variant of call_gemini_for_legal_check_and_answer(); yields text chunks."""
+    model = genai.GenerativeModel(detected_model)
+    for chunk in model.generate_content([{"role": "user", "parts": [legal_check_prompt(user_query)]}], stream=True):
+        text = getattr(chunk, "text", None)
+        if text:
+            yield text
+
+
+def cache_answer(msg, response, source, query_vector=None):
+    if not answer_cache:
+        return
+    try:
+        answer_cache.store(msg, response, source, query_vector)
+    except Exception as e:
+        print("⚠️ Answer cache store error:", e)
+
+
 # --- API endpoint ---
 @app.route("/api/chat", methods=["POST"])
+@registry.requires("embedding_model", "rag")
 def chat():
     try:
         data = request.get_json(force=True, silent=True) or {}
@@ -244,32 +299,49 @@ def chat():
 
         print(f"📨 Query: {msg}")
 
-        # Step 1: RAG
-        rag_ans = None
-        if answer_query:
+        # Step 0: Cache
+        query_vector = None
+        if answer_cache:
             try:
-                t0 = time.time()
-                rag_ans = answer_query(msg)
-                print(f"⏱ RAG took {time.time()-t0:.2f}s")
+                cached, query_vector = answer_cache.lookup(msg)
+                if cached:
+                    return jsonify({"success": True, "response": cached["response"], "source": "cache"})
             except Exception as e:
-                print("❌ RAG error:", e)
+                print("⚠️ Answer cache error:", e)
 
-        if is_rag_answer_valid(rag_ans):
-            return jsonify({"success": True, "response": rag_ans, "source": "rag"})
+        # Step 1: Retrieval (no LLM call) decides which single prompt is sent
+        retrieval = None
+        if rag_retrieve:
+            try:
+                retrieval = rag_retrieve(msg)
+            except Exception as e:
+                print("❌ RAG retrieval error:", e)
 
-        # Step 2: Gemini
-        gem_ans = call_gemini_for_legal_check_and_answer(msg)
-        if not gem_ans:
+        # Step 2: One Gemini round trip (KB-grounded or general)
+        answer, source = None, "gemini"
+        if retrieval:
+            try:
+                t0 = time.time()
+                answer, grounded = rag_resolve_answer(msg, retrieval, accept=is_rag_answer_valid)
+                source = "rag" if grounded else "gemini"
+                print(f"⏱ RAG ({retrieval['mode']}) took {time.time()-t0:.2f}s")
+            except Exception as e:
+                print("❌ RAG error:", e)
+        if not answer:
+            answer, source = call_gemini_for_legal_check_and_answer(msg), "gemini"
+        if not answer:
             return jsonify({"success": False, "response": "⚠️ Gemini failed to respond"}), 500
 
-        if "NOT_A_LEGAL_QUERY" in gem_ans:
+        if NOT_A_LEGAL_TOKEN in answer:
             return jsonify({
                 "success": True,
-                "response": "⚖️ Please ask a legal question (IPC, procedure, FIR, bail, etc.).",
+                "response": NOT_A_LEGAL_RESPONSE,
                 "source": "gemini_filter"
             })
 
-        return jsonify({"success": True, "response": gem_ans, "source": "gemini"})
+        answer = answer.strip()
+        cache_answer(msg, answer, source, query_vector)
+        return jsonify({"success": True, "response": answer, "source": source})
 
     except Exception as e:
         print("💥 Chat error:", e)
@@ -277,17 +349,118 @@ def chat():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def chat_stream_events(msg):
+    """SSE events for one chat message: meta first, then token chunks, then done."""
+    try:
+        # Step 0: Cache
+        query_vector = None
+        if answer_cache:
+            try:
+                cached, query_vector = answer_cache.lookup(msg)
+                if cached:
+                    yield sse_event("meta", {"source": "cache"})
+                    yield sse_event("token", {"text": cached["response"]})
+                    yield sse_event("done", {"success": True, "source": "cache"})
+                    return
+            except Exception as e:
+                print("⚠️ Answer cache error:", e)
+
+        # Step 1: Retrieval (metadata goes out before the model starts generating)
+        retrieval = None
+        if rag_retrieve:
+            try:
+                retrieval = rag_retrieve(msg)
+            except Exception as e:
+                print("❌ RAG retrieval error:", e)
+
+        # Step 2: One streamed Gemini round trip (KB-grounded or general)
+        if retrieval:
+            source = "gemini" if retrieval["mode"] == "fallback" else "rag"
+            yield sse_event("meta", {
+                "source": source,
+                "mode": retrieval["mode"],
+                "best_score": retrieval["best_score"],
+                "matches": retrieval["matches"],
+            })
+            chunks = rag_stream_answer(msg, retrieval)
+        elif gemini_available:
+            source = "gemini"
+            yield sse_event("meta", {"source": source})
+            chunks = stream_gemini_for_legal_check_and_answer(msg)
+        else:
+            yield sse_event("error", {"success": False, "response": "⚠️ Gemini failed to respond"})
+            return
+
+        buffered, parts, released = "", [], False
+        for text in chunks:
+            parts.append(text)
+            if released:
+                yield sse_event("token", {"text": text})
+                continue
+            # Hold output until it cannot be the NOT_A_LEGAL_QUERY token
+            buffered += text
+            if NOT_A_LEGAL_TOKEN in buffered:
+                break
+            if len(buffered.strip()) >= len(NOT_A_LEGAL_TOKEN) or not NOT_A_LEGAL_TOKEN.startswith(buffered.strip()):
+                released = True
+                yield sse_event("token", {"text": buffered})
+
+        answer = "".join(parts).strip()
+        if NOT_A_LEGAL_TOKEN in answer:
+            if released:
+                yield sse_event("reset", {"reason": "not_a_legal_query"})
+            yield sse_event("token", {"text": NOT_A_LEGAL_RESPONSE})
+            yield sse_event("done", {"success": True, "source": "gemini_filter"})
+            return
+        if not answer:
+            yield sse_event("error", {"success": False, "response": "⚠️ Gemini failed to respond"})
+            return
+        if not released:
+            yield sse_event("token", {"text": buffered})
+
+        cache_answer(msg, answer, source, query_vector)
+        yield sse_event("done", {"success": True, "source": source})
+
+    except Exception as e:
+        print("💥 Chat stream error:", e)
+        traceback.print_exc()
+        yield sse_event("error", {"success": False, "error": str(e)})
+
+
+@app.route("/api/chat/stream", methods=["POST"])
+@registry.requires("embedding_model", "rag")
+def chat_stream():
+    """Server-sent-events variant of /api/chat for progressive rendering."""
+    data = request.get_json(force=True, silent=True) or {}
+    msg = (data.get("message") or "").strip()
+    if not msg:
+        return jsonify({"success": False, "error": "Empty message"}), 400
+
+    print(f"📨 Stream query: {msg}")
+    return Response(
+        chat_stream_events(msg),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/health", methods=["GET"])
 def health():
     return jsonify({
         "status": "ok",
-        "rag_loaded": bool(answer_query),
+        "rag_loaded": bool(rag_retrieve),
         "gemini_configured": gemini_available,
-        "model": detected_model
+        "model": detected_model,
+        "answer_cache": answer_cache.stats() if answer_cache else None
     })
 
 
 if __name__ == "__main__":
     print("🚀 Starting Legal Chatbot API (Hybrid RAG + Gemini with Auto-detect)...")
+    registry.start()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
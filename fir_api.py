@@ -1,12 +1,23 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from scripts.fir_rag import FIRRAGModel
-from scripts.pdf_generator import generate_fir_pdf
-from scripts.supabase_client import SupabaseFIRClient
+from scripts.pdf_generator import PDF_RENDER_PROCESSES, PDFRenderPool, generate_fir_pdf, fir_pdf_path
+from scripts.supabase_client import SupabaseFIRClient, keyset_page
 from scripts.case_analyzer import CaseAnalyzer
 from scripts.criminal_matcher import CriminalMatcher
+from scripts.warmup import registry, warm_embedding_model
+from scripts.fir_numbers import create_allocator
+from scripts.pdf_jobs import PDFJobQueue
+from scripts.pdf_index import DRAFTS_DIR, get_pdf_index
+from scripts.export import EXPORT_FORMATS, export_lines
+from scripts.aggregations import group_counts, top_buckets
+from scripts.rollups import rollup_counts, rollup_total
+from scripts.projections import FIR_PROJECTIONS, resolve_fields, select_list
+from scripts.fanout import FANOUT_TIMEOUT, FanOut
+from scripts.cache import FIR_CACHE_ENABLED, FIRRecordCache
 
 import logging
 import json
@@ -18,16 +29,23 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-# Initialize FIR RAG model
-try:
-    fir_model = FIRRAGModel("data/section.csv")
-    if not fir_model.load_embeddings():
-        logger.info("Training new FIR embeddings...")
-        fir_model.train_embeddings()
-    logger.info("✅ FIR RAG model loaded successfully!")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize FIR RAG model: {e}")
-    fir_model = None
+# FIR RAG model and criminal matcher load in the background (see init_components)
+fir_model = None
+criminal_matcher = None
+
+def init_fir_model():
+    global fir_model
+    try:
+        model = FIRRAGModel("data/section.csv")
+        if not model.load_embeddings():
+            logger.info("Training new FIR embeddings...")
+            model.train_embeddings()
+        fir_model = model
+        logger.info("✅ FIR RAG model loaded successfully!")
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize FIR RAG model: {e}")
+        fir_model = None
+        raise
 
 # Initialize Supabase client
 try:
@@ -37,6 +55,28 @@ except Exception as e:
     logger.error(f"❌ Failed to initialize Supabase client: {e}")
     supabase_client = None
 
+# FIR numbers come from per-station, per-month counters (FIR_SEQUENCE_BACKEND=supabase|local; local is single-node only)
+try:
+    fir_number_allocator = create_allocator(supabase_client.supabase if supabase_client else None)
+    logger.info("✅ FIR number allocator initialized successfully!")
+except Exception as e:
+    logger.error(f"❌ FIR number allocator failed: {e}")
+    fir_number_allocator = None
+
+# Background PDF rendering for generate-pdf in async mode
+PDF_ASYNC_DEFAULT = os.getenv("FIR_PDF_ASYNC", "0") == "1"
+PDF_JOB_STREAM_TIMEOUT = float(os.getenv("PDF_JOB_STREAM_TIMEOUT", 120))
+PDF_CACHE_MAX_AGE = int(os.getenv("FIR_PDF_CACHE_MAX_AGE", 365 * 24 * 3600))
+pdf_jobs = PDFJobQueue()
+# PDF_RENDER_PROCESSES > 0 moves job rendering into worker processes (ReportLab holds the GIL)
+pdf_render_pool = PDFRenderPool(PDF_RENDER_PROCESSES) if PDF_RENDER_PROCESSES > 0 else None
+
+# Bounded pool for the dashboard's independent Supabase queries
+dashboard_fanout = FanOut()
+
+# Read-through cache for FIR records and case timelines; the write routes invalidate entries
+fir_cache = FIRRecordCache() if FIR_CACHE_ENABLED else None
+
 try:
     case_analyzer = CaseAnalyzer(supabase_client.supabase if supabase_client else None)
     logger.info("✅ Case analyzer initialized successfully!")
@@ -44,6 +84,29 @@ except Exception as e:
     logger.error(f"❌ Case analyzer failed: {e}")
     case_analyzer = None
 
+def init_criminal_matcher():
+    global criminal_matcher
+    try:
+        # ✅ Pass the REAL Supabase client inside your wrapper
+        matcher = CriminalMatcher(supabase_client.supabase)
+        # Re-encode only FIRs that are new or changed since the index was last saved
+        matcher.refresh_index()
+        criminal_matcher = matcher
+        # FIRs stored during that pass skipped index_fir() (no matcher yet); catch them up
+        matcher.refresh_index(prune=False)
+        logger.info("✅ Criminal matcher initialized successfully with Supabase (raw client)!")
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize CriminalMatcher: {e}")
+        criminal_matcher = None
+        raise
+
+def init_components():
+    """Register slow startup work; call registry.start() (or warm_all()) to load it."""
+    registry.register("embedding_model", warm_embedding_model)
+    registry.register("fir_model", init_fir_model)
+    registry.register("criminal_matcher", init_criminal_matcher)
+
+init_components()
 
 
 
@@ -68,6 +131,52 @@ def safe_parse_datetime(dt_str, as_date=False):
 
 # === CASE MANAGEMENT ENDPOINTS ===
 
+def request_columns(default, required=(), fields=None):
+    """fir_records columns picked by ?fields= (a projection name or column list); raises ValueError"""
+    if fields is None:
+        fields = request.args.get('fields')
+    return resolve_fields(fields, default, required)
+
+def fields_error(e):
+    return jsonify({'success': False, 'error': str(e)}), 400
+
+def load_fir_record(fir_number, columns=None):
+    """get_fir_by_number through fir_cache (the full row is cached, then projected to columns)"""
+    if fir_cache is None:
+        return supabase_client.get_fir_by_number(fir_number, columns)
+
+    failure = {}
+    def load():
+        result = supabase_client.get_fir_by_number(fir_number)
+        if result.get('success'):
+            return result['data']
+        failure.update(result)
+        return None
+
+    record = fir_cache.record(fir_number, load)
+    if record is None:
+        return {'success': False, 'error': failure.get('error', 'FIR not found')}
+    if columns is not None:
+        record = {k: record[k] for k in columns if k in record}
+    return {'success': True, 'data': record}
+
+def load_case_activities(fir_number):
+    """case_activities timeline (newest first) through fir_cache"""
+    def load():
+        act_resp = (
+            supabase_client.supabase.table('case_activities')
+            .select('*')
+            .eq('fir_number', fir_number)
+            .order('activity_date', desc=True)
+            .execute()
+        )
+        return act_resp.data if act_resp and act_resp.data else []
+    return fir_cache.timeline(fir_number, load) if fir_cache else load()
+
+def invalidate_fir(fir_number):
+    if fir_cache:
+        fir_cache.invalidate(fir_number)
+
 # === CASE MANAGEMENT ENDPOINTS ===
 
 @app.route('/api/police/cases/pending', methods=['GET'])
@@ -86,45 +195,56 @@ def get_pending_cases():
         except Exception:
             months = 6
 
-        cutoff_date = (datetime.now(timezone.utc) - timedelta(days=30 * months)).strftime('%Y-%m-%d')
-
-        # Only include active statuses (simple rule)
-        active_statuses = ['under_investigation', 'registered', 'charges_filed', 'court_proceeding']
+        try:
+            columns = request_columns('pending')
+        except ValueError as e:
+            return fields_error(e)
 
-        response = (
-            supabase_client.supabase.table("fir_records")
-            .select("*")
-            .in_('status', active_statuses)
-            .gte('incident_date', cutoff_date)
-            .order('incident_date', desc=True)
-            .execute()
-        )
+        return jsonify(pending_cases_payload(months, columns))
 
-        pending_cases = []
-        for case in (response.data or []):
-            # Normalize dates (keep existing behavior)
-            incident_dt = safe_parse_datetime(case.get('incident_date'), as_date=True)
-            created_at_dt = safe_parse_datetime(case.get('created_at'), as_date=False)
+    except Exception as e:
+        logger.error(f"💥 Pending cases error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
+def pending_cases_payload(months=6, columns=FIR_PROJECTIONS['pending']):
+    """Response body of /api/police/cases/pending"""
+    cutoff_date = (datetime.now(timezone.utc) - timedelta(days=30 * months)).strftime('%Y-%m-%d')
+
+    # Only include active statuses (simple rule)
+    active_statuses = ['under_investigation', 'registered', 'charges_filed', 'court_proceeding']
+
+    response = (
+        supabase_client.supabase.table("fir_records")
+        .select(select_list(columns))
+        .in_('status', active_statuses)
+        .gte('incident_date', cutoff_date)
+        .order('incident_date', desc=True)
+        .execute()
+    )
+
+    pending_cases = []
+    for case in (response.data or []):
+        # Normalize dates (keep existing behavior)
+        incident_dt = safe_parse_datetime(case.get('incident_date'), as_date=True)
+        created_at_dt = safe_parse_datetime(case.get('created_at'), as_date=False)
+
+        if 'incident_date' in case:
             case['incident_date'] = incident_dt.isoformat() if incident_dt else None
+        if 'created_at' in case:
             case['created_at'] = created_at_dt.isoformat() if created_at_dt else None
 
-            # keep days_pending for frontend info (if created_at exists)
-            days_pending = (datetime.now(timezone.utc) - created_at_dt).days if created_at_dt else None
+        # keep days_pending for frontend info (if created_at exists)
+        days_pending = (datetime.now(timezone.utc) - created_at_dt).days if created_at_dt else None
 
-            # DO NOT call case_analyzer or filter by needs_attention here.
-            pending_cases.append({
-                **case,
-                # keep an empty analysis object so frontend that expects it won't break
-                'analysis': {},
-                'days_pending': days_pending
-            })
-
-        return jsonify({'success': True, 'count': len(pending_cases), 'cases': pending_cases})
+        # DO NOT call case_analyzer or filter by needs_attention here.
+        pending_cases.append({
+            **case,
+            # keep an empty analysis object so frontend that expects it won't break
+            'analysis': {},
+            'days_pending': days_pending
+        })
 
-    except Exception as e:
-        logger.error(f"💥 Pending cases error: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+    return {'success': True, 'count': len(pending_cases), 'cases': pending_cases}
 
 
 
@@ -137,32 +257,36 @@ def get_case_updates():
         if not supabase_client:
             return jsonify({'success': False, 'error': 'Database not available'}), 500
 
-        seven_days_ago = (datetime.now(timezone.utc) - timedelta(days=7)).strftime('%Y-%m-%d')
-        response = (
-            supabase_client.supabase.table("fir_records")
-            .select("*")
-            .gte('updated_at', seven_days_ago)
-            .order('updated_at', desc=True)
-            .execute()
-        )
-
-        updates = []
-        for case in response.data:
-            updated_at_dt = safe_parse_datetime(case.get('updated_at'))
-            updates.append({
-                'fir_number': case.get('fir_number'),
-                'incident_type': case.get('incident_type'),
-                'last_updated': updated_at_dt.isoformat() if updated_at_dt else None,
-                'update_type': 'Modified',
-                'officer': case.get('investigating_officer')
-            })
-
-        return jsonify({'success': True, 'updates': updates, 'last_week_count': len(updates)})
+        return jsonify(case_updates_payload())
 
     except Exception as e:
         logger.error(f"💥 Case updates error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def case_updates_payload():
+    """Response body of /api/police/cases/updates"""
+    seven_days_ago = (datetime.now(timezone.utc) - timedelta(days=7)).strftime('%Y-%m-%d')
+    response = (
+        supabase_client.supabase.table("fir_records")
+        .select(select_list(FIR_PROJECTIONS['updates']))
+        .gte('updated_at', seven_days_ago)
+        .order('updated_at', desc=True)
+        .execute()
+    )
+
+    updates = []
+    for case in response.data:
+        updated_at_dt = safe_parse_datetime(case.get('updated_at'))
+        updates.append({
+            'fir_number': case.get('fir_number'),
+            'incident_type': case.get('incident_type'),
+            'last_updated': updated_at_dt.isoformat() if updated_at_dt else None,
+            'update_type': 'Modified',
+            'officer': case.get('investigating_officer')
+        })
+
+    return {'success': True, 'updates': updates, 'last_week_count': len(updates)}
+
 
 # --------------------------------------------------------------------
 # Allow slashes in FIR numbers by using <path:fir_number>
@@ -175,9 +299,14 @@ def get_case_with_activities(fir_number):
         if not supabase_client:
             return jsonify({'success': False, 'error': 'Database not available'}), 500
 
+        try:
+            columns = request_columns('full')
+        except ValueError as e:
+            return fields_error(e)
+
         # Try using existing helper
         try:
-            fir_result = supabase_client.get_fir_by_number(fir_number)
+            fir_result = load_fir_record(fir_number, columns)
             if not fir_result.get('success'):
                 return jsonify({'success': False, 'error': fir_result.get('error', 'FIR not found')}), 404
             fir_record = fir_result.get('data')
@@ -185,7 +314,7 @@ def get_case_with_activities(fir_number):
             # fallback direct query
             q = (
                 supabase_client.supabase.table('fir_records')
-                .select('*')
+                .select(select_list(columns))
                 .eq('fir_number', fir_number)
                 .limit(1)
                 .execute()
@@ -195,14 +324,7 @@ def get_case_with_activities(fir_number):
                 return jsonify({'success': False, 'error': 'FIR not found'}), 404
 
         # Fetch activity timeline
-        act_resp = (
-            supabase_client.supabase.table('case_activities')
-            .select('*')
-            .eq('fir_number', fir_number)
-            .order('activity_date', desc=True)
-            .execute()
-        )
-        activities = act_resp.data if act_resp and act_resp.data else []
+        activities = load_case_activities(fir_number)
 
         return jsonify({'success': True, 'record': fir_record, 'activities': activities})
 
@@ -255,6 +377,7 @@ def add_case_note(fir_number):
         }
 
         resp = supabase_client.supabase.table('case_activities').insert(insert_payload).execute()
+        invalidate_fir(fir_number)
 
         if resp and resp.data:
             return jsonify({'success': True, 'message': 'Activity recorded', 'activity': resp.data}), 201
@@ -277,30 +400,23 @@ def update_case_status(fir_number):
         if not supabase_client:
             return jsonify({'success': False, 'error': 'Database not available'}), 500
 
-        # Update FIR record
-        response = (
-            supabase_client.supabase.table("fir_records")
-            .update({
-                'status': new_status,
-                'investigation_notes': notes,
-                'updated_at': datetime.now(timezone.utc).isoformat()
-            })
-            .eq('fir_number', fir_number)
-            .execute()
-        )
+        # Update FIR record and log the activity in one transaction
+        result = supabase_client.update_case_status(fir_number, new_status, notes, {
+            'activity_type': 'status_change',
+            'title': f'Status changed to {new_status}',
+            'description': notes or f'Status updated to {new_status}',
+            'officer_name': 'Dashboard User'
+        })
+        invalidate_fir(fir_number)
+        if not result['success']:
+            return jsonify({'success': False, 'error': result['error']}), 500
 
-        if response.data:
-            # Log activity into case_activities table
-            try:
-                supabase_client.supabase.table("case_activities").insert({
-                    'fir_number': fir_number,
-                    'activity_type': 'status_change',
-                    'title': f'Status changed to {new_status}',
-                    'description': notes or f'Status updated to {new_status}',
-                    'officer_name': 'Dashboard User'
-                }).execute()
-            except Exception as sub_e:
-                logger.warning(f"⚠️ Could not log case activity: {sub_e}")
+        if result['found']:
+            if not result.get('activity_recorded'):
+                logger.warning(f"⚠️ Could not log case activity for {fir_number}")
+
+            if criminal_matcher:
+                criminal_matcher.update_fir_status(fir_number, new_status)
 
             return jsonify({'success': True, 'message': f'Case {fir_number} updated to {new_status}'})
         else:
@@ -331,44 +447,39 @@ def get_status_distribution():
         if not supabase_client:
             return jsonify({"success": False, "error": "Database not available"}), 500
 
-        # Query for status distribution
-        response = supabase_client.supabase.table("fir_records") \
-            .select("status") \
-            .execute()
-
-        firs = response.data or []
-        
-        # Count status distribution
-        status_counts = {}
-        for fir in firs:
-            status = fir.get('status', 'unknown')
-            status_counts[status] = status_counts.get(status, 0) + 1
-
-        # Format status names for better display
-        formatted_statuses = {
-            'under_investigation': 'Under Investigation',
-            'registered': 'Registered',
-            'charges_filed': 'Charges Filed', 
-            'court_proceeding': 'Court Proceedings',
-            'resolved': 'Resolved',
-            'closed': 'Closed',
-            'unknown': 'Unknown'
-        }
-
-        distribution = {}
-        for status, count in status_counts.items():
-            display_name = formatted_statuses.get(status, status.replace('_', ' ').title())
-            distribution[display_name] = count
-
-        return jsonify({"success": True, "distribution": distribution})
+        return jsonify(status_distribution_payload())
 
     except Exception as e:
         logger.error(f"💥 Status distribution error: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+def status_distribution_payload():
+    """Response body of /api/police/analytics/status-distribution"""
+    # Count status distribution in the database
+    status_counts = group_counts(supabase_client.supabase, "status", missing="unknown")
+
+    # Format status names for better display
+    formatted_statuses = {
+        'under_investigation': 'Under Investigation',
+        'registered': 'Registered',
+        'charges_filed': 'Charges Filed', 
+        'court_proceeding': 'Court Proceedings',
+        'resolved': 'Resolved',
+        'closed': 'Closed',
+        'unknown': 'Unknown'
+    }
+
+    distribution = {}
+    for status, count in status_counts.items():
+        display_name = formatted_statuses.get(status, status.replace('_', ' ').title())
+        distribution[display_name] = count
+
+    return {"success": True, "distribution": distribution}
+
 # === ANALYTICS ENDPOINTS ===
 
 @app.route('/api/police/analytics/patterns', methods=['POST'])
+@registry.requires("embedding_model")
 def analyze_criminal_patterns():
     """Analyze trends and criminal patterns."""
     try:
@@ -390,7 +501,7 @@ def get_crime_hotspots():
     try:
         if not case_analyzer:
             return jsonify({'success': False, 'error': 'Analytics unavailable'}), 500
-        return jsonify({'success': True, 'hotspots': case_analyzer.identify_hotspots()})
+        return jsonify(hotspots_payload())
     except Exception as e:
         logger.error(f"💥 Hotspot error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -412,21 +523,9 @@ def get_comprehensive_stats():
 # -------------------- CRIMINAL MATCHING ENDPOINT --------------------
 # -------------------- CRIMINAL MATCHING ENDPOINT --------------------
 # -------------------- CRIMINAL MATCHING ENDPOINT --------------------
-# --- Criminal Matcher Initialization ---import os
-
-try:
-    # ✅ Pass the REAL Supabase client inside your wrapper
-    criminal_matcher = CriminalMatcher(supabase_client.supabase)
-    logger.info("✅ Criminal matcher initialized successfully with Supabase (raw client)!")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize CriminalMatcher: {e}")
-    criminal_matcher = None
-
-
-
-
 
 @app.route("/api/police/criminal-matching", methods=["POST"])
+@registry.requires("embedding_model", "criminal_matcher")
 def match_criminals():
     """
     Matches an input case description with existing FIR records.
@@ -494,6 +593,7 @@ def get_legal_resources():
 
 
 @app.route('/api/fir/suggest-sections', methods=['POST'])
+@registry.requires("embedding_model", "fir_model")
 def suggest_sections():
     """Suggest IPC sections based on incident description"""
     try:
@@ -535,9 +635,134 @@ def suggest_sections():
         logger.error(f"💥 Error in suggest-sections: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def build_fir_data(data, fir_number):
+    """FIR document structure (as rendered into the PDF) from the request payload."""
+    return {
+        'fir_number': fir_number,
+        # Aware UTC; stored as created_at and printed (in local time) on the PDF
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'police_station': data.get('police_station', 'Local Police Station'),
+        'district': data.get('district', 'District'),
+        'state': data.get('state', 'State'),
+        'incident_details': {
+            'type': data.get('incident_type', ''),
+            'date': data.get('incident_date', ''),
+            'time': data.get('incident_time', ''),
+            'location': data.get('location', ''),
+            'description': data.get('incident_description', '')
+        },
+        'victim_info': {
+            'name': data.get('victim_name', ''),
+            'contact': data.get('victim_contact', ''),
+            'address': data.get('victim_address', ''),
+            'age': data.get('victim_age', ''),
+            'gender': data.get('victim_gender', '')
+        },
+        'accused_info': {
+            'name': data.get('accused_name', ''),
+            'description': data.get('accused_description', '')
+        },
+        'sections_applied': data.get('sections_applied', []),
+        'investigating_officer': data.get('investigating_officer', 'Investigation Officer'),
+        'additional_comments': data.get('additional_comments', '')
+    }
+
+def build_fir_record(fir_data, pdf_path):
+    """fir_records row for an FIR document - CORRECTED FIELDS"""
+    record = {
+        'fir_number': fir_data['fir_number'],
+        'police_station': fir_data['police_station'],
+        'district': fir_data['district'],
+        'state': fir_data['state'],
+        'incident_type': fir_data['incident_details']['type'],
+        'incident_date': fir_data['incident_details']['date'],
+        'incident_time': fir_data['incident_details']['time'],
+        'incident_location': fir_data['incident_details']['location'],
+        'incident_description': fir_data['incident_details']['description'],
+        'victim_name': fir_data['victim_info']['name'],
+        'victim_contact': fir_data['victim_info']['contact'],
+        'victim_address': fir_data['victim_info']['address'],
+        'victim_age': fir_data['victim_info'].get('age'),
+        'victim_gender': fir_data['victim_info'].get('gender'),
+        'accused_name': fir_data['accused_info'].get('name'),
+        'accused_description': fir_data['accused_info'].get('description'),
+        'ipc_sections': json.dumps(fir_data['sections_applied']),  # Store as JSON string
+        'investigating_officer': fir_data['investigating_officer'],
+        'additional_comments': fir_data['additional_comments'],
+        'status': 'registered',  # Default status
+        'pdf_path': pdf_path,
+        'created_at': fir_data['timestamp'],
+        'updated_at': fir_data['timestamp']
+    }
+    # Remove None values to avoid database errors
+    return {k: v for k, v in record.items() if v is not None}
+
+def initial_activity(fir_data):
+    """case_activities row written together with a new FIR"""
+    return {
+        'activity_type': 'fir_registered',
+        'title': 'FIR Registered',
+        'description': f'FIR registered for {fir_data["incident_details"]["type"]} incident',
+        'officer_name': fir_data['investigating_officer']
+    }
+
+def store_fir(fir_data, pdf_path):
+    """Insert the FIR row and its initial activity; returns (stored, error_message, record)."""
+    if not supabase_client:
+        logger.warning("⚠️ Supabase client not available for storage")
+        return False, None, None
+
+    try:
+        record = build_fir_record(fir_data, pdf_path)
+        storage_result = supabase_client.register_fir(record, initial_activity(fir_data))
+        invalidate_fir(record['fir_number'])
+        if storage_result['success']:
+            logger.info(f"✅ FIR stored in Supabase with ID: {storage_result.get('id')}")
+            if not storage_result.get('activity_recorded'):
+                logger.warning(f"⚠️ Could not create initial activity for FIR: {fir_data['fir_number']}")
+            return True, None, record
+
+        db_error_message = storage_result.get('error', 'Unknown database error')
+        logger.error(f"❌ Failed to store FIR in Supabase: {db_error_message}")
+        return False, db_error_message, record
+    except Exception as db_error:
+        logger.error(f"❌ Database storage error: {db_error}")
+        return False, str(db_error), None
+
+def after_fir_stored(fir_data, record):
+    """Follow-up work for a stored FIR (the initial activity is written with the FIR itself)."""
+    if criminal_matcher:
+        criminal_matcher.index_fir(record)
+
+def export_response(rows, fmt, filename):
+    """Stream rows as NDJSON or CSV; rows are pulled from the database as the client reads."""
+    return Response(
+        export_lines(rows, fmt),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}.{fmt}',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+def fir_download_url(fir_number):
+    return f'/api/fir/download/{fir_number.replace("/", "_")}'
+
+def versioned_download_url(job):
+    """Download URL pinned to the rendered content (?v=<etag>), cacheable for FIR_PDF_CACHE_MAX_AGE."""
+    entry = get_pdf_index().lookup(job.fir_number) if job.status == 'done' else None
+    if not entry or not entry['etag']:
+        return None
+    return f"{fir_download_url(job.fir_number)}?v={entry['etag']}"
+
 @app.route('/api/fir/generate-pdf', methods=['POST'])
 def generate_pdf():
-    """Generate and save FIR PDF, store in Supabase"""
+    """Generate and save FIR PDF, store in Supabase.
+
+    With ?async=1 (or "async": true in the body, or FIR_PDF_ASYNC=1) the FIR is
+    stored and rendering is queued; the 202 response carries a job id to poll
+    at /api/fir/jobs/<job_id> or follow at /api/fir/jobs/<job_id>/stream.
+    """
     try:
         data = request.json
         
@@ -545,37 +770,17 @@ def generate_pdf():
             return jsonify({'success': False, 'error': 'No data provided'}), 400
         
         # Generate unique FIR number
-        fir_number = generate_fir_number()
+        try:
+            fir_number = generate_fir_number(data.get('station_code'), data.get('police_station'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
         # Create FIR data structure with defaults
-        fir_data = {
-            'fir_number': fir_number,
-            'timestamp': datetime.now().isoformat(),
-            'police_station': data.get('police_station', 'Local Police Station'),
-            'district': data.get('district', 'District'),
-            'state': data.get('state', 'State'),
-            'incident_details': {
-                'type': data.get('incident_type', ''),
-                'date': data.get('incident_date', ''),
-                'time': data.get('incident_time', ''),
-                'location': data.get('location', ''),
-                'description': data.get('incident_description', '')
-            },
-            'victim_info': {
-                'name': data.get('victim_name', ''),
-                'contact': data.get('victim_contact', ''),
-                'address': data.get('victim_address', ''),
-                'age': data.get('victim_age', ''),
-                'gender': data.get('victim_gender', '')
-            },
-            'accused_info': {
-                'name': data.get('accused_name', ''),
-                'description': data.get('accused_description', '')
-            },
-            'sections_applied': data.get('sections_applied', []),
-            'investigating_officer': data.get('investigating_officer', 'Investigation Officer'),
-            'additional_comments': data.get('additional_comments', '')
-        }
+        fir_data = build_fir_data(data, fir_number)
+
+        async_mode = request.args.get('async', str(data.get('async', PDF_ASYNC_DEFAULT))).lower() in ('1', 'true', 'yes')
+        if async_mode:
+            return enqueue_fir_pdf(fir_data)
         
         logger.info(f"📄 Generating FIR: {fir_number}")
         
@@ -583,80 +788,20 @@ def generate_pdf():
         pdf_path = generate_fir_pdf(fir_data)
         
         if not pdf_path or not os.path.exists(pdf_path):
+            # Hand the number back so the month's sequence stays gap-free
+            fir_number_allocator.release(fir_number)
             return jsonify({'success': False, 'error': 'Failed to generate PDF'}), 500
         
         # Store in Supabase - FIXED VERSION
-        db_storage_success = False
-        db_error_message = None
-        
-        if supabase_client:
-            try:
-                # Prepare data for Supabase storage - CORRECTED FIELDS
-                supabase_data = {
-                    'fir_number': fir_number,
-                    'police_station': fir_data['police_station'],
-                    'district': fir_data['district'],
-                    'state': fir_data['state'],
-                    'incident_type': fir_data['incident_details']['type'],
-                    'incident_date': fir_data['incident_details']['date'],
-                    'incident_time': fir_data['incident_details']['time'],
-                    'incident_location': fir_data['incident_details']['location'],
-                    'incident_description': fir_data['incident_details']['description'],
-                    'victim_name': fir_data['victim_info']['name'],
-                    'victim_contact': fir_data['victim_info']['contact'],
-                    'victim_address': fir_data['victim_info']['address'],
-                    'victim_age': fir_data['victim_info'].get('age'),
-                    'victim_gender': fir_data['victim_info'].get('gender'),
-                    'accused_name': fir_data['accused_info'].get('name'),
-                    'accused_description': fir_data['accused_info'].get('description'),
-                    'ipc_sections': json.dumps(fir_data['sections_applied']),  # Store as JSON string
-                    'investigating_officer': fir_data['investigating_officer'],
-                    'additional_comments': fir_data['additional_comments'],
-                    'status': 'registered',  # Default status
-                    'pdf_path': pdf_path,
-                    'created_at': datetime.now(timezone.utc).isoformat(),
-                    'updated_at': datetime.now(timezone.utc).isoformat()
-                }
-                
-                # Remove None values to avoid database errors
-                supabase_data = {k: v for k, v in supabase_data.items() if v is not None}
-                
-                storage_result = supabase_client.store_fir_record(supabase_data)
-                db_storage_success = storage_result['success']
-                
-                if db_storage_success:
-                    logger.info(f"✅ FIR stored in Supabase with ID: {storage_result.get('id')}")
-                    
-                    # Also create initial activity record
-                    try:
-                        activity_data = {
-                            'fir_number': fir_number,
-                            'activity_type': 'fir_registered',
-                            'title': 'FIR Registered',
-                            'description': f'FIR registered for {fir_data["incident_details"]["type"]} incident',
-                            'officer_name': fir_data['investigating_officer']
-                        }
-                        supabase_client.supabase.table('case_activities').insert(activity_data).execute()
-                        logger.info(f"✅ Initial activity recorded for FIR: {fir_number}")
-                    except Exception as activity_error:
-                        logger.warning(f"⚠️ Could not create initial activity: {activity_error}")
-                        
-                else:
-                    db_error_message = storage_result.get('error', 'Unknown database error')
-                    logger.error(f"❌ Failed to store FIR in Supabase: {db_error_message}")
-                    
-            except Exception as db_error:
-                logger.error(f"❌ Database storage error: {db_error}")
-                db_storage_success = False
-                db_error_message = str(db_error)
-        else:
-            logger.warning("⚠️ Supabase client not available for storage")
+        db_storage_success, db_error_message, record = store_fir(fir_data, pdf_path)
+        if db_storage_success:
+            after_fir_stored(fir_data, record)
         
         return jsonify({
             'success': True,
             'fir_number': fir_number,
             'pdf_path': pdf_path,
-            'download_url': f'/api/fir/download/{fir_number.replace("/", "_")}',
+            'download_url': fir_download_url(fir_number),
             'stored_in_db': db_storage_success,
             'db_error': db_error_message if not db_storage_success else None,
             'message': 'FIR generated successfully' + (' and stored in database' if db_storage_success else ' (database storage failed)')
@@ -666,6 +811,72 @@ def generate_pdf():
         logger.error(f"💥 Error generating PDF: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def enqueue_fir_pdf(fir_data):
+    """Store the FIR now and render its PDF on the job queue."""
+    fir_number = fir_data['fir_number']
+    pdf_path = fir_pdf_path(fir_number)
+    db_storage_success, db_error_message, record = store_fir(fir_data, pdf_path)
+
+    def on_done(_):
+        if db_storage_success:
+            after_fir_stored(fir_data, record)
+
+    def on_failed(error):
+        # Every retry failed: the stored FIR must not keep pointing at a PDF that never appeared
+        if db_storage_success:
+            supabase_client.mark_pdf_failed(fir_number, error, {'officer_name': fir_data['investigating_officer']})
+            invalidate_fir(fir_number)
+
+    render = pdf_render_pool.render if pdf_render_pool else generate_fir_pdf
+    job = pdf_jobs.submit(fir_number, render, fir_data,
+                          download_url=fir_download_url(fir_number), on_done=on_done, on_failed=on_failed)
+    return jsonify({
+        'success': True,
+        'fir_number': fir_number,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/fir/jobs/{job.id}',
+        'stream_url': f'/api/fir/jobs/{job.id}/stream',
+        'download_url': fir_download_url(fir_number),
+        'stored_in_db': db_storage_success,
+        'db_error': db_error_message if not db_storage_success else None,
+        'message': 'FIR registered, PDF is being generated' + ('' if db_storage_success else ' (database storage failed)')
+    }), 202
+
+@app.route('/api/fir/jobs/<job_id>', methods=['GET'])
+def get_pdf_job(job_id):
+    """Status of an asynchronous PDF job"""
+    job = pdf_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job.to_dict(), 'versioned_download_url': versioned_download_url(job)})
+
+@app.route('/api/fir/jobs/<job_id>/stream', methods=['GET'])
+def stream_pdf_job(job_id):
+    """Server-sent events for a PDF job: a 'status' event per change, ending with 'done' or 'failed'."""
+    job = pdf_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    def events():
+        deadline = time.time() + PDF_JOB_STREAM_TIMEOUT
+        version = -1
+        while True:
+            current = job.wait_for_change(version, timeout=15)
+            if current != version:
+                version = current
+                event = job.status if job.finished else 'status'
+                yield f"event: {event}\ndata: {json.dumps(job.to_dict())}\n\n"
+                if job.finished:
+                    return
+            else:
+                yield ": keepalive\n\n"
+            if time.time() > deadline:
+                return
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/fir/download/<fir_number>')
 def download_fir(fir_number):
     """Download FIR PDF"""
@@ -677,61 +888,45 @@ def download_fir(fir_number):
         if len(parts) < 4:
             return jsonify({'success': False, 'error': 'Invalid FIR number format'}), 400
         
-        police_station, year, month, sequence = parts[0], parts[1], parts[2], parts[3]
+        # Rendered PDFs are indexed by FIR number (python -m scripts.pdf_index rebuild to rescan)
+        entry = get_pdf_index().lookup(actual_fir_number)
         
-        # Map month number to month name
-        month_names = ['January', 'February', 'March', 'April', 'May', 'June',
-                      'July', 'August', 'September', 'October', 'November', 'December']
-        try:
-            month_int = int(month)
-            month_name = month_names[month_int - 1] if 1 <= month_int <= 12 else f"Month_{month}"
-        except:
-            month_name = f"Month_{month}"
-        
-        # Try multiple possible file paths
-        possible_paths = [
-            f"fir_drafts/{year}/{month}_{month_name}/{fir_number}.pdf",
-            f"fir_drafts/{year}/{month}_{month_name}/{actual_fir_number}.pdf",
-            f"fir_drafts/{year}/{month:02d}_{month_name}/{fir_number}.pdf",
-            f"fir_drafts/{year}/{month:02d}_{month_name}/{actual_fir_number}.pdf",
-        ]
-        
-        pdf_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                pdf_path = path
-                break
+        logger.info(f"📥 Download request for: {fir_number}")
         
-        if not pdf_path:
-            # Try to find any PDF with this FIR number
-            import glob
-            search_pattern = f"fir_drafts/**/*{fir_number}*.pdf"
-            matches = glob.glob(search_pattern, recursive=True)
-            if matches:
-                pdf_path = matches[0]
+        if entry:
+            try:
+                # Return the PDF file
+                # Conditional: If-None-Match -> 304, Range -> 206
+                response = send_file(
+                    os.path.abspath(entry['path']), 
+                    as_attachment=True, 
+                    download_name=f"FIR_{fir_number}.pdf",
+                    mimetype='application/pdf',
+                    etag=entry['etag'] or True,
+                    conditional=True
+                )
+                response.cache_control.private = True
+                if entry['etag'] and request.args.get('v') == entry['etag']:
+                    # Versioned URL: this exact content never changes (a re-render gets a new etag)
+                    response.cache_control.no_cache = None
+                    response.cache_control.max_age = PDF_CACHE_MAX_AGE
+                    response.cache_control.immutable = True
+                else:
+                    # Plain URL: revalidate every time; unchanged PDFs cost a 304 with no body
+                    response.cache_control.no_cache = True
+                return response
+            except FileNotFoundError:
+                logger.warning(f"⚠️ Indexed PDF is missing on disk: {entry['path']}")
+                get_pdf_index().remove(actual_fir_number)
         
-        logger.info(f"📥 Download request for: {fir_number}")
-        logger.info(f"🔍 Looking for PDF at: {pdf_path}")
+        logger.error(f"❌ FIR not found: {fir_number}")
         
-        if pdf_path and os.path.exists(pdf_path):
-            # Return the PDF file
-            return send_file(
-                pdf_path, 
-                as_attachment=True, 
-                download_name=f"FIR_{fir_number}.pdf",
-                mimetype='application/pdf'
-            )
-        else:
-            logger.error(f"❌ FIR not found: {fir_number}")
-            logger.error(f"🔍 Searched paths: {possible_paths}")
-            
-            # Return a proper JSON error instead of HTML
-            return jsonify({
-                'success': False, 
-                'error': 'FIR PDF not found',
-                'fir_number': fir_number,
-                'searched_paths': possible_paths
-            }), 404
+        # Return a proper JSON error instead of HTML
+        return jsonify({
+            'success': False, 
+            'error': 'FIR PDF not found',
+            'fir_number': fir_number
+        }), 404
             
     except Exception as e:
         logger.error(f"💥 Download error: {e}")
@@ -744,9 +939,16 @@ def download_fir(fir_number):
 
 @app.route('/api/fir/search', methods=['POST'])
 def search_fir():
-    """Search FIR records with various filters"""
+    """Search FIR records with various filters (?format=ndjson|csv streams every match,
+    ?fields= or body "fields" picks the returned columns)"""
     try:
-        filters = request.json or {}
+        filters = dict(request.json or {})
+        export_format = request.args.get('format') or filters.pop('format', None)
+        fields = request.args.get('fields') or filters.pop('fields', None)
+        try:
+            columns = request_columns('search', ('created_at', 'id'), fields)
+        except ValueError as e:
+            return fields_error(e)
         
         if not supabase_client:
             return jsonify({
@@ -757,7 +959,11 @@ def search_fir():
         
         logger.info(f"🔍 Searching FIR records with filters: {filters}")
         
-        result = supabase_client.search_fir_records(filters)
+        if export_format in EXPORT_FORMATS:
+            return export_response(supabase_client.iter_search_records(filters, columns=columns),
+                                   export_format, 'fir_search')
+        
+        result = supabase_client.search_fir_records(filters, columns)
         
         if result['success']:
             logger.info(f"✅ Found {len(result['data'])} FIR records")
@@ -791,9 +997,14 @@ def get_fir(fir_number):
                 'error': 'Database not available'
             }), 500
         
+        try:
+            columns = request_columns('full')
+        except ValueError as e:
+            return fields_error(e)
+        
         logger.info(f"🔍 Fetching FIR: {fir_number}")
         
-        result = supabase_client.get_fir_by_number(fir_number)
+        result = load_fir_record(fir_number, columns)
         
         if result['success']:
             logger.info(f"✅ FIR found: {fir_number}")
@@ -817,7 +1028,7 @@ def get_fir(fir_number):
 
 @app.route('/api/fir/reports/monthly/<int:year>/<int:month>')
 def get_monthly_report(year, month):
-    """Get monthly FIR report"""
+    """Get monthly FIR report (?format=ndjson|csv streams the full month)"""
     try:
         if not supabase_client:
             return jsonify({
@@ -827,7 +1038,17 @@ def get_monthly_report(year, month):
         
         logger.info(f"📊 Generating monthly report for {month}/{year}")
         
-        result = supabase_client.get_monthly_report(year, month)
+        try:
+            columns = request_columns('full', ('incident_date', 'id'))
+        except ValueError as e:
+            return fields_error(e)
+        
+        export_format = request.args.get('format')
+        if export_format in EXPORT_FORMATS:
+            return export_response(supabase_client.iter_monthly_report(year, month, columns=columns),
+                                   export_format, f'fir_report_{year}_{month:02d}')
+        
+        result = supabase_client.get_monthly_report(year, month, columns)
         
         if result['success']:
             logger.info(f"✅ Monthly report generated: {len(result['data'])} records")
@@ -889,12 +1110,31 @@ def get_statistics():
             'error': str(e)
         }), 500
 
+FIR_LIST_KEYS = [("created_at", True), ("id", True)]
+FIR_LIST_TOTALS = ("exact", "estimated", "planned", "none")
+
 @app.route('/api/fir/list')
 def list_fir():
-    """Get paginated list of FIR records"""
+    """Get paginated list of FIR records (newest first).
+
+    By default pages are offset-based (?page=, default 1) as before.
+    ?paginate=keyset (or any ?cursor=) opts into keyset pages on
+    (created_at, id) that carry opaque next/prev cursors instead.
+    ?total=exact|estimated|planned|none picks how the total is counted, in
+    the same query as the page. ?fields= picks the columns (default: the
+    "table" projection).
+    """
     try:
-        page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 10))
+        cursor = request.args.get('cursor')
+        offset_mode = not cursor and request.args.get('paginate', 'offset') != 'keyset'
+        total_mode = request.args.get('total', 'exact' if offset_mode else 'none')
+        
+        if total_mode not in FIR_LIST_TOTALS:
+            return jsonify({
+                'success': False,
+                'error': f"total must be one of {', '.join(FIR_LIST_TOTALS)}"
+            }), 400
         
         if not supabase_client:
             return jsonify({
@@ -902,33 +1142,48 @@ def list_fir():
                 'error': 'Database not available'
             }), 500
         
-        # Calculate offset for pagination
-        offset = (page - 1) * limit
+        try:
+            columns = request_columns('table', ('created_at', 'id'))
+        except ValueError as e:
+            return fields_error(e)
         
-        # Get total count
-        count_response = supabase_client.supabase.table("fir_records")\
-            .select("id", count="exact")\
-            .execute()
+        count = None if total_mode == 'none' else total_mode
+        query = supabase_client.supabase.table("fir_records").select(select_list(columns), count=count)
         
-        total_count = count_response.count or 0
+        if offset_mode:
+            page = int(request.args.get('page', 1))
+            offset = (page - 1) * limit
+            
+            response = query\
+                .order("created_at", desc=True)\
+                .order("id", desc=True)\
+                .range(offset, offset + limit - 1)\
+                .execute()
+            
+            pagination = {'page': page, 'limit': limit}
+            if count:
+                total_count = response.count or 0
+                pagination.update({
+                    'total': total_count,
+                    'pages': (total_count + limit - 1) // limit
+                })
+            return jsonify({'success': True, 'records': response.data, 'pagination': pagination})
         
-        # Get paginated records
-        response = supabase_client.supabase.table("fir_records")\
-            .select("*")\
-            .order("created_at", desc=True)\
-            .range(offset, offset + limit - 1)\
-            .execute()
+        try:
+            result = keyset_page(query, FIR_LIST_KEYS, limit, cursor)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        return jsonify({
-            'success': True,
-            'records': response.data,
-            'pagination': {
-                'page': page,
-                'limit': limit,
-                'total': total_count,
-                'pages': (total_count + limit - 1) // limit
-            }
-        })
+        pagination = {
+            'limit': limit,
+            'next_cursor': result['next_cursor'],
+            'prev_cursor': result['prev_cursor'],
+            'has_more': result['next_cursor'] is not None
+        }
+        if count:
+            pagination.update({'total': result['count'] or 0, 'total_method': total_mode})
+        
+        return jsonify({'success': True, 'records': result['rows'], 'pagination': pagination})
         
     except Exception as e:
         logger.error(f"💥 List FIR error: {e}")
@@ -950,6 +1205,8 @@ def health_check():
             'supabase': db_status,
             'pdf_generator': 'operational'
         },
+        'fir_cache': fir_cache.stats() if fir_cache else None,
+        'pdf_jobs': pdf_jobs.stats(),
         'timestamp': datetime.now().isoformat(),
         'endpoints': {
             'suggest_sections': 'POST /api/fir/suggest-sections',
@@ -962,65 +1219,134 @@ def health_check():
         }
     })
 
-def generate_fir_number():
-    """Generate unique FIR number in format: PS/YYYY/MM/XXXX"""
-    now = datetime.now()
-    police_station_code = "PS"  # You can make this configurable
-    year = now.year
-    month = now.month
-    
-    # Count existing FIRs this month to generate sequential number
-    month_names = ['January', 'February', 'March', 'April', 'May', 'June',
-                  'July', 'August', 'September', 'October', 'November', 'December']
-    month_name = month_names[month - 1]
-    month_dir = f"fir_drafts/{year}/{month:02d}_{month_name}"
-    
-    if os.path.exists(month_dir):
-        existing_firs = len([f for f in os.listdir(month_dir) if f.endswith('.pdf')])
-        sequence = existing_firs + 1
-    else:
-        sequence = 1
-    
-    return f"{police_station_code}/{year}/{month:02d}/{sequence:04d}"
+def generate_fir_number(station_code=None, police_station=None):
+    """Allocate the next FIR number in format: STATION/YYYY/MM/XXXX"""
+    if not fir_number_allocator:
+        raise RuntimeError("FIR number allocator not available")
+    return fir_number_allocator.allocate(station_code=station_code, police_station=police_station)
+
+def overview_sections():
+    """The overview's independent queries, run concurrently by the overview and bundle routes"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    table = lambda: supabase_client.supabase.table("fir_records")
+    return {
+        # Today's cases
+        'today_cases': lambda: table()
+            .select("id", count="exact")
+            .eq('incident_date', today)
+            .execute().count or 0,
+        # Pending cases
+        'pending_cases': lambda: table()
+            .select("id", count="exact")
+            .is_('status', 'null')
+            .execute().count or 0,
+        # Recent updates
+        'recent_activity': lambda: table()
+            .select(select_list(FIR_PROJECTIONS['updates']))
+            .order('updated_at', desc=True)
+            .limit(5)
+            .execute().data or [],
+    }
+
+def overview_payload(results):
+    """Overview dict from FanOut results of overview_sections()"""
+    value = lambda name, default: results[name]['value'] if results.get(name, {}).get('ok') else default
+    return {
+        'today_cases': value('today_cases', 0),
+        'pending_cases': value('pending_cases', 0),
+        'total_cases': 0,  # You might want to calculate this
+        'recent_activity': value('recent_activity', [])
+    }
 
 @app.route('/api/police/dashboard/overview', methods=['GET'])
 def get_dashboard_overview():
     """Get complete dashboard overview"""
     try:
-        # Get various metrics
-        today = datetime.now().strftime('%Y-%m-%d')
+        results = dashboard_fanout.run(overview_sections())
+        failed = [r['error'] for r in results.values() if not r['ok']]
+        if failed:
+            raise RuntimeError(failed[0])
         
-        # Today's cases
-        today_cases = supabase_client.supabase.table("fir_records")\
-            .select("id", count="exact")\
-            .eq('incident_date', today)\
-            .execute()
-        
-        # Pending cases
-        pending_cases = supabase_client.supabase.table("fir_records")\
-            .select("id", count="exact")\
-            .is_('status', 'null')\
-            .execute()
-        
-        # Recent updates
-        recent_updates = supabase_client.supabase.table("fir_records")\
-            .select("*")\
-            .order('updated_at', desc=True)\
-            .limit(5)\
-            .execute()
-        
-        overview = {
-            'today_cases': today_cases.count or 0,
-            'pending_cases': pending_cases.count or 0,
-            'total_cases': 0,  # You might want to calculate this
-            'recent_activity': recent_updates.data if recent_updates.data else []
-        }
-        
-        return jsonify({'success': True, 'overview': overview})
+        return jsonify({'success': True, 'overview': overview_payload(results)})
         
     except Exception as e:
         logger.error(f"💥 Dashboard overview error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
+
+def hotspots_payload():
+    """Response body of /api/police/analytics/hotspots"""
+    if not case_analyzer:
+        raise RuntimeError('Analytics unavailable')
+    return {'success': True, 'hotspots': case_analyzer.identify_hotspots()}
+
+DASHBOARD_SECTIONS = ('overview', 'pending', 'updates', 'status_distribution', 'hotspots', 'analytics')
+
+@app.route('/api/police/dashboard/bundle', methods=['GET'])
+def get_dashboard_bundle():
+    """Everything the police dashboard loads, fetched concurrently in one request.
+
+    ?sections= (comma separated, default all), ?range= for analytics,
+    ?months= for pending cases and ?timeout= seconds per section. Each
+    section holds the body its own endpoint returns; sections that fail or
+    time out are listed under "errors" and the others are still returned.
+    """
+    try:
+        if not supabase_client:
+            return jsonify({'success': False, 'error': 'Database not available'}), 500
+
+        requested = [n.strip() for n in request.args.get('sections', ','.join(DASHBOARD_SECTIONS)).split(',') if n.strip()]
+        unknown = [n for n in requested if n not in DASHBOARD_SECTIONS]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown sections: {', '.join(unknown)} (available: {', '.join(DASHBOARD_SECTIONS)})"
+            }), 400
+
+        time_range = request.args.get('range', 'month')
+        try:
+            months = max(0, int(request.args.get('months', 6)))
+            timeout = min(float(request.args.get('timeout', FANOUT_TIMEOUT)), 30.0)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'months and timeout must be numbers'}), 400
+
+        builders = {
+            'pending': lambda: pending_cases_payload(months),
+            'updates': case_updates_payload,
+            'status_distribution': status_distribution_payload,
+            'hotspots': hotspots_payload,
+            'analytics': lambda: crime_analytics_payload(time_range),
+        }
+        tasks = {name: builders[name] for name in requested if name != 'overview'}
+        if 'overview' in requested:
+            tasks.update({f'overview.{name}': fn for name, fn in overview_sections().items()})
+
+        started = time.perf_counter()
+        results = dashboard_fanout.run(tasks, timeout=timeout)
+
+        sections, errors = {}, {}
+        timings = {name: r['ms'] for name, r in results.items()}
+        for name, r in results.items():
+            if not r['ok']:
+                errors[name] = r['error']
+            elif not name.startswith('overview.'):
+                sections[name] = r['value']
+        if 'overview' in requested:
+            parts = {name.split('.', 1)[1]: r for name, r in results.items() if name.startswith('overview.')}
+            if any(r['ok'] for r in parts.values()):
+                sections['overview'] = {'success': True, 'overview': overview_payload(parts)}
+
+        return jsonify({
+            'success': True,
+            'sections': sections,
+            'timings': timings,
+            'errors': errors,
+            'partial': bool(errors),
+            'total_ms': round((time.perf_counter() - started) * 1000, 1)
+        })
+
+    except Exception as e:
+        logger.error(f"💥 Dashboard bundle error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
     
 
 
@@ -1033,48 +1359,46 @@ def get_dashboard_overview():
 def get_crime_analytics():
     """Return real analytics data from fir_records"""
     try:
-        from collections import Counter
-
-        time_range = request.args.get("range", "month")
-        now = datetime.now(timezone.utc)
+        return jsonify(crime_analytics_payload(request.args.get("range", "month")))
 
-        if time_range == "week":
-            start_date = now - timedelta(days=7)
-        elif time_range == "year":
-            start_date = now - timedelta(days=365)
-        else:
-            start_date = now - timedelta(days=30)
+    except Exception as e:
+        app.logger.error(f"💥 Analytics error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
 
-        # ✅ Use SupabaseFIRClient’s method correctly
-        response = supabase_client.supabase.table("fir_records") \
-            .select("*") \
-            .gte("incident_date", start_date.isoformat()) \
-            .execute()
+def crime_analytics_payload(time_range="month"):
+    """Response body of /api/police/analytics"""
+    now = datetime.now(timezone.utc)
 
-        firs = response.data or []
-        total_cases = len(firs)
-        resolved = [f for f in firs if f.get("status", "").lower() == "resolved"]
-        pending = [f for f in firs if f.get("status", "").lower() != "resolved"]
+    if time_range == "week":
+        start_date = now - timedelta(days=7)
+    elif time_range == "year":
+        start_date = now - timedelta(days=365)
+    else:
+        start_date = now - timedelta(days=30)
 
-        resolution_rate = round((len(resolved) / total_cases * 100), 2) if total_cases else 0
+    # Rollup buckets only - one row per bucket, not per FIR
+    counts = rollup_counts(
+        supabase_client.supabase,
+        start_date=start_date.strftime("%Y-%m-%d"),
+        dimensions=["total", "status", "incident_type", "incident_location"],
+    )
 
-        type_counts = Counter(f.get("incident_type", "Unknown") for f in firs)
-        location_counts = Counter(f.get("location", "Unknown") for f in firs)
+    total_cases = rollup_total(counts)
+    resolved = sum(c for status, c in counts["status"].items() if status.lower() == "resolved")
+    pending = total_cases - resolved
 
-        analytics = {
-            "total_cases": total_cases,
-            "resolved_cases": len(resolved),
-            "pending_cases": len(pending),
-            "resolution_rate": resolution_rate,
-            "crime_types": dict(type_counts),
-            "hotspots": dict(location_counts.most_common(5)),
-        }
+    resolution_rate = round((resolved / total_cases * 100), 2) if total_cases else 0
 
-        return jsonify({"success": True, "analytics": analytics})
+    analytics = {
+        "total_cases": total_cases,
+        "resolved_cases": resolved,
+        "pending_cases": pending,
+        "resolution_rate": resolution_rate,
+        "crime_types": counts["incident_type"],
+        "hotspots": top_buckets(counts["incident_location"], 5),
+    }
 
-    except Exception as e:
-        app.logger.error(f"💥 Analytics error: {e}")
-        return jsonify({"success": False, "error": str(e)}), 500
+    return {"success": True, "analytics": analytics}
 
 
 
@@ -1082,7 +1406,7 @@ def get_crime_analytics():
 
 if __name__ == '__main__':
     # Create directories if they don't exist
-    os.makedirs('fir_drafts', exist_ok=True)
+    os.makedirs(DRAFTS_DIR, exist_ok=True)
     os.makedirs('models', exist_ok=True)
     
     print("🚀 Starting FIR Drafting API with Supabase Integration...")
@@ -1097,6 +1421,7 @@ if __name__ == '__main__':
     print("   - GET    /api/fir/list                 - Paginated FIR list")
     print("   - GET    /api/fir/health               - Health check")
     print("")
+    registry.warm_all()
     print("🔧 Service Status:")
     print(f"   - RAG Model: {'✅ Loaded' if fir_model else '❌ Failed'}")
     print(f"   - Supabase: {'✅ Connected' if supabase_client else '❌ Disconnected'}")
@@ -3,11 +3,12 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import time
 import traceback
+from scripts.warmup import registry
 
 # Create main app
 app = Flask(__name__)
 # Replace the CORS configuration with:
-CORS(app, origins=[
+CORS_ORIGINS = [
     "https://s2004-police-dashboard.hf.space",  # Your HF Space
     "https://legal-assistance-frontend.vercel.app",  # Your Vercel frontend
     "http://localhost:8000",
@@ -15,7 +16,8 @@ CORS(app, origins=[
     "http://localhost:5000",
     "http://127.0.0.1:8000",
     "http://127.0.0.1:3000"
-], methods=["GET", "POST", "PUT", "DELETE"], allow_headers=["*"])
+]
+CORS(app, origins=CORS_ORIGINS, methods=["GET", "POST", "PUT", "DELETE"], allow_headers=["*"])
 
 # Store references to your existing apps
 fir_app = None
@@ -36,6 +38,12 @@ def health():
         "timestamp": time.time()
     })
 
+@app.route('/api/ready')
+def ready():
+    """Readiness: 200 once every component is warm; 503 (with per-component state) while warming or if any failed."""
+    status = registry.status()
+    return jsonify(status), (200 if status["ready"] else 503)
+
 # Import and configure your existing apps
 def initialize_services():
     global fir_app, chatbot_app
@@ -58,49 +66,87 @@ def initialize_services():
         print(f"❌ Chatbot API initialization failed: {e}")
         traceback.print_exc()
 
-# Proxy routes for FIR API
+# Sub-app mounts: (path, service getter, path seen by the sub-app).
+# A path ending in "/" mounts everything below it; None keeps the path as-is.
+MOUNTS = [
+    ("/api/fir/", lambda: fir_app, None),
+    ("/api/police/", lambda: fir_app, None),
+    ("/api/chat", lambda: chatbot_app, None),
+    ("/api/chat/stream", lambda: chatbot_app, None),
+    ("/api/register", lambda: chatbot_app, None),
+    ("/api/login", lambda: chatbot_app, None),
+    ("/api/health/chatbot", lambda: chatbot_app, "/api/health"),
+]
+
+
+class ServiceDispatcher:
+    """WSGI middleware that hands each request straight to the sub-app owning its path.
+
+    The sub-apps register their full /api/... routes, so PATH_INFO is passed
+    through unchanged and the environ (headers, query string, body stream)
+    is never copied. Unmatched paths, and services that failed to load,
+    fall through to the combined app.
+
+    The sub-apps allow any origin when run on their own, so for a
+    cross-origin request from outside ``origins`` their Access-Control-*
+    headers are dropped; the browser then rejects it (preflight included)
+    just as the combined app's CORS policy would.
+    """
+
+    def __init__(self, app, mounts, origins=()):
+        self.app = app
+        self.mounts = mounts
+        self.origins = set(origins)
+
+    def resolve(self, path):
+        for mount, get_service, target in self.mounts:
+            if path == mount or (mount.endswith("/") and path.startswith(mount)):
+                return get_service(), target
+        return None, None
+
+    def __call__(self, environ, start_response):
+        service, target = self.resolve(environ.get("PATH_INFO", ""))
+        if service is None:
+            return self.app(environ, start_response)
+        if target:
+            environ["PATH_INFO"] = target
+        origin = environ.get("HTTP_ORIGIN")
+        if origin and origin not in self.origins:
+            start_response = self.without_cors_headers(start_response)
+        return service.wsgi_app(environ, start_response)
+
+    @staticmethod
+    def without_cors_headers(start_response):
+        def strip(status, headers, exc_info=None):
+            headers = [(k, v) for k, v in headers if not k.lower().startswith("access-control-")]
+            return start_response(status, headers, exc_info)
+        return strip
+
+
+app.wsgi_app = ServiceDispatcher(app.wsgi_app, MOUNTS, CORS_ORIGINS)
+
+# Reached only when the owning service failed to load
 @app.route('/api/fir/<path:path>', methods=['GET', 'POST', 'PUT'])
 @app.route('/api/fir/', methods=['GET', 'POST', 'PUT'], defaults={'path': ''})
-def fir_proxy(path):
-    if fir_app:
-        try:
-            with fir_app.test_request_context(path=request.path, method=request.method, 
-                                            headers=dict(request.headers), data=request.get_data()):
-                return fir_app.full_dispatch_request()
-        except Exception as e:
-            return jsonify({"error": f"FIR service error: {str(e)}"}), 500
+def fir_unavailable(path):
     return jsonify({"error": "FIR service unavailable"}), 503
 
-# Proxy routes for Chatbot API
 @app.route('/api/chat', methods=['POST'])
+@app.route('/api/chat/stream', methods=['POST'])
 @app.route('/api/register', methods=['POST']) 
 @app.route('/api/login', methods=['POST'])
 @app.route('/api/health/chatbot', methods=['GET'])
-def chatbot_proxy():
-    if chatbot_app:
-        try:
-            with chatbot_app.test_request_context(path=request.path, method=request.method,
-                                                headers=dict(request.headers), data=request.get_data()):
-                return chatbot_app.full_dispatch_request()
-        except Exception as e:
-            return jsonify({"error": f"Chatbot service error: {str(e)}"}), 500
+def chatbot_unavailable():
     return jsonify({"error": "Chatbot service unavailable"}), 503
 
-# Police endpoints proxy
 @app.route('/api/police/<path:path>', methods=['GET', 'POST', 'PUT'])
-def police_proxy(path):
-    if fir_app:
-        try:
-            with fir_app.test_request_context(path=request.path, method=request.method,
-                                            headers=dict(request.headers), data=request.get_data()):
-                return fir_app.full_dispatch_request()
-        except Exception as e:
-            return jsonify({"error": f"Police service error: {str(e)}"}), 500
+def police_unavailable(path):
     return jsonify({"error": "Police service unavailable"}), 503
 
-# Initialize services when app starts
+# Initialize services when app starts; models and indexes warm in the background
 with app.app_context():
     initialize_services()
+registry.start()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 7860))
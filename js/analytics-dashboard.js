@@ -55,34 +55,33 @@ if (csvBtn) {
             this.showLoading();
             console.log(`📊 Generating analytics for range: ${range}`);
             
-            // Fetch main analytics data
-            const analyticsResponse = await fetch(`${this.apiBase}/analytics?range=${range}`);
+            // Analytics and status distribution in one round trip (queried concurrently server-side)
+            const bundleResponse = await fetch(`${this.apiBase}/dashboard/bundle?sections=analytics,status_distribution&range=${range}`);
             
             // Check if response is JSON
-            const contentType = analyticsResponse.headers.get('content-type');
+            const contentType = bundleResponse.headers.get('content-type');
             if (!contentType || !contentType.includes('application/json')) {
                 throw new Error('Server returned non-JSON response');
             }
             
-            const analyticsData = await analyticsResponse.json();
+            const bundle = await bundleResponse.json();
+            const sections = bundle.sections || {};
+            const analyticsData = sections.analytics || {
+                success: false,
+                error: bundle.error || (bundle.errors && bundle.errors.analytics)
+            };
 
             console.log('📈 Analytics API Response:', analyticsData);
 
             if (analyticsData.success && analyticsData.analytics) {
                 this.analyticsData = analyticsData.analytics;
                 
-                // Try to fetch status distribution, but don't fail if it doesn't exist
-                try {
-                    const statusResponse = await fetch(`${this.apiBase}/analytics/status-distribution`);
-                    if (statusResponse.ok) {
-                        const statusData = await statusResponse.json();
-                        if (statusData.success && statusData.distribution) {
-                            this.analyticsData.status_distribution = statusData.distribution;
-                        }
-                    }
-                } catch (statusError) {
-                    console.warn('Status distribution API not available:', statusError);
-                    // Calculate basic status distribution from available data
+                // Status distribution is optional; fall back to a basic estimate
+                const statusData = sections.status_distribution;
+                if (statusData && statusData.success && statusData.distribution) {
+                    this.analyticsData.status_distribution = statusData.distribution;
+                } else {
+                    console.warn('Status distribution not available:', bundle.errors && bundle.errors.status_distribution);
                     this.analyticsData.status_distribution = this.calculateBasicStatusDistribution(this.analyticsData);
                 }
                 
@@ -4,6 +4,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const sendBtn = document.getElementById('sendBtn');
 
     const API_URL = '/api/chat';
+    const STREAM_URL = '/api/chat/stream';
 
     async function sendMessage() {
         const message = userInput.value.trim();
@@ -17,21 +18,15 @@ document.addEventListener('DOMContentLoaded', function() {
         showTypingIndicator();
 
         try {
-            const response = await fetch(API_URL, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ message: message })
-            });
-
-            const data = await response.json();
-            removeTypingIndicator();
-
-            if (data.success) {
-                addMessage(data.response, 'bot');
-            } else {
-                addMessage(data.response || 'Sorry, I encountered an error. Please try again.', 'bot');
+            let rendered = false;
+            try {
+                rendered = await streamMessage(message);
+            } catch (streamError) {
+                console.warn('Streaming chat unavailable, falling back:', streamError);
+            }
+            if (!rendered) {
+                await requestMessage(message);
             }
-
         } catch (error) {
             removeTypingIndicator();
             addMessage('Sorry, the chatbot service is currently unavailable. Please try again later.', 'bot');
@@ -43,12 +38,92 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Render the answer progressively from server-sent events.
+    // Returns false if nothing was rendered so the caller can fall back to /api/chat.
+    async function streamMessage(message) {
+        const response = await fetch(STREAM_URL, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message: message })
+        });
+        if (!response.ok || !response.body) {
+            throw new Error(`Stream request failed: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let botDiv = null;
+        let text = '';
+
+        const render = (value) => {
+            if (!botDiv) {
+                removeTypingIndicator();
+                botDiv = addMessage('', 'bot');
+            }
+            botDiv.textContent = value;
+            chatMessages.scrollTop = chatMessages.scrollHeight;
+        };
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                frame.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                const payload = data ? JSON.parse(data) : {};
+
+                if (event === 'token') {
+                    text += payload.text || '';
+                    render(text);
+                } else if (event === 'reset') {
+                    text = '';
+                    if (botDiv) botDiv.textContent = '';
+                } else if (event === 'error') {
+                    render(payload.response || 'Sorry, I encountered an error. Please try again.');
+                    return true;
+                } else if (event === 'done') {
+                    return botDiv !== null;
+                }
+            }
+        }
+        return botDiv !== null;
+    }
+
+    async function requestMessage(message) {
+        const response = await fetch(API_URL, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message: message })
+        });
+
+        const data = await response.json();
+        removeTypingIndicator();
+
+        if (data.success) {
+            addMessage(data.response, 'bot');
+        } else {
+            addMessage(data.response || 'Sorry, I encountered an error. Please try again.', 'bot');
+        }
+    }
+
     function addMessage(text, sender) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${sender}-message`;
         messageDiv.textContent = text;
         chatMessages.appendChild(messageDiv);
         chatMessages.scrollTop = chatMessages.scrollHeight;
+        return messageDiv;
     }
 
     function showTypingIndicator() {
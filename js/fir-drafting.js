@@ -529,7 +529,8 @@ function populateReviewData() {
                 }
             });
             
-            // Generate PDF
+            // Generate PDF (rendered in the background; the job is polled below)
+            formData.async = true;
             const response = await fetch(`${FIR_API_URL}/generate-pdf`, {
                 method: 'POST',
                 headers: {
@@ -557,6 +558,9 @@ function populateReviewData() {
                         </div>
                     `;
                 }
+                if (data.job_id) {
+                    waitForPdfJob(data.job_id, data.fir_number, completionStep?.querySelector('.download-section:last-child .download-btn'));
+                }
             } else {
                 alert('Error generating FIR: ' + (data.error || 'Unknown error'));
             }
@@ -569,6 +573,56 @@ function populateReviewData() {
         }
     }
     
+    // Whether the FIR's PDF can already be downloaded (HEAD, no body)
+    async function pdfAvailable(firNumber) {
+        try {
+            const response = await fetch(`${FIR_API_URL}/download/${firNumber.replace(/\//g, '_')}`, { method: 'HEAD' });
+            return response.ok;
+        } catch (error) {
+            return false;
+        }
+    }
+    
+    // Keep the download button disabled until the background PDF job finishes
+    async function waitForPdfJob(jobId, firNumber, downloadBtn) {
+        const originalLabel = downloadBtn ? downloadBtn.innerHTML : '';
+        if (downloadBtn) {
+            downloadBtn.disabled = true;
+            downloadBtn.innerHTML = '<i class="material-icons">hourglass_empty</i> Preparing PDF...';
+        }
+        
+        try {
+            for (let attempt = 0; attempt < 120; attempt++) {
+                const response = await fetch(`${FIR_API_URL}/jobs/${jobId}`);
+                const data = await response.json();
+                let status = data.job ? data.job.status : 'failed';
+                if (response.status === 404) {
+                    // Job unknown here (expired, or queued on another worker): go by the PDF itself
+                    status = await pdfAvailable(firNumber) ? 'done' : 'unknown';
+                }
+                
+                if (status === 'done') {
+                    if (downloadBtn) {
+                        downloadBtn.disabled = false;
+                        downloadBtn.innerHTML = originalLabel;
+                    }
+                    return;
+                }
+                if (status === 'failed') {
+                    throw new Error((data.job && data.job.error) || data.error || 'PDF generation failed');
+                }
+                await new Promise(resolve => setTimeout(resolve, 500));
+            }
+            throw new Error('PDF generation is taking longer than expected');
+        } catch (error) {
+            if (downloadBtn) {
+                downloadBtn.innerHTML = originalLabel;
+                downloadBtn.disabled = false;
+            }
+            alert('Error preparing FIR PDF: ' + error.message);
+        }
+    }
+    
     // Download FIR
     window.downloadFIR = function() {
         if (!currentFIRNumber) {
@@ -1,8 +1,17 @@
 // Police Dashboard Main Controller - COMPLETE VERSION (URLs Fixed)
+
+// Tabs that read several dashboard sections get them in one bundle request when first opened
+const TAB_BUNDLE_SECTIONS = {
+    'case-management': ['pending', 'updates']
+};
+
 class PoliceDashboard {
     constructor() {
         this.currentTab = 'draft-fir';
         this.apiBase = '/api/police'; // ✅ Fixed: Relative URL
+        this.bundledTabs = new Set();
+        this.bundleRequests = {};
+        this.bundleMaxAge = 30000;
         this.init();
     }
 
@@ -125,8 +134,53 @@ class PoliceDashboard {
             .replace(/'/g, '&#39;');
     }
 
+    // First visit to a multi-section tab: one bundle request; the server runs the queries concurrently
+    prefetchTabBundle(tabName) {
+        const sections = TAB_BUNDLE_SECTIONS[tabName];
+        if (!sections || this.bundledTabs.has(tabName)) return;
+
+        this.bundledTabs.add(tabName);
+        const request = this.loadDashboardBundle(sections);
+        sections.forEach(name => { this.bundleRequests[name] = request; });
+    }
+
+    async loadDashboardBundle(sections) {
+        try {
+            const response = await fetch(`${this.apiBase}/dashboard/bundle?sections=${sections.join(',')}&range=month&months=6`);
+            const data = await response.json();
+            if (!data.success) return null;
+
+            if (data.partial) {
+                console.warn('⚠️ Dashboard bundle sections unavailable:', data.errors);
+            }
+            return { sections: data.sections || {}, loadedAt: Date.now() };
+        } catch (error) {
+            console.error('Failed to load dashboard bundle:', error);
+            return null;
+        }
+    }
+
+    // Section payload from an in-flight or fresh bundle that includes it (used once), or null to fetch it directly
+    async takeBundledSection(name) {
+        const request = this.bundleRequests[name];
+        if (!request) return null;
+        delete this.bundleRequests[name];
+
+        const bundle = await request;
+        if (!bundle || Date.now() - bundle.loadedAt > this.bundleMaxAge) return null;
+        return bundle.sections[name] || null;
+    }
+
+    async fetchSection(name, url) {
+        const bundled = await this.takeBundledSection(name);
+        if (bundled) return bundled;
+        const response = await fetch(url);
+        return response.json();
+    }
+
     async loadTabData(tabName) {
         try {
+            this.prefetchTabBundle(tabName);
             switch(tabName) {
                 case 'case-management':
                     await this.loadCaseManagement();
@@ -194,8 +248,7 @@ class PoliceDashboard {
 
     async loadAnalyticsDirect() {
         try {
-            const response = await fetch('/api/police/analytics?range=month'); // ✅ Fixed: Relative URL
-            const data = await response.json();
+            const data = await this.fetchSection('analytics', '/api/police/analytics?range=month'); // ✅ Fixed: Relative URL
             
             if (data.success && data.analytics) {
                 this.displayBasicAnalytics(data.analytics);
@@ -382,8 +435,7 @@ class PoliceDashboard {
 
     async loadDashboardOverview() {
         try {
-            const response = await fetch(`${this.apiBase}/dashboard/overview`);
-            const data = await response.json();
+            const data = await this.fetchSection('overview', `${this.apiBase}/dashboard/overview`);
 
             if (data.success) {
                 this.updateDashboardStats(data.overview);
@@ -452,8 +504,7 @@ class PoliceDashboard {
             content.style.display = "none";
 
             // show last 6 months by default (server supports ?months=N)
-            const response = await fetch(`${this.apiBase}/cases/pending?months=6`);
-            const data = await response.json();
+            const data = await this.fetchSection('pending', `${this.apiBase}/cases/pending?months=6`);
 
             loader.style.display = "none";
             content.style.display = "block";
@@ -601,8 +652,7 @@ class PoliceDashboard {
             loader.style.display = "flex";
             content.style.display = "none";
 
-            const response = await fetch(`${this.apiBase}/cases/updates`);
-            const data = await response.json();
+            const data = await this.fetchSection('updates', `${this.apiBase}/cases/updates`);
 
             loader.style.display = "none";
             content.style.display = "block";
@@ -674,8 +724,7 @@ class PoliceDashboard {
         try {
             this.showLoading('analyticsResults', 'Fetching crime analytics...');
 
-            const response = await fetch(`${this.apiBase}/analytics?range=month`);
-            const data = await response.json();
+            const data = await this.fetchSection('analytics', `${this.apiBase}/analytics?range=month`);
 
             if (!data.success || !data.analytics) {
                 this.showError('analyticsResults', 'No analytics data available');
@@ -774,8 +823,7 @@ class PoliceDashboard {
         try {
             this.showLoading('hotspotsList', 'Loading crime hotspots...');
             
-            const response = await fetch(`${this.apiBase}/analytics/hotspots`);
-            const data = await response.json();
+            const data = await this.fetchSection('hotspots', `${this.apiBase}/analytics/hotspots`);
 
             if (data.success) {
                 this.displayHotspots(data.hotspots);
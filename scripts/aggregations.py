@@ -0,0 +1,90 @@
+import logging
+from collections import Counter
+
+from scripts.supabase_client import keyset_scan, missing_rpc
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+GROUPABLE_COLUMNS = ("status", "incident_type", "incident_location", "police_station", "district")
+
+_rpc_available = True
+
+
+def _date_range(query, start_date=None, end_date=None):
+    if start_date:
+        query = query.gte('incident_date', start_date)
+    if end_date:
+        query = query.lte('incident_date', end_date)
+    return query
+
+
+def _rpc_group_counts(supabase, column, start_date, end_date):
+    response = supabase.rpc("fir_group_counts", {
+        "p_column": column,
+        "p_start_date": start_date,
+        "p_end_date": end_date,
+    }).execute()
+    return {row["key"]: int(row["count"]) for row in response.data or []}
+
+
+def scan_group_counts(supabase, columns, apply_filters=lambda query: query):
+    """{column: {raw value: count}} counted locally from a keyset-paged projection
+    of just the grouped columns; ``apply_filters`` narrows the fir_records query"""
+    counters = {column: Counter() for column in columns}
+    rows = keyset_scan(
+        lambda: apply_filters(supabase.table("fir_records").select(",".join(["id", *columns]))),
+        [("id", False)],
+    )
+    for row in rows:
+        for column in columns:
+            counters[column][row.get(column)] += 1
+    return {column: dict(counter) for column, counter in counters.items()}
+
+
+def group_counts_by(supabase, columns, start_date=None, end_date=None, missing="Unknown"):
+    """{column: {value: count}} over fir_records, optionally limited to an incident_date range.
+
+    Grouping runs in the database through the fir_group_counts RPC
+    (sql/fir_aggregations.sql), so only one row per bucket is transferred.
+    Without the RPC the columns are counted from a single paged scan that
+    selects only them; a missing function switches to scans for the rest of
+    the process, any other RPC error only for this call. NULL and empty values are counted under ``missing``;
+    pass ``missing=None`` to drop them.
+    """
+    global _rpc_available
+    for column in columns:
+        if column not in GROUPABLE_COLUMNS:
+            raise ValueError(f"Cannot group FIR records by {column!r}")
+
+    raw = None
+    if _rpc_available:
+        try:
+            raw = {column: _rpc_group_counts(supabase, column, start_date, end_date) for column in columns}
+        except Exception as e:
+            if missing_rpc(e):
+                _rpc_available = False
+                logger.warning("⚠️ fir_group_counts RPC not installed, counting from paged scans")
+            else:
+                logger.warning(f"⚠️ fir_group_counts RPC failed, counting from a paged scan: {e}")
+    if raw is None:
+        raw = scan_group_counts(supabase, columns, lambda query: _date_range(query, start_date, end_date))
+
+    result = {}
+    for column, counts in raw.items():
+        buckets = {}
+        for key, count in counts.items():
+            key = key or missing
+            if key is not None:
+                buckets[key] = buckets.get(key, 0) + count
+        result[column] = buckets
+    return result
+
+
+def group_counts(supabase, column, start_date=None, end_date=None, missing="Unknown"):
+    """{value: count} for one column; see group_counts_by"""
+    return group_counts_by(supabase, [column], start_date, end_date, missing)[column]
+
+
+def top_buckets(counts, n):
+    return dict(Counter(counts).most_common(n))
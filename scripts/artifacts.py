@@ -0,0 +1,158 @@
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 1
+KB_ARTIFACT = os.path.join("vector_store", "kb")
+FIR_SECTIONS_ARTIFACT = os.path.join("models", "fir_sections")
+VERIFY_VECTORS = os.getenv("ARTIFACT_VERIFY", "0") == "1"
+
+
+class ArtifactError(Exception):
+    """Raised when an embedding artifact is missing, stale or corrupt."""
+
+
+def artifact_paths(prefix):
+    return {
+        "vectors": f"{prefix}.vectors.npy",
+        "meta": f"{prefix}.meta.json",
+        "manifest": f"{prefix}.manifest.json",
+    }
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def save_artifact(prefix, vectors, metadata, model_name=None):
+    """Write L2-normalized vectors (.npy), metadata (.meta.json) and a checksum manifest.
+
+    The manifest is written last, so readers never see a half-written artifact.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.ascontiguousarray(vectors / np.maximum(norms, 1e-12))
+
+    paths = artifact_paths(prefix)
+    if os.path.dirname(prefix):
+        os.makedirs(os.path.dirname(prefix), exist_ok=True)
+
+    _atomic_write(paths["vectors"], lambda f: np.save(f, vectors, allow_pickle=False))
+    meta_bytes = json.dumps(metadata, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    _atomic_write(paths["meta"], lambda f: f.write(meta_bytes))
+
+    manifest = {
+        "version": ARTIFACT_VERSION,
+        "model": model_name,
+        "count": int(vectors.shape[0]),
+        "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "normalized": True,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "files": {
+            name: {
+                "path": os.path.basename(paths[name]),
+                "bytes": os.path.getsize(paths[name]),
+                "sha256": file_sha256(paths[name]),
+            }
+            for name in ("vectors", "meta")
+        },
+    }
+    manifest_bytes = json.dumps(manifest, indent=2).encode("utf-8")
+    _atomic_write(paths["manifest"], lambda f: f.write(manifest_bytes))
+
+    logger.info(f"✅ Saved artifact {prefix} ({manifest['count']} x {manifest['dim']})")
+    return manifest
+
+
+def load_manifest(prefix):
+    path = artifact_paths(prefix)["manifest"]
+    if not os.path.exists(path):
+        raise ArtifactError(f"Artifact manifest not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != ARTIFACT_VERSION:
+        raise ArtifactError(f"Unsupported artifact version {manifest.get('version')} in {path}")
+    return manifest
+
+
+def load_artifact(prefix, mmap=True, verify_vectors=VERIFY_VECTORS):
+    """Return (vectors, metadata, manifest) for an artifact written by save_artifact.
+
+    Vectors are memory-mapped read-only by default so forked workers share the
+    same pages. The metadata checksum is always checked; hashing the vector file
+    is opt-in (ARTIFACT_VERIFY=1) because it would touch every page at startup.
+    """
+    manifest = load_manifest(prefix)
+    paths = artifact_paths(prefix)
+
+    for name in ("vectors", "meta"):
+        expected = manifest["files"][name]
+        if not os.path.exists(paths[name]):
+            raise ArtifactError(f"Artifact file missing: {paths[name]}")
+        if os.path.getsize(paths[name]) != expected["bytes"]:
+            raise ArtifactError(f"Artifact file size mismatch: {paths[name]}")
+
+    if file_sha256(paths["meta"]) != manifest["files"]["meta"]["sha256"]:
+        raise ArtifactError(f"Artifact checksum mismatch: {paths['meta']}")
+    if verify_vectors and file_sha256(paths["vectors"]) != manifest["files"]["vectors"]["sha256"]:
+        raise ArtifactError(f"Artifact checksum mismatch: {paths['vectors']}")
+
+    vectors = np.load(paths["vectors"], mmap_mode="r" if mmap else None, allow_pickle=False)
+    if vectors.shape != (manifest["count"], manifest["dim"]):
+        raise ArtifactError(f"Artifact shape mismatch: {vectors.shape} in {paths['vectors']}")
+
+    with open(paths["meta"], "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    return vectors, metadata, manifest
+
+
+def artifact_fingerprint(prefix):
+    """Vectors checksum from the manifest, or None if the artifact does not exist."""
+    try:
+        return load_manifest(prefix)["files"]["vectors"]["sha256"]
+    except (ArtifactError, OSError, ValueError, KeyError):
+        return None
+
+
+def migrate_legacy(kb_pickle="embeddings.pkl", fir_pickle=os.path.join("models", "fir_embeddings.pkl")):
+    """Convert the legacy pickled embeddings into versioned artifacts."""
+    import pickle
+
+    if os.path.exists(kb_pickle):
+        with open(kb_pickle, "rb") as f:
+            df, embeddings = pickle.load(f)
+        save_artifact(KB_ARTIFACT, embeddings, df.to_dict(orient="list"), model_name="all-MiniLM-L6-v2")
+
+    if os.path.exists(fir_pickle):
+        with open(fir_pickle, "rb") as f:
+            knowledge_base, embeddings = pickle.load(f)
+        save_artifact(FIR_SECTIONS_ARTIFACT, embeddings, list(knowledge_base), model_name="all-MiniLM-L6-v2")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        logging.basicConfig(level=logging.INFO)
+        migrate_legacy()
+    else:
+        print("Usage: python -m scripts.artifacts migrate")
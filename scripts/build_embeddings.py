@@ -1,13 +1,17 @@
 import os
+import sys
 import pandas as pd
 import numpy as np
 from tqdm import tqdm
 from sentence_transformers import SentenceTransformer
-import pickle
+
+# Allow `python scripts/build_embeddings.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.kb_index import INDEX_MODE, build_index, save_index
+from scripts.artifacts import KB_ARTIFACT, load_artifact, save_artifact
 
 # Paths
 DATA_FILE = os.path.join("combined_knowledge.csv")
-EMB_FILE = os.path.join("embeddings.pkl")
 
 def build():
     print(f"[INFO] Loading {DATA_FILE}")
@@ -36,11 +40,16 @@ def build():
     # Generate embeddings
     embeddings = model.encode(texts, convert_to_numpy=True, show_progress_bar=True)
 
-    # Save embeddings + dataframe
-    with open(EMB_FILE, "wb") as f:
-        pickle.dump((df, embeddings), f)
+    # Save normalized embeddings + dataframe columns as a versioned artifact
+    save_artifact(KB_ARTIFACT, embeddings, df.to_dict(orient="list"), model_name="all-MiniLM-L6-v2")
+
+    print(f"[INFO] Saved embeddings artifact to {KB_ARTIFACT}.*")
 
-    print(f"[INFO] Saved embeddings to {EMB_FILE}")
+    # Build ANN index (KB_INDEX_MODE: flat, hnsw, ivf)
+    if INDEX_MODE != "exact":
+        normalized, _, _ = load_artifact(KB_ARTIFACT)
+        save_index(build_index(normalized, INDEX_MODE))
+        print(f"[INFO] Saved {INDEX_MODE} FAISS index")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,292 @@
+import os
+import re
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 1024))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 6 * 3600))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.95))
+
+FIR_CACHE_ENABLED = os.getenv("FIR_CACHE_ENABLED", "1") == "1"
+FIR_CACHE_SIZE = int(os.getenv("FIR_CACHE_SIZE", 2048))
+FIR_CACHE_TTL = float(os.getenv("FIR_CACHE_TTL", 60))
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss counters.
+
+    ``on_evict(key, value)`` is called, outside the cache lock, for entries
+    dropped because the cache is full or their TTL ran out.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300, on_evict=None):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evicted(self, items):
+        if self.on_evict:
+            for key, value in items:
+                self.on_evict(key, value)
+
+    def get(self, key, default=None):
+        expired = []
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                del self._data[key]
+                expired.append((key, item[1]))
+            self.misses += 1
+        self._evicted(expired)
+        return default
+
+    def peek(self, key, default=None):
+        """Live value for ``key`` without touching LRU order or counters."""
+        with self._lock:
+            item = self._data.get(key)
+            return item[1] if item is not None and item[0] > time.monotonic() else default
+
+    def set(self, key, value):
+        evicted = []
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+                self.evictions += 1
+        self._evicted(evicted)
+
+    def touch(self, key):
+        """Mark a key as recently used without affecting hit/miss counters."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+
+    def pop(self, key):
+        with self._lock:
+            item = self._data.pop(key, None)
+            return item[1] if item is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def items(self):
+        """Live (key, value) pairs, oldest first; does not touch LRU order or counters."""
+        now = time.monotonic()
+        with self._lock:
+            return [(k, v) for k, (expires, v) in self._data.items() if expires > now]
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def normalize_query(text):
+    """Case/whitespace/punctuation-insensitive cache key for a chat message."""
+    text = re.sub(r"[^\w\s]", " ", str(text).lower())
+    return " ".join(text.split())
+
+
+class AnswerCache:
+    """Chat answer cache keyed by normalized query text.
+
+    Exact hits are a dictionary lookup. With an embedder, a miss falls back
+    to the most similar cached query whose cosine similarity is at least
+    ``similarity``; numbers in the query (section numbers, years) must match
+    exactly, so "bail for 379" never answers "bail for 380". The whole cache
+    is dropped when ``fingerprint()`` (e.g. the KB artifact checksum) changes.
+
+    Query vectors live in a matrix preallocated with one row per entry; a
+    store writes its row and an eviction frees it, so a miss is scored with
+    a single matrix-vector product.
+    """
+
+    def __init__(self, embedder=None, fingerprint=None, max_entries=ANSWER_CACHE_SIZE,
+                 ttl=ANSWER_CACHE_TTL, similarity=ANSWER_CACHE_SIMILARITY, check_interval=5.0):
+        self.embedder = embedder
+        self.similarity = similarity
+        self._entries = LRUTTLCache(max_entries, ttl, on_evict=self._release_slot)
+        self._lock = threading.RLock()
+        self._matrix = None  # allocated on the first stored vector, once its dimension is known
+        self._reset_slots()
+        self._fingerprint_fn = fingerprint
+        self._fingerprint = fingerprint() if fingerprint else None
+        self._check_interval = check_interval
+        self._next_check = time.monotonic() + check_interval
+        self.semantic_hits = 0
+
+    def _check_fingerprint(self):
+        if not self._fingerprint_fn or time.monotonic() < self._next_check:
+            return
+        self._next_check = time.monotonic() + self._check_interval
+        current = self._fingerprint_fn()
+        if current != self._fingerprint:
+            logger.info("🧹 Knowledge base changed, clearing answer cache")
+            self.clear()
+            self._fingerprint = current
+
+    def _reset_slots(self):
+        size = self._entries.max_entries
+        self._slots = {}
+        self._slot_keys = [None] * size
+        self._free = list(range(size - 1, -1, -1))
+        if self._matrix is not None:
+            self._matrix[:] = 0
+
+    def _place(self, key, vector):
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._free.pop()
+            self._slots[key] = slot
+            self._slot_keys[slot] = key
+        if self._matrix is None:
+            self._matrix = np.zeros((len(self._slot_keys), len(vector)), dtype=np.float32)
+        self._matrix[slot] = vector
+
+    def _release_slot(self, key, entry=None):
+        with self._lock:
+            if entry is not None and self._entries.peek(key) is not None:
+                return  # evicted entry was stored again meanwhile; its row is current
+            slot = self._slots.pop(key, None)
+            if slot is not None:
+                self._slot_keys[slot] = None
+                self._matrix[slot] = 0
+                self._free.append(slot)
+
+    @staticmethod
+    def _signature(key):
+        return tuple(re.findall(r"\d+[a-z]*", key))
+
+    def lookup(self, query):
+        """Return (entry, query_vector). entry is None on a miss; pass the vector back to store()."""
+        self._check_fingerprint()
+        key = normalize_query(query)
+        if not key:
+            return None, None
+
+        entry = self._entries.get(key)
+        if entry is not None or not self.embedder or self.similarity >= 1:
+            return entry, None
+
+        vector = self.embedder.encode(key, normalize_embeddings=True)
+        signature = self._signature(key)
+        with self._lock:
+            if not self._slots:
+                return None, vector
+            scores = self._matrix @ vector
+            above = np.flatnonzero(scores >= self.similarity)
+            # Best-scoring live entry whose numbers match; freed rows are zero and score 0
+            for slot in above[np.argsort(-scores[above])]:
+                entry = self._entries.peek(self._slot_keys[slot])
+                if entry is not None and entry["signature"] == signature:
+                    self._entries.touch(entry["key"])
+                    self.semantic_hits += 1
+                    return entry, vector
+        return None, vector
+
+    def store(self, query, response, source, vector=None):
+        key = normalize_query(query)
+        if not key:
+            return
+        if vector is None and self.embedder and self.similarity < 1:
+            vector = self.embedder.encode(key, normalize_embeddings=True)
+        with self._lock:
+            self._entries.set(key, {
+                "key": key,
+                "response": response,
+                "source": source,
+                "signature": self._signature(key),
+            })
+            if vector is not None:
+                self._place(key, vector)
+            else:
+                self._release_slot(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._reset_slots()
+
+    def stats(self):
+        return {**self._entries.stats(), "semantic_hits": self.semantic_hits, "similarity_threshold": self.similarity}
+
+
+class FIRRecordCache:
+    """Read-through cache for full FIR records and case activity timelines.
+
+    Write paths call ``invalidate(fir_number)``; the TTL only bounds
+    staleness from writes made outside this process. A load that overlaps
+    an invalidation is returned but not stored, so a slow read cannot put
+    pre-write data back into the cache. Misses (unknown FIRs) are not cached.
+    """
+
+    def __init__(self, max_entries=FIR_CACHE_SIZE, ttl=FIR_CACHE_TTL):
+        self.records = LRUTTLCache(max_entries, ttl)
+        self.timelines = LRUTTLCache(max_entries, ttl)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _read_through(self, cache, key, load):
+        value = cache.get(key)
+        if value is not None:
+            return value
+        generation = self._generation
+        value = load()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    cache.set(key, value)
+        return value
+
+    def record(self, fir_number, load):
+        """Cached full record, or ``load()`` (returning the record or None) on a miss."""
+        return self._read_through(self.records, fir_number, load)
+
+    def timeline(self, fir_number, load):
+        """Cached case_activities list, or ``load()`` on a miss."""
+        return self._read_through(self.timelines, fir_number, load)
+
+    def invalidate(self, fir_number):
+        with self._lock:
+            self._generation += 1
+            self.records.pop(fir_number)
+            self.timelines.pop(fir_number)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.records.clear()
+            self.timelines.clear()
+
+    def stats(self):
+        return {"records": self.records.stats(), "timelines": self.timelines.stats()}
@@ -1,9 +1,11 @@
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 import json
-from sentence_transformers import SentenceTransformer
 import numpy as np
 from sklearn.cluster import DBSCAN
+from scripts.embedding_service import get_embedding_service
+from scripts.aggregations import group_counts, top_buckets
+from scripts.rollups import rollup_counts, rollup_total
 
 def parse_utc(dt_str, as_date=False):
     """Parse datetime or date string to UTC-aware datetime safely."""
@@ -28,7 +30,7 @@ def parse_utc(dt_str, as_date=False):
 class CaseAnalyzer:
     def __init__(self, supabase_client):
         self.supabase = supabase_client
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        self.embedder = get_embedding_service()
     
     def analyze_case(self, case_data):
         """Analyze a single case for priority and action items"""
@@ -233,15 +235,7 @@ class CaseAnalyzer:
     def identify_hotspots(self):
         """Identify crime hotspots"""
         try:
-            response = self.supabase.table("fir_records")\
-                .select("incident_location")\
-                .execute()
-            
-            locations = [case['incident_location'] for case in response.data if case.get('incident_location')]
-            location_counts = {}
-            
-            for location in locations:
-                location_counts[location] = location_counts.get(location, 0) + 1
+            location_counts = group_counts(self.supabase, "incident_location", missing=None)
             
             # Return hotspots with more than 2 cases
             hotspots = {loc: count for loc, count in location_counts.items() if count > 2}
@@ -254,57 +248,35 @@ class CaseAnalyzer:
         """Get comprehensive statistics"""
         try:
             # Calculate date range
-            if time_range == 'day':
-                start_date = datetime.now(timezone.utc) - timedelta(days=1)
-            elif time_range == 'week':
-                start_date = datetime.now(timezone.utc) - timedelta(weeks=1)
-            elif time_range == 'month':
-                start_date = datetime.now(timezone.utc) - timedelta(days=30)
-            else:  # year
-                start_date = datetime.now(timezone.utc) - timedelta(days=365)
-            
-            start_date_str = start_date.strftime('%Y-%m-%d')
+            start_date, end_date, _, _ = self._period_bounds(time_range)
             
-            # Get cases in time range
-            response = self.supabase.table("fir_records")\
-                .select("*")\
-                .gte('incident_date', start_date_str)\
-                .execute()
-            
-            cases = response.data
+            # Read rollup buckets for the time range instead of every case
+            counts = rollup_counts(
+                self.supabase, start_date, end_date,
+                dimensions=['total', 'status', 'incident_type', 'incident_location'],
+            )
             
             stats = {
-                'total_cases': len(cases),
+                'total_cases': rollup_total(counts),
                 'time_range': time_range,
-                'case_types': {},
-                'resolution_rate': self._calculate_resolution_rate(cases),
-                'average_response_time': self._calculate_avg_response_time(cases),
-                'top_locations': self._analyze_location_patterns(cases),
-                'trend_comparison': self._compare_with_previous_period(time_range)
+                'case_types': counts['incident_type'],
+                'resolution_rate': self._resolution_rate_from_counts(counts),
+                'average_response_time': self._calculate_avg_response_time([]),
+                'top_locations': top_buckets(counts['incident_location'], 10),
+                'trend_comparison': self._compare_with_previous_period(time_range, rollup_total(counts))
             }
             
-            # Count by type
-            for case in cases:
-                case_type = case.get('incident_type', 'Unknown')
-                stats['case_types'][case_type] = stats['case_types'].get(case_type, 0) + 1
-            
             return stats
             
         except Exception as e:
             return {'error': str(e)}
     
-    def _calculate_resolution_rate(self, cases):
-        """Calculate case resolution rate"""
-        # Simple implementation - can be enhanced with actual status tracking
-        total = len(cases)
+    def _resolution_rate_from_counts(self, counts):
+        """Share of cases in the range whose status is resolved or closed"""
+        total = rollup_total(counts)
         if total == 0:
             return 0
-        # Assume cases older than 30 days are "resolved" for demo
-        resolved = 0
-        for case in cases:
-            created_dt = parse_utc(case.get('created_at'))
-            if created_dt and (datetime.now(timezone.utc) - created_dt).days > 30:
-                resolved += 1
+        resolved = sum(c for status, c in counts['status'].items() if status.lower() in ('resolved', 'closed'))
         return (resolved / total) * 100
     
     def _calculate_avg_response_time(self, cases):
@@ -312,10 +284,43 @@ class CaseAnalyzer:
         # This would normally use actual response time data
         return "2.5 hours"  # Placeholder
     
-    def _compare_with_previous_period(self, time_range):
-        """Compare with previous period for trends"""
-        # Implementation for trend analysis
-        return {'trend': 'stable', 'change_percentage': 0}
+    def _period_bounds(self, time_range):
+        """(start, end, previous_start, previous_end) dates; each period is exactly
+        the range's number of days, the current one ending today (UTC)"""
+        days = {'day': 1, 'week': 7, 'month': 30}.get(time_range, 365)
+        today = datetime.now(timezone.utc).date()
+        start = today - timedelta(days=days - 1)
+        previous_start = start - timedelta(days=days)
+        previous_end = start - timedelta(days=1)
+        return start.isoformat(), today.isoformat(), previous_start.isoformat(), previous_end.isoformat()
+    
+    def _compare_with_previous_period(self, time_range, current_total=None):
+        """Compare case volume with the previous period of the same length"""
+        start, end, previous_start, previous_end = self._period_bounds(time_range)
+        
+        if current_total is None:
+            current_total = rollup_total(rollup_counts(self.supabase, start, end, dimensions=['total']))
+        previous_total = rollup_total(rollup_counts(
+            self.supabase, previous_start, previous_end, dimensions=['total'],
+        ))
+        
+        if previous_total == 0:
+            change = 100.0 if current_total else 0
+        else:
+            change = round((current_total - previous_total) / previous_total * 100, 2)
+        
+        if change > 5:
+            trend = 'increasing'
+        elif change < -5:
+            trend = 'decreasing'
+        else:
+            trend = 'stable'
+        return {
+            'trend': trend,
+            'change_percentage': change,
+            'current_period': current_total,
+            'previous_period': previous_total
+        }
 
 
 # Instantiate (export) helper when imported
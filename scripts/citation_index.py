@@ -0,0 +1,113 @@
+import re
+from collections import defaultdict
+
+MAX_RANGE = 100  # widest "sections X to Y" range that is expanded
+
+_TOKEN = r"\d+[a-z]{0,2}\b"
+# "section 302", "sections 378 to 382", "ss. 302, 304 & 307", "u/s 420", "ipc 66C"
+CITATION_RE = re.compile(
+    rf"\b(?:sections?|secs?\.?|ss?\.|u\s*/\s*s\.?|ipc)\s*({_TOKEN}(?:\s*(?:,|&|\band\b|\bor\b|\bto\b|-|–)\s*{_TOKEN})*)",
+    re.IGNORECASE,
+)
+# "302 ipc", "420 of the indian penal code"
+TRAILING_RE = re.compile(rf"\b({_TOKEN})\s+(?:of\s+(?:the\s+)?)?(?:ipc|indian\s+penal\s+code)\b", re.IGNORECASE)
+PART_RE = re.compile(r"(\d+)([a-z]{0,2})|\b(to)\b|(-|–)|\b(and|or)\b", re.IGNORECASE)
+TITLE_SECTION_RE = re.compile(r"(?:^|\b)(?:Section|IPC)\s*(\d+[A-Z]{0,2})\b", re.IGNORECASE)
+DEFINITION_RE = re.compile(
+    r"^\s*(?:what\s+is|what's|whats|define|definition\s+of|meaning\s+of|explain)\s+(?:an?\s+|the\s+)?(.+?)\s*\??\s*$",
+    re.IGNORECASE,
+)
+
+
+def normalize_name(text):
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(text).lower()).split())
+
+
+def name_aliases(title):
+    """'Code of Criminal Procedure (CrPC)' -> {'code of criminal procedure crpc', 'code of criminal procedure', 'crpc'}"""
+    aliases = {normalize_name(title)}
+    match = re.match(r"^(.*?)\s*\(([^()]+)\)\s*$", str(title))
+    if match:
+        aliases.add(normalize_name(match.group(1)))
+        aliases.add(normalize_name(match.group(2)))
+    return {a for a in aliases if a}
+
+
+class CitationIndex:
+    """Load-time lookup tables from citations to knowledge-base rows.
+
+    Maps section numbers (including suffixed ones such as 66C or 376A), act
+    names and legal terms to row positions in the KB frame, so citation
+    queries resolve with dictionary lookups instead of scanning titles.
+    """
+
+    def __init__(self, df):
+        self.sections = defaultdict(list)      # "376A" -> [row, ...]
+        self.section_bases = defaultdict(set)  # 376 -> {"376", "376A", ...}
+        self.names = defaultdict(list)         # act / legal term alias -> [row, ...]
+
+        types = df["type"].tolist() if "type" in df.columns else [None] * len(df)
+        for row, (title, row_type) in enumerate(zip(df["title"].tolist(), types)):
+            if not isinstance(title, str):
+                continue
+            for number in TITLE_SECTION_RE.findall(title):
+                key = number.upper()
+                if row not in self.sections[key]:
+                    self.sections[key].append(row)
+                self.section_bases[int(re.match(r"\d+", key).group())].add(key)
+            if row_type in ("act", "legal_term"):
+                for alias in name_aliases(title):
+                    self.names[alias].append(row)
+
+    def cited_sections(self, query):
+        """Section keys cited in the query, in order, with ranges expanded.
+
+        A number joined by "and"/"or" continues the list only if the KB has
+        that section, so "section 302 and 2 more" cites just 302.
+        """
+        keys = []
+        spans = [m.group(1) for m in CITATION_RE.finditer(query)]
+        spans += [m.group(1) for m in TRAILING_RE.finditer(query)]
+
+        for span in spans:
+            parts = PART_RE.findall(span)
+            joined = False
+            i = 0
+            while i < len(parts):
+                digits, suffix, word_to, dash, word_join = parts[i]
+                if word_join:
+                    joined = True
+                if not digits:
+                    i += 1
+                    continue
+                if joined and int(digits) not in self.section_bases:
+                    break
+                joined = False
+                nxt = parts[i + 1] if i + 1 < len(parts) else None
+                end = parts[i + 2] if i + 2 < len(parts) else None
+                if nxt and (nxt[2] or nxt[3]) and end and end[0] and not suffix and not end[1]:
+                    lo, hi = int(digits), int(end[0])
+                    if lo <= hi and hi - lo <= MAX_RANGE:
+                        for base in range(lo, hi + 1):
+                            keys.extend(sorted(self.section_bases.get(base, ()), key=lambda k: (len(k), k)))
+                        i += 3
+                        continue
+                keys.append(f"{int(digits)}{suffix.upper()}")
+                i += 1
+
+        return list(dict.fromkeys(keys))
+
+    def defined_name(self, query):
+        """Rows for an act or legal term asked about directly ("what is anticipatory bail?")."""
+        match = DEFINITION_RE.match(query)
+        candidate = normalize_name(match.group(1) if match else query)
+        return list(self.names.get(candidate, []))
+
+    def resolve(self, query):
+        """KB row positions cited by the query (sections first, then acts/terms)."""
+        rows = []
+        for key in self.cited_sections(query):
+            rows.extend(self.sections.get(key, []))
+        if not rows:
+            rows = self.defined_name(query)
+        return list(dict.fromkeys(rows))
@@ -1,68 +1,72 @@
 import traceback
-from sentence_transformers import SentenceTransformer, util
+from scripts.embedding_service import get_embedding_service
+from scripts.fir_index import FIRVectorIndex
+
+FIR_INDEX_COLUMNS = "fir_number, incident_type, incident_description, incident_location, accused_description, modus_operandi, status"
 
 class CriminalMatcher:
     def __init__(self, supabase_client):
         self.supabase = supabase_client
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        self.embedder = get_embedding_service()
+        self.index = FIRVectorIndex(self.embedder)
 
     def _fetch_fir_records(self):
         """Fetch all FIR records from Supabase in real-time."""
         try:
-            response = self.supabase.table("fir_records").select(
-                "fir_number, incident_type, incident_description, incident_location, accused_description, modus_operandi, status"
-            ).execute()
+            response = self.supabase.table("fir_records").select(FIR_INDEX_COLUMNS).execute()
             return response.data or []
         except Exception as e:
             print("❌ Error fetching FIR records:", e)
             traceback.print_exc()
-            return []
+            return None
 
-    def find_similar_firs(self, case_description, top_n=5):
-        """Find similar FIRs based on semantic similarity."""
-        fir_records = self._fetch_fir_records()
-        if not fir_records:
-            return [{"message": "No FIR records found in database."}]
+    def refresh_index(self, prune=True):
+        """Bring the on-disk FIR index in line with Supabase, re-encoding only stale rows.
 
-        corpus = []
-        for fir in fir_records:
-            parts = [
-                str(fir.get("incident_type") or ""),
-                str(fir.get("incident_description") or ""),
-                str(fir.get("incident_location") or ""),
-                str(fir.get("accused_description") or ""),
-                str(fir.get("modus_operandi") or "")
-            ]
-            text = " ".join(parts)
-            corpus.append(text.strip())
+        ``prune=False`` only adds and updates, for a pass that may race with index_fir().
+        """
+        fir_records = self._fetch_fir_records()
+        if fir_records is None:
+            return None
+        return self.index.sync(fir_records, prune=prune)
 
+    def index_fir(self, fir_record):
+        """Add or refresh a single FIR in the index after it is written."""
+        try:
+            return self.index.upsert(fir_record)
+        except Exception as e:
+            print("⚠️ Could not index FIR:", e)
+            return False
 
-        # Encode query + corpus
-        query_emb = self.embedder.encode(case_description, convert_to_tensor=True)
-        corpus_emb = self.embedder.encode(corpus, convert_to_tensor=True)
+    def update_fir_status(self, fir_number, status):
+        """Keep the indexed status in sync without re-encoding the FIR."""
+        try:
+            return self.index.update_metadata(fir_number, status=status)
+        except Exception as e:
+            print("⚠️ Could not update indexed FIR status:", e)
+            return False
 
-        similarities = util.cos_sim(query_emb, corpus_emb)[0]
-        scores = similarities.cpu().tolist()
+    def find_similar_firs(self, case_description, top_n=5):
+        """Find similar FIRs based on semantic similarity."""
+        if len(self.index) == 0:
+            self.refresh_index()
+        if len(self.index) == 0:
+            return [{"message": "No FIR records found in database."}]
 
-        ranked = sorted(
-            [
-                {
-                    "fir_number": fir_records[i].get("fir_number"),
-                    "incident_type": fir_records[i].get("incident_type"),
-                    "incident_location": fir_records[i].get("incident_location"),
-                    "status": fir_records[i].get("status"),
-                    "similarity": round(score * 100, 2)
-                }
-                for i, score in enumerate(scores)
-            ],
-            key=lambda x: x["similarity"],
-            reverse=True
-        )
+        # One query encode + index lookup
+        query_emb = self.embedder.encode(case_description, normalize_embeddings=True)
 
         # ✅ Filter out irrelevant matches (below threshold)
         threshold = 50.0  # show only ≥50 % similarity
-        filtered = [r for r in ranked if r["similarity"] >= threshold]
-
-        # Limit to top N after filtering
-        return filtered[:top_n]
+        hits = self.index.search(query_emb, top_n=top_n, min_score=threshold / 100)
 
+        return [
+            {
+                "fir_number": entry.get("fir_number"),
+                "incident_type": entry.get("incident_type"),
+                "incident_location": entry.get("incident_location"),
+                "status": entry.get("status"),
+                "similarity": round(score * 100, 2)
+            }
+            for entry, score in hits
+        ]
@@ -0,0 +1,140 @@
+import os
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH", 32))
+MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", 5))
+
+
+class EmbeddingService:
+    """Process-wide SentenceTransformer wrapper.
+
+    Small ``encode`` calls coming from concurrent request threads are queued and
+    encoded together by a single worker thread. The worker waits at most
+    ``max_wait_ms`` for more requests once the first one arrives and never
+    builds a batch larger than ``max_batch_size`` texts. Calls that are already
+    a full batch (e.g. corpus builds) bypass the queue and encode directly.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.model_name = model_name
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_pid = None
+        self._worker_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """Load the underlying SentenceTransformer on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    logger.info(f"🧠 Loading embedding model: {self.model_name}")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    @property
+    def dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, sentences, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        """Drop-in replacement for ``SentenceTransformer.encode`` returning numpy arrays."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else [str(s) for s in sentences]
+
+        if not texts:
+            vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        elif len(texts) >= self.max_batch_size or kwargs:
+            vectors = self._encode_direct(texts, **kwargs)
+        else:
+            future = Future()
+            self._ensure_worker()
+            self._queue.put((texts, future))
+            vectors = future.result()
+
+        if normalize_embeddings and len(vectors):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+
+        return vectors[0] if single else vectors
+
+    def _encode_direct(self, texts, **kwargs):
+        kwargs.pop("convert_to_tensor", None)
+        vectors = self.model.encode(texts, convert_to_numpy=True, **kwargs)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so restart the worker in child processes
+        if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+            return
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+                return
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+
+            while count < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                count += len(item[0])
+
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch):
+        texts = [text for item_texts, _ in batch for text in item_texts]
+        try:
+            vectors = self._encode_direct(texts)
+        except Exception as e:
+            logger.error(f"💥 Batched encode failed for {len(texts)} texts: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for item_texts, future in batch:
+            future.set_result(vectors[offset:offset + len(item_texts)])
+            offset += len(item_texts)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service():
+    """Return the shared EmbeddingService for this process."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingService()
+    return _service
@@ -0,0 +1,58 @@
+import io
+import csv
+import json
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def ndjson_lines(rows):
+    """One JSON object per line. A failure mid-stream ends with an {"error": ...} line,
+    since the 200 status has already been sent."""
+    try:
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False, default=str) + "\n"
+    except Exception as e:
+        logger.error(f"💥 Export stream failed: {e}")
+        yield json.dumps({"error": str(e)}) + "\n"
+
+
+def csv_lines(rows, columns=None):
+    """CSV with a header row; columns default to the keys of the first row."""
+    buffer = io.StringIO()
+    writer = None
+    try:
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=columns or list(row.keys()), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow({k: _cell(v) for k, v in row.items()})
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    except Exception as e:
+        logger.error(f"💥 Export stream failed: {e}")
+        return
+    if writer is None and columns:
+        csv.writer(buffer).writerow(columns)
+        yield buffer.getvalue()
+
+
+def export_lines(rows, fmt, columns=None):
+    if fmt == "csv":
+        return csv_lines(rows, columns)
+    return ndjson_lines(rows)
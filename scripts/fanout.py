@@ -0,0 +1,57 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+FANOUT_WORKERS = int(os.getenv("DASHBOARD_FANOUT_WORKERS", 8))
+FANOUT_TIMEOUT = float(os.getenv("DASHBOARD_SECTION_TIMEOUT", 5))
+
+
+class FanOut:
+    """Run independent I/O-bound calls concurrently on a bounded thread pool.
+
+    ``run`` starts every task at once and waits for each one up to its own
+    timeout, measured from the common start, so the whole call costs the
+    slowest section rather than the sum. A section that fails or times
+    out is reported without affecting the others. Timed-out calls keep
+    their worker until they return; the pool size bounds how many can pile
+    up behind a slow database.
+    """
+
+    def __init__(self, workers=FANOUT_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fanout")
+
+    @staticmethod
+    def _timed(fn):
+        started = time.perf_counter()
+        value = fn()
+        return value, (time.perf_counter() - started) * 1000
+
+    def run(self, tasks, timeout=FANOUT_TIMEOUT, timeouts=None):
+        """tasks: {name: callable}. Returns {name: {"ok", "value"|"error", "ms", "timed_out"}}."""
+        timeouts = timeouts or {}
+        started = time.perf_counter()
+        futures = {name: self._pool.submit(self._timed, fn) for name, fn in tasks.items()}
+
+        results = {}
+        for name, future in futures.items():
+            remaining = started + timeouts.get(name, timeout) - time.perf_counter()
+            try:
+                value, ms = future.result(timeout=max(0.0, remaining))
+                results[name] = {"ok": True, "value": value, "ms": round(ms, 1), "timed_out": False}
+            except FutureTimeout:
+                future.cancel()
+                elapsed = (time.perf_counter() - started) * 1000
+                logger.warning(f"⏱️ Section {name} timed out after {elapsed:.0f} ms")
+                results[name] = {"ok": False, "error": "timed out", "ms": round(elapsed, 1), "timed_out": True}
+            except Exception as e:
+                elapsed = (time.perf_counter() - started) * 1000
+                logger.error(f"💥 Section {name} failed: {e}")
+                results[name] = {"ok": False, "error": str(e), "ms": round(elapsed, 1), "timed_out": False}
+        return results
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
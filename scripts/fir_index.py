@@ -0,0 +1,263 @@
+import os
+import hashlib
+import sqlite3
+import threading
+import logging
+
+import numpy as np
+
+from scripts.kb_index import top_k_indices
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = os.getenv("FIR_INDEX_PATH", os.path.join("models", "fir_index.sqlite3"))
+
+TEXT_FIELDS = ["incident_type", "incident_description", "incident_location", "accused_description", "modus_operandi"]
+META_FIELDS = ["incident_type", "incident_location", "status"]
+
+
+def fir_text(record):
+    """Text that is embedded for a FIR record (same fields CriminalMatcher always used)."""
+    return " ".join(str(record.get(field) or "") for field in TEXT_FIELDS).strip()
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class FIRVectorIndex:
+    """Persistent FIR embedding index keyed by fir_number and content hash.
+
+    Vectors are stored L2-normalized in SQLite so a single write is an O(1)
+    upsert. Every process keeps an in-memory matrix and pulls only rows whose
+    ``seq`` changed since its last refresh, so writes made by other workers
+    are picked up without reloading the whole index.
+    """
+
+    def __init__(self, embedder, path=INDEX_PATH):
+        self.embedder = embedder
+        self.path = path
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._entries = []
+        self._pos = {}
+        self._size = 0
+        self._last_seq = 0
+
+        self._init_db()
+        self.refresh()
+
+    # -------------------------
+    # Storage
+    # -------------------------
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fir_vectors (
+                    fir_number TEXT PRIMARY KEY,
+                    content_hash TEXT,
+                    incident_type TEXT,
+                    incident_location TEXT,
+                    status TEXT,
+                    vector BLOB,
+                    seq INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fir_vectors_seq ON fir_vectors(seq)")
+
+    def _write(self, rows):
+        """Upsert (fir_number, hash, metadata, vector) rows in one transaction."""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM fir_vectors").fetchone()[0]
+            for fir_number, digest, meta, vector in rows:
+                seq += 1
+                blob = vector.astype(np.float32).tobytes() if vector is not None else None
+                conn.execute(
+                    """
+                    INSERT INTO fir_vectors (fir_number, content_hash, incident_type, incident_location, status, vector, seq)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(fir_number) DO UPDATE SET
+                        content_hash = excluded.content_hash,
+                        incident_type = excluded.incident_type,
+                        incident_location = excluded.incident_location,
+                        status = excluded.status,
+                        vector = COALESCE(excluded.vector, fir_vectors.vector),
+                        seq = excluded.seq
+                    """,
+                    (fir_number, digest, meta.get("incident_type"), meta.get("incident_location"),
+                     meta.get("status"), blob, seq),
+                )
+
+    def _tombstone(self, fir_numbers):
+        """Mark records as deleted so every process drops them on refresh."""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM fir_vectors").fetchone()[0]
+            conn.executemany(
+                "UPDATE fir_vectors SET vector = NULL, seq = ? WHERE fir_number = ?",
+                [(seq + i + 1, fir) for i, fir in enumerate(fir_numbers)],
+            )
+
+    # -------------------------
+    # In-memory matrix
+    # -------------------------
+    def refresh(self):
+        """Apply rows changed on disk (by any process) since the last refresh."""
+        with self._lock:
+            cursor = self._conn().execute(
+                "SELECT fir_number, content_hash, incident_type, incident_location, status, vector, seq "
+                "FROM fir_vectors WHERE seq > ? ORDER BY seq",
+                (self._last_seq,),
+            )
+            for fir_number, digest, incident_type, location, status, blob, seq in cursor:
+                entry = {
+                    "fir_number": fir_number,
+                    "content_hash": digest,
+                    "incident_type": incident_type,
+                    "incident_location": location,
+                    "status": status,
+                }
+                if blob is None:
+                    self._remove(fir_number)
+                else:
+                    self._set(fir_number, entry, np.frombuffer(blob, dtype=np.float32))
+                self._last_seq = seq
+
+    def _set(self, fir_number, entry, vector):
+        if self._size == 0 and self._vectors.shape[1] != vector.shape[0]:
+            self._vectors = np.zeros((max(16, self._size), vector.shape[0]), dtype=np.float32)
+        idx = self._pos.get(fir_number)
+        if idx is None:
+            if self._size == self._vectors.shape[0]:
+                grown = np.zeros((max(16, self._size * 2), self._vectors.shape[1]), dtype=np.float32)
+                grown[:self._size] = self._vectors[:self._size]
+                self._vectors = grown
+            idx = self._size
+            self._size += 1
+            self._entries.append(entry)
+            self._pos[fir_number] = idx
+        else:
+            self._entries[idx] = entry
+        self._vectors[idx] = vector
+
+    def _remove(self, fir_number):
+        idx = self._pos.pop(fir_number, None)
+        if idx is None:
+            return
+        last = self._size - 1
+        if idx != last:
+            self._vectors[idx] = self._vectors[last]
+            self._entries[idx] = self._entries[last]
+            self._pos[self._entries[idx]["fir_number"]] = idx
+        self._entries.pop()
+        self._size -= 1
+
+    def __len__(self):
+        return self._size
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def sync(self, records, prune=True):
+        """Re-encode only new or changed records and (with ``prune``) drop ones no longer present."""
+        with self._lock:
+            self.refresh()
+            stale, texts = [], []
+            seen = set()
+            for record in records:
+                fir_number = record.get("fir_number")
+                if not fir_number:
+                    continue
+                seen.add(fir_number)
+                text = fir_text(record)
+                digest = content_hash(text)
+                idx = self._pos.get(fir_number)
+                if idx is None or self._entries[idx]["content_hash"] != digest:
+                    stale.append((fir_number, digest, record))
+                    texts.append(text)
+                elif self._entries[idx]["status"] != record.get("status"):
+                    stale.append((fir_number, digest, record))
+                    texts.append(None)
+
+            to_encode = [t for t in texts if t is not None]
+            vectors = iter(self.embedder.encode(to_encode, normalize_embeddings=True)) if to_encode else iter(())
+            rows = [
+                (fir_number, digest, record, next(vectors) if text is not None else None)
+                for (fir_number, digest, record), text in zip(stale, texts)
+            ]
+            removed = [fir for fir in self._pos if fir not in seen] if prune else []
+
+            if rows:
+                self._write(rows)
+            if removed:
+                self._tombstone(removed)
+            if rows or removed:
+                self.refresh()
+
+            logger.info(f"🗂️ FIR index synced: {len(to_encode)} encoded, {len(removed)} removed, {self._size} total")
+            return {"encoded": len(to_encode), "removed": len(removed), "total": self._size}
+
+    def upsert(self, record):
+        """Index a single FIR record, re-encoding only if its text changed."""
+        fir_number = record.get("fir_number")
+        if not fir_number:
+            return False
+        with self._lock:
+            self.refresh()
+            text = fir_text(record)
+            digest = content_hash(text)
+            idx = self._pos.get(fir_number)
+            vector = None
+            if idx is None or self._entries[idx]["content_hash"] != digest:
+                vector = self.embedder.encode(text, normalize_embeddings=True)
+            meta = dict(self._entries[idx]) if idx is not None else {}
+            meta.update({k: record[k] for k in META_FIELDS if k in record})
+            self._write([(fir_number, digest, meta, vector)])
+            self.refresh()
+            return True
+
+    def update_metadata(self, fir_number, **fields):
+        """Update stored metadata (e.g. status) without re-encoding."""
+        with self._lock:
+            self.refresh()
+            idx = self._pos.get(fir_number)
+            if idx is None:
+                return False
+            meta = dict(self._entries[idx])
+            meta.update(fields)
+            self._write([(fir_number, meta["content_hash"], meta, None)])
+            self.refresh()
+            return True
+
+    # -------------------------
+    # Search
+    # -------------------------
+    def search(self, query_vector, top_n=5, min_score=None):
+        """Return [(entry, cosine_score)] for the best matches of a normalized query vector."""
+        with self._lock:
+            self.refresh()
+            if self._size == 0:
+                return []
+            scores = self._vectors[:self._size] @ np.asarray(query_vector, dtype=np.float32)
+            top = top_k_indices(scores, top_n)
+            return [
+                (dict(self._entries[i]), float(scores[i]))
+                for i in top
+                if min_score is None or scores[i] >= min_score
+            ]
@@ -0,0 +1,205 @@
+import os
+import re
+import json
+import sqlite3
+import logging
+from datetime import datetime
+
+from scripts.supabase_client import missing_rpc
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+SEQUENCE_PATH = os.getenv("FIR_SEQUENCE_PATH", os.path.join("models", "fir_sequences.sqlite3"))
+# supabase | local; local counters live on one node's disk, so use them only for single-instance deployments
+SEQUENCE_BACKEND = os.getenv("FIR_SEQUENCE_BACKEND", "supabase")
+DEFAULT_STATION_CODE = os.getenv("FIR_STATION_CODE", "PS")
+# Optional police station name -> code map, e.g. {"Central Police Station": "CPS"}
+STATION_CODES = json.loads(os.getenv("FIR_STATION_CODES", "{}") or "{}")
+DRAFTS_DIR = os.getenv("FIR_DRAFTS_DIR", "fir_drafts")
+
+STATION_CODE_RE = re.compile(r"^[A-Z0-9]{1,10}$")
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+
+def resolve_station_code(station_code=None, police_station=None):
+    """Explicit code, else the configured code for the station name, else the default.
+
+    With FIR_STATION_CODES configured, an explicit code must be one of its
+    codes (or the default) and agree with the police station's own code.
+    """
+    configured = str(STATION_CODES.get(police_station or "") or "").strip().upper()
+    code = station_code or configured or DEFAULT_STATION_CODE
+    code = str(code).strip().upper()
+    if not STATION_CODE_RE.match(code):
+        raise ValueError(f"Invalid station code: {code!r}")
+    if station_code and STATION_CODES:
+        known = {str(c).strip().upper() for c in STATION_CODES.values()} | {DEFAULT_STATION_CODE.upper()}
+        if code not in known:
+            raise ValueError(f"Unknown station code: {code!r}")
+        if configured and code != configured:
+            raise ValueError(f"Station code {code!r} does not match {police_station!r} ({configured})")
+    return code
+
+
+def format_fir_number(station, year, month, sequence):
+    return f"{station}/{year}/{month:02d}/{sequence:04d}"
+
+
+def existing_max_sequence(station, year, month, drafts_dir=DRAFTS_DIR):
+    """Highest sequence among PDFs already on disk for the month (used once, to seed a new counter)."""
+    month_dir = os.path.join(drafts_dir, str(year), f"{month:02d}_{MONTH_NAMES[month - 1]}")
+    pattern = re.compile(rf"^{re.escape(station)}_{year}_{month:02d}_(\d+)\.pdf$")
+    highest = 0
+    if os.path.isdir(month_dir):
+        for name in os.listdir(month_dir):
+            match = pattern.match(name)
+            if match:
+                highest = max(highest, int(match.group(1)))
+    return highest
+
+
+class LocalSequenceStore:
+    """Per-station, per-month counters in SQLite.
+
+    ``BEGIN IMMEDIATE`` takes the database write lock, so threads and worker
+    processes sharing the file are serialized and every allocation gets the
+    next value exactly once.
+    """
+
+    def __init__(self, path=SEQUENCE_PATH, drafts_dir=DRAFTS_DIR):
+        self.path = path
+        self.drafts_dir = drafts_dir
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fir_sequences (
+                    station TEXT NOT NULL,
+                    year INTEGER NOT NULL,
+                    month INTEGER NOT NULL,
+                    last_value INTEGER NOT NULL,
+                    PRIMARY KEY (station, year, month)
+                )
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def next_value(self, station, year, month):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT last_value FROM fir_sequences WHERE station = ? AND year = ? AND month = ?",
+                (station, year, month),
+            ).fetchone()
+            if row is None:
+                value = existing_max_sequence(station, year, month, self.drafts_dir) + 1
+                conn.execute(
+                    "INSERT INTO fir_sequences (station, year, month, last_value) VALUES (?, ?, ?, ?)",
+                    (station, year, month, value),
+                )
+            else:
+                value = row[0] + 1
+                conn.execute(
+                    "UPDATE fir_sequences SET last_value = ? WHERE station = ? AND year = ? AND month = ?",
+                    (value, station, year, month),
+                )
+            conn.execute("COMMIT")
+            return value
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def release(self, station, year, month, value):
+        """Hand back ``value`` if it is still the latest allocation; returns True if released."""
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                "UPDATE fir_sequences SET last_value = last_value - 1 "
+                "WHERE station = ? AND year = ? AND month = ? AND last_value = ?",
+                (station, year, month, value),
+            )
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+
+class SupabaseSequenceStore:
+    """Counters in Postgres via the next_fir_sequence / release_fir_sequence
+    functions (sql/fir_sequences.sql); the row lock taken by the upsert
+    serializes allocations across every app instance.
+
+    Until those functions are installed, allocations go to ``fallback``
+    (per-node counters) with an error logged.
+    """
+
+    def __init__(self, supabase, fallback=None):
+        self.supabase = supabase
+        self.fallback = fallback
+        self._rpcs = True
+
+    def _rpc(self, name, params):
+        try:
+            return self.supabase.rpc(name, params).execute().data
+        except Exception as e:
+            if self.fallback is None or not missing_rpc(e):
+                raise
+            self._rpcs = False
+            logger.error("❌ FIR sequence functions not installed (sql/fir_sequences.sql); "
+                         "using local counters, which are only safe on a single node")
+            return None
+
+    def next_value(self, station, year, month):
+        if self._rpcs:
+            value = self._rpc("next_fir_sequence", {"p_station": station, "p_year": year, "p_month": month})
+            if self._rpcs:
+                return int(value)
+        return self.fallback.next_value(station, year, month)
+
+    def release(self, station, year, month, value):
+        if self._rpcs:
+            released = self._rpc("release_fir_sequence",
+                                 {"p_station": station, "p_year": year, "p_month": month, "p_value": value})
+            if self._rpcs:
+                return bool(released)
+        return self.fallback.release(station, year, month, value)
+
+
+class FIRNumberAllocator:
+    """Allocates FIR numbers of the form STATION/YYYY/MM/NNNN."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def allocate(self, station_code=None, police_station=None, when=None):
+        station = resolve_station_code(station_code, police_station)
+        when = when or datetime.now()
+        sequence = self.store.next_value(station, when.year, when.month)
+        return format_fir_number(station, when.year, when.month, sequence)
+
+    def release(self, fir_number):
+        """Undo an allocation whose FIR was never created, if nothing was allocated after it.
+
+        Keeps the sequence gap-free when PDF generation fails right after
+        allocation; returns False if a later number has already been issued.
+        """
+        station, year, month, sequence = fir_number.split("/")
+        released = self.store.release(station, int(year), int(month), int(sequence))
+        if released:
+            logger.info(f"↩️ Released FIR number {fir_number}")
+        return released
+
+
+def create_allocator(supabase=None, backend=SEQUENCE_BACKEND):
+    if backend == "supabase":
+        if supabase is not None:
+            return FIRNumberAllocator(SupabaseSequenceStore(supabase, fallback=LocalSequenceStore()))
+        logger.warning("⚠️ No Supabase client for FIR sequences; using local counters (single node only)")
+    return FIRNumberAllocator(LocalSequenceStore())
@@ -3,10 +3,12 @@ import re
 import pickle
 import numpy as np
 import ssl
-from sentence_transformers import SentenceTransformer
 import google.generativeai as genai
 from dotenv import load_dotenv
 import pandas as pd
+from scripts.embedding_service import get_embedding_service
+from scripts.kb_index import top_k_indices
+from scripts.artifacts import FIR_SECTIONS_ARTIFACT, ArtifactError, load_artifact, save_artifact
 
 # Fix SSL certificate issues
 try:
@@ -40,7 +42,7 @@ class FIRRAGModel:
             # Create empty dataframe as fallback
             self.sections_df = pd.DataFrame(columns=['section_number', 'section_title', 'description', 'punishment', 'example_use_cases'])
         
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        self.embedder = get_embedding_service()
         
         # Initialize Gemini client with error handling
         try:
@@ -80,7 +82,7 @@ class FIRRAGModel:
         self.knowledge_base = knowledge_items
         return knowledge_items
     
-    def train_embeddings(self, save_path="models/fir_embeddings.pkl"):
+    def train_embeddings(self, save_path=FIR_SECTIONS_ARTIFACT):
         """Train and save embeddings"""
         if self.knowledge_base is None:
             self.prepare_knowledge_base()
@@ -90,25 +92,30 @@ class FIRRAGModel:
             return None
             
         print("Training FIR embeddings...")
-        self.embeddings = self.embedder.encode(self.knowledge_base, convert_to_numpy=True)
+        embeddings = self.embedder.encode(self.knowledge_base, convert_to_numpy=True)
         
-        # Save embeddings and knowledge base
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        with open(save_path, 'wb') as f:
-            pickle.dump((self.knowledge_base, self.embeddings), f)
+        # Save normalized embeddings and knowledge base as a versioned artifact
+        save_artifact(save_path, embeddings, self.knowledge_base, model_name=self.embedder.model_name)
+        self.embeddings, self.knowledge_base, _ = load_artifact(save_path)
         
         print(f"✅ FIR embeddings trained and saved to {save_path}")
         return self.embeddings
     
-    def load_embeddings(self, embeddings_path="models/fir_embeddings.pkl"):
-        """Load pre-trained embeddings"""
+    def load_embeddings(self, embeddings_path=FIR_SECTIONS_ARTIFACT, legacy_path="models/fir_embeddings.pkl"):
+        """Load pre-trained embeddings (memory-mapped artifact, migrating the legacy pickle if needed)"""
         try:
-            if not os.path.exists(embeddings_path):
-                print("❌ Embeddings file not found, training new embeddings...")
-                return self.train_embeddings(embeddings_path) is not None
-                
-            with open(embeddings_path, 'rb') as f:
-                self.knowledge_base, self.embeddings = pickle.load(f)
+            try:
+                self.embeddings, self.knowledge_base, _ = load_artifact(embeddings_path)
+            except ArtifactError as e:
+                if not os.path.exists(legacy_path):
+                    print(f"❌ {e}, training new embeddings...")
+                    return self.train_embeddings(embeddings_path) is not None
+
+                print(f"🔄 Migrating {legacy_path} to {embeddings_path}.*")
+                with open(legacy_path, 'rb') as f:
+                    knowledge_base, embeddings = pickle.load(f)
+                save_artifact(embeddings_path, embeddings, list(knowledge_base), model_name=self.embedder.model_name)
+                self.embeddings, self.knowledge_base, _ = load_artifact(embeddings_path)
             print("✅ FIR embeddings loaded successfully!")
             return True
         except Exception as e:
@@ -125,15 +132,13 @@ class FIRRAGModel:
         if not self.knowledge_base:
             return []
             
-        query_embedding = self.embedder.encode([incident_description], convert_to_numpy=True)[0]
+        query_embedding = self.embedder.encode([incident_description], normalize_embeddings=True)[0]
         
-        # Calculate cosine similarities
-        similarities = np.dot(self.embeddings, query_embedding) / (
-            np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding)
-        )
+        # Cosine similarities: embeddings are stored pre-normalized, so one matvec
+        similarities = self.embeddings @ query_embedding
         
         # Get top matches
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        top_indices = top_k_indices(similarities, top_k)
         
         results = []
         for idx in top_indices:
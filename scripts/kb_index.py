@@ -0,0 +1,163 @@
+import os
+import logging
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:  # faiss-cpu is optional at runtime; exact search still works
+    faiss = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = os.path.join("vector_store", "faiss_index.bin")
+INDEX_MODES = ["exact", "flat", "hnsw", "ivf"]
+INDEX_MODE = os.getenv("KB_INDEX_MODE", "exact").lower()
+HNSW_M = int(os.getenv("KB_HNSW_M", 32))
+HNSW_EF_SEARCH = int(os.getenv("KB_HNSW_EF_SEARCH", 64))
+IVF_NPROBE = int(os.getenv("KB_IVF_NPROBE", 8))
+
+
+def normalize(vectors):
+    """Return float32 rows scaled to unit length (cosine == inner product)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        return vectors / max(float(np.linalg.norm(vectors)), 1e-12)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def top_k_indices(scores, top_k):
+    """Indices of the top_k scores, best first, via argpartition (O(N + k log k))."""
+    k = min(top_k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def top_k_exact(vectors, query, top_k):
+    """Exact inner-product top-k over normalized vectors."""
+    scores = vectors @ query
+    top = top_k_indices(scores, top_k)
+    return top, scores[top]
+
+
+def build_index(vectors, mode=INDEX_MODE):
+    """Build a FAISS inner-product index over already normalized vectors."""
+    if faiss is None:
+        raise RuntimeError("faiss is not installed")
+    if mode not in INDEX_MODES or mode == "exact":
+        raise ValueError(f"Unsupported FAISS index mode: {mode}. Use one of {INDEX_MODES[1:]}")
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+
+    if mode == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif mode == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    else:
+        # ~4*sqrt(N) lists, but keep enough training points per list
+        nlist = max(1, min(int(4 * np.sqrt(n)), n // 39 or 1))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+
+    index.add(vectors)
+    return index
+
+
+def index_mode(index):
+    if isinstance(index, faiss.IndexHNSWFlat):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFFlat):
+        return "ivf"
+    return "flat"
+
+
+def save_index(index, path=INDEX_FILE):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+    logger.info(f"✅ Saved {index_mode(index)} FAISS index ({index.ntotal} vectors) to {path}")
+
+
+class KBIndex:
+    """Nearest-neighbour search over knowledge-base embeddings.
+
+    The default ``exact`` mode is a single matvec over the (memory-mapped,
+    pre-normalized) vectors, which keeps pages shared between workers. The
+    ``flat``, ``hnsw`` and ``ivf`` modes use the FAISS index at ``index_path``
+    when it matches the embeddings and build one in memory otherwise; exact
+    search is the fallback when faiss is unavailable.
+    """
+
+    def __init__(self, vectors, mode=INDEX_MODE, index_path=INDEX_FILE, normalized=False):
+        self.vectors = vectors if normalized else normalize(vectors)
+        self.mode = mode
+        self.index = None
+
+        if mode != "exact":
+            try:
+                self.index = self._load_or_build(index_path)
+            except Exception as e:
+                logger.warning(f"⚠️ FAISS index unavailable ({e}), using exact search")
+                self.index = None
+
+        if self.index is not None:
+            if isinstance(self.index, faiss.IndexHNSWFlat):
+                self.index.hnsw.efSearch = HNSW_EF_SEARCH
+            elif isinstance(self.index, faiss.IndexIVFFlat):
+                self.index.nprobe = IVF_NPROBE
+
+    def _load_or_build(self, index_path):
+        if faiss is None:
+            raise RuntimeError("faiss is not installed")
+
+        n, dim = self.vectors.shape
+        if index_path and os.path.exists(index_path) and os.path.getsize(index_path) > 0:
+            index = faiss.read_index(index_path)
+            if index.ntotal == n and index.d == dim and index_mode(index) == self.mode and self._matches(index):
+                logger.info(f"✅ Loaded {self.mode} FAISS index from {index_path}")
+                return index
+            logger.warning(f"⚠️ FAISS index at {index_path} is stale, rebuilding in memory")
+
+        index = build_index(self.vectors, self.mode)
+        logger.info(f"✅ Built {self.mode} FAISS index in memory ({n} vectors)")
+        return index
+
+    def _matches(self, index):
+        # Cheap content check: a stored row must find itself with cosine ~1
+        probe = self.vectors[[0, len(self.vectors) - 1]] if len(self.vectors) else self.vectors
+        if not len(probe):
+            return True
+        scores, _ = index.search(np.ascontiguousarray(probe), 1)
+        return bool(np.all(scores[:, 0] > 0.999))
+
+    def search(self, query, top_k=5):
+        """Return (row_indices, cosine_scores) for the top_k rows, best first."""
+        query = normalize(query)
+        if self.index is None:
+            return top_k_exact(self.vectors, query, top_k)
+
+        scores, ids = self.index.search(query.reshape(1, -1), min(top_k, self.index.ntotal))
+        keep = ids[0] >= 0
+        return ids[0][keep], scores[0][keep]
+
+
+if __name__ == "__main__":
+    import sys
+
+    from scripts.artifacts import KB_ARTIFACT, load_artifact
+
+    # Build vector_store/faiss_index.bin from the KB artifact without re-encoding
+    # (same default as the runtime: KB_INDEX_MODE, and exact search needs no index)
+    mode = sys.argv[1].lower() if len(sys.argv) > 1 else INDEX_MODE
+    if mode == "exact":
+        sys.exit(f"KB_INDEX_MODE is exact, which needs no FAISS index; pass one of {INDEX_MODES[1:]}")
+    embeddings, _, _ = load_artifact(KB_ARTIFACT)
+    save_index(build_index(embeddings, mode))
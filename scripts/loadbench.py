@@ -0,0 +1,571 @@
+"""Load benchmark for the combined hf_app service.
+
+    # In-process: stubbed Gemini + local SQLite backend, seeded on first run
+    python -m scripts.loadbench run --duration 60 --concurrency 16 --llm-latency-ms 800 --db-latency-ms 15
+
+    # Same stubs behind a real HTTP server, driven from another shell/machine
+    python -m scripts.loadbench serve --port 7861
+    python -m scripts.loadbench run --target http://127.0.0.1:7861 --duration 60
+
+    # Record a baseline, then fail (exit 1) when a later run regresses by more than 20%
+    python -m scripts.loadbench run --save-baseline bench/baseline.json
+    python -m scripts.loadbench run --baseline bench/baseline.json --threshold 0.2
+
+Workers replay a weighted mix of endpoint calls in a closed loop (each
+sends its next request as soon as the previous one returns) and the run
+reports p50/p95/p99 latency, throughput and errors per route. Download
+requests reuse PDFs produced by generate-pdf during the run. Embeddings
+and PDF rendering stay real; only the LLM and the database are stubbed.
+"""
+import os
+import json
+import math
+import time
+import random
+import sqlite3
+import argparse
+import threading
+import logging
+import http.client
+from datetime import date
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+WORKDIR = os.path.join("models", "loadbench")
+BENCH_STATION_CODE = "BENCH"
+
+DEFAULT_MIX = {
+    "chat": 25,
+    "suggest_sections": 10,
+    "criminal_matching": 10,
+    "generate_pdf": 5,
+    "list": 25,
+    "analytics": 15,
+    "download": 10,
+}
+PERCENTILES = (50, 95, 99)
+# Absolute error-rate increase tolerated before a baseline comparison fails
+ERROR_RATE_SLACK = 0.01
+
+CHAT_QUESTIONS = [
+    "What is the punishment for theft under IPC?",
+    "How do I file an FIR for a stolen phone?",
+    "Is IPC 420 bailable?",
+    "What is the procedure for anticipatory bail?",
+    "Explain section 498A IPC",
+    "Can police refuse to register an FIR?",
+    "What does section 304B cover?",
+    "Difference between cognizable and non-cognizable offences",
+]
+INCIDENTS = [
+    ("Theft", "Mobile phone snatched by two men on a motorcycle near the bus stand"),
+    ("Burglary", "House broken into at night, jewellery and cash stolen from the locked cupboard"),
+    ("Cheating", "Caller posing as a bank official obtained OTP and withdrew money from the account"),
+    ("Assault", "Victim was beaten with a stick during an argument over parking"),
+    ("Criminal Intimidation", "Neighbour threatened to kill the complainant and damaged his car"),
+]
+LLM_RESPONSE = ("Under Section 379 of the Indian Penal Code, theft is punishable with imprisonment of "
+                "either description for a term which may extend to three years, or with fine, or with both. "
+                "The complainant should register an FIR at the police station having jurisdiction.")
+
+
+# -------------------------
+# Stubbed LLM
+# -------------------------
+class StubLLM:
+    """Stands in for both Gemini SDKs (google.generativeai and google.genai).
+
+    Every call sleeps ``latency_ms`` (plus up to ``jitter_ms``) and returns
+    a canned legal answer; streaming calls yield it in a few chunks.
+    """
+
+    def __init__(self, latency_ms=800, jitter_ms=0, seed=0):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _wait(self):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _chunks(self):
+        self._wait()
+        words = LLM_RESPONSE.split(" ")
+        step = max(1, len(words) // 4)
+        for i in range(0, len(words), step):
+            yield SimpleNamespace(text=" ".join(words[i:i + step]) + " ")
+
+    def generate_content(self, *args, stream=False, **kwargs):
+        if stream:
+            return self._chunks()
+        self._wait()
+        return SimpleNamespace(text=LLM_RESPONSE)
+
+    def generate_content_stream(self, *args, **kwargs):
+        return self._chunks()
+
+    # google.generativeai: genai.GenerativeModel(name).generate_content(...)
+    def GenerativeModel(self, *args, **kwargs):
+        return self
+
+    # google.genai: client.models.generate_content(...)
+    @property
+    def models(self):
+        return self
+
+
+def configure_backends(workdir=WORKDIR, db_latency_ms=0, seed_count=20000, answer_cache=False):
+    """Point the app at a seeded local SQLite backend under ``workdir``.
+
+    Must run before fir_api/chatbot_api are imported; their clients read
+    these settings at import time. The FIR vector and PDF indexes and the
+    rendered PDFs also live in ``workdir`` so synthetic FIRs never reach
+    the real ones. The chat answer cache is off unless ``answer_cache``:
+    the mix repeats a handful of questions, so with it on /api/chat
+    measures cache hits rather than retrieval and the LLM.
+    """
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "bench.sqlite3")
+    os.environ.update({
+        "DB_BACKEND": "sqlite",
+        "LOCAL_DB_PATH": db_path,
+        "LOCAL_DB_LATENCY_MS": str(db_latency_ms),
+        "FIR_SEQUENCE_BACKEND": "supabase",
+        "FIR_INDEX_PATH": os.path.join(workdir, "fir_index.sqlite3"),
+        "FIR_PDF_INDEX_PATH": os.path.join(workdir, "fir_pdfs.sqlite3"),
+        "FIR_DRAFTS_DIR": os.path.join(workdir, "fir_drafts"),
+        "ANSWER_CACHE_ENABLED": "1" if answer_cache else "0",
+    })
+    # Gemini is replaced by StubLLM; a key just enables the code paths
+    os.environ.setdefault("GEMINI_API_KEY", "loadbench")
+
+    existing = 0
+    if os.path.exists(db_path):
+        with sqlite3.connect(db_path) as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if "fir_records" in tables:
+                existing = conn.execute("SELECT COUNT(*) FROM fir_records").fetchone()[0]
+    if existing < seed_count:
+        from scripts.seed_local_db import seed
+        seed(path=db_path, count=seed_count - existing)
+    return db_path
+
+
+def install_llm_stub(llm):
+    """Route every Gemini call site in the app through ``llm``"""
+    import chatbot_api
+    import fir_api
+
+    chatbot_api.genai = llm
+    chatbot_api.gemini_available = True
+    chatbot_api.detected_model = "loadbench-stub"
+    if fir_api.fir_model:
+        fir_api.fir_model.client = llm
+        fir_api.fir_model.gemini_available = True
+    try:
+        import scripts.query
+        scripts.query.client = llm
+    except Exception as e:
+        logger.warning(f"⚠️ RAG module unavailable, chat will use the general Gemini path: {e}")
+
+
+def load_app(llm, warmup_timeout=600):
+    """The combined hf_app with its components warmed and the LLM stubbed"""
+    import hf_app
+    from scripts.warmup import registry
+
+    started = time.time()
+    registry.start()
+    while not registry.settled():
+        if time.time() - started > warmup_timeout:
+            raise RuntimeError(f"Components still warming after {warmup_timeout}s: {registry.status()}")
+        time.sleep(0.2)
+    failed = registry.failed()
+    if failed:
+        logger.warning(f"⚠️ Components failed to warm: {failed}")
+    logger.info(f"🔥 App warmed in {time.time() - started:.1f}s")
+
+    install_llm_stub(llm)
+    return hf_app.app
+
+
+# -------------------------
+# Transports
+# -------------------------
+class InProcessTransport:
+    """Calls the WSGI app directly through Flask's test client (one per worker)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        try:
+            return response.status_code, response.get_data()
+        finally:
+            response.close()
+
+
+class HTTPTransport:
+    """Keep-alive HTTP/1.1 connection to a running server (one per worker)"""
+
+    def __init__(self, base_url, timeout=60):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._conn = None
+
+    def request(self, method, path, body=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = self.connection_class(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request(method, self.prefix + path, body=payload, headers=headers)
+                response = self._conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                # A keep-alive connection the server already closed: reconnect once
+                self._conn.close()
+                self._conn = None
+                if attempt:
+                    raise
+
+
+# -------------------------
+# Request mix
+# -------------------------
+class RequestMix:
+    """Weighted route choice plus a request builder per route"""
+
+    def __init__(self, weights):
+        unknown = set(weights) - set(DEFAULT_MIX)
+        if unknown:
+            raise ValueError(f"Unknown routes in mix: {', '.join(sorted(unknown))}")
+        self.routes = [name for name, weight in weights.items() if weight > 0]
+        self.weights = [weights[name] for name in self.routes]
+        self.downloads = []
+        self._lock = threading.Lock()
+
+    def choose(self, rng):
+        """(route, method, path, body); download is skipped until a PDF exists"""
+        while True:
+            route = rng.choices(self.routes, weights=self.weights)[0]
+            call = getattr(self, f"_{route}")(rng)
+            if call is not None:
+                return (route, *call)
+            if self.routes == ["download"]:
+                raise RuntimeError("download-only mix needs PDFs; add generate_pdf to the mix")
+
+    def observe(self, route, status, body):
+        """Remember download URLs of PDFs generated during the run"""
+        if route != "generate_pdf" or status != 200:
+            return
+        try:
+            url = json.loads(body).get("download_url")
+        except ValueError:
+            return
+        if url:
+            with self._lock:
+                self.downloads.append(url)
+                del self.downloads[:-200]
+
+    def _chat(self, rng):
+        return "POST", "/api/chat", {"message": rng.choice(CHAT_QUESTIONS)}
+
+    def _suggest_sections(self, rng):
+        return "POST", "/api/fir/suggest-sections", {"incident_description": rng.choice(INCIDENTS)[1]}
+
+    def _criminal_matching(self, rng):
+        return "POST", "/api/police/criminal-matching", {"description": rng.choice(INCIDENTS)[1]}
+
+    def _generate_pdf(self, rng):
+        incident_type, description = rng.choice(INCIDENTS)
+        return "POST", "/api/fir/generate-pdf", {
+            "station_code": BENCH_STATION_CODE,
+            "police_station": "Loadbench Police Station",
+            "district": "Mumbai",
+            "state": "Maharashtra",
+            "incident_type": incident_type,
+            "incident_date": date.today().isoformat(),
+            "incident_time": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+            "location": "Main Road, Mumbai",
+            "incident_description": description,
+            "victim_name": "Loadbench Victim",
+            "victim_contact": "9000000000",
+            "victim_address": "1, Main Road, Mumbai",
+            "sections_applied": [{"section": "379", "title": "Theft"}],
+            "investigating_officer": "SI Loadbench",
+        }
+
+    def _list(self, rng):
+        return "GET", "/api/fir/list?limit=50", None
+
+    def _analytics(self, rng):
+        return "GET", f"/api/police/analytics?range={rng.choice(['week', 'month', 'year'])}", None
+
+    def _download(self, rng):
+        with self._lock:
+            url = rng.choice(self.downloads) if self.downloads else None
+        return ("GET", url, None) if url else None
+
+
+def parse_mix(text):
+    """"chat=3,list=2" -> {"chat": 3.0, "list": 2.0}"""
+    weights = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = item.partition("=")
+        weights[name.strip().replace("-", "_")] = float(weight or 1)
+    return weights
+
+
+# -------------------------
+# Load loop
+# -------------------------
+def run_load(make_transport, mix, concurrency=8, duration=30.0, max_requests=None, seed=0):
+    """Closed-loop load with ``concurrency`` workers; returns (samples, wall seconds).
+
+    samples: (route, latency_ms, status) with status None for transport errors.
+    Stops after ``duration`` seconds or ``max_requests`` requests, whichever comes first.
+    """
+    samples = []
+    samples_lock = threading.Lock()
+    budget = [max_requests]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def take_ticket():
+        if deadline and time.perf_counter() >= deadline:
+            return False
+        if budget[0] is None:
+            return True
+        with samples_lock:
+            if budget[0] <= 0:
+                return False
+            budget[0] -= 1
+            return True
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        transport = make_transport()
+        local = []
+        while take_ticket():
+            route, method, path, body = mix.choose(rng)
+            started = time.perf_counter()
+            try:
+                status, data = transport.request(method, path, body)
+            except Exception as e:
+                logger.debug(f"💥 {route} failed: {e}")
+                status, data = None, b""
+            local.append((route, (time.perf_counter() - started) * 1000, status))
+            mix.observe(route, status, data)
+        with samples_lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), name=f"loadbench-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(samples, wall_seconds):
+    def stats(rows):
+        latencies = sorted(ms for _, ms, _ in rows)
+        statuses = {}
+        for _, _, status in rows:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        errors = sum(1 for _, _, status in rows if status is None or status >= 400)
+        summary = {
+            "count": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "rps": round(len(rows) / wall_seconds, 2) if wall_seconds else 0.0,
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "max": round(latencies[-1], 2) if latencies else None,
+            "statuses": statuses,
+        }
+        for p in PERCENTILES:
+            value = percentile(latencies, p)
+            summary[f"p{p}"] = round(value, 2) if value is not None else None
+        return summary
+
+    by_route = {}
+    for row in samples:
+        by_route.setdefault(row[0], []).append(row)
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "total": stats(samples),
+        "routes": {route: stats(rows) for route, rows in sorted(by_route.items())},
+    }
+
+
+def compare(report, baseline, threshold=0.2, min_samples=20):
+    """Regressions of ``report`` against ``baseline`` beyond ``threshold`` (a fraction)"""
+    regressions = []
+    for route, base in baseline.get("routes", {}).items():
+        current = report["routes"].get(route)
+        if not current or current["count"] < min_samples or base["count"] < min_samples:
+            continue
+        for p in PERCENTILES:
+            key = f"p{p}"
+            if base.get(key) and current[key] > base[key] * (1 + threshold):
+                regressions.append(f"{route} {key} {base[key]:.1f} -> {current[key]:.1f} ms "
+                                   f"(+{(current[key] / base[key] - 1) * 100:.0f}%)")
+        if base.get("rps") and current["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{route} rps {base['rps']:.1f} -> {current['rps']:.1f} "
+                               f"({(current['rps'] / base['rps'] - 1) * 100:.0f}%)")
+        if current["error_rate"] > base.get("error_rate", 0) + ERROR_RATE_SLACK:
+            regressions.append(f"{route} error rate {base.get('error_rate', 0):.2%} -> {current['error_rate']:.2%}")
+    return regressions
+
+
+def format_report(report):
+    lines = [f"{'route':<18}{'count':>8}{'err':>6}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"]
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for route, s in rows:
+        fmt = lambda v: f"{v:.1f}" if v is not None else "-"
+        lines.append(f"{route:<18}{s['count']:>8}{s['errors']:>6}{s['rps']:>9.1f}"
+                     f"{fmt(s['p50']):>10}{fmt(s['p95']):>10}{fmt(s['p99']):>10}{fmt(s['max']):>10}")
+    return "\n".join(lines)
+
+
+# -------------------------
+# CLI
+# -------------------------
+def stubbed_app(args):
+    configure_backends(args.workdir, args.db_latency_ms, args.seed_count, args.answer_cache)
+    llm = StubLLM(args.llm_latency_ms, args.llm_jitter_ms, args.seed)
+    return load_app(llm)
+
+
+def command_run(args):
+    mix = RequestMix(parse_mix(args.mix) if args.mix else DEFAULT_MIX)
+    if args.target == "inprocess":
+        app = stubbed_app(args)
+        make_transport = lambda: InProcessTransport(app)
+    else:
+        make_transport = lambda: HTTPTransport(args.target, timeout=args.timeout)
+
+    # Warmup: a few PDFs for the download route, then untimed traffic
+    if "download" in mix.routes:
+        transport = make_transport()
+        for i in range(3):
+            route, method, path, body = ("generate_pdf", *mix._generate_pdf(random.Random(i)))
+            status, data = transport.request(method, path, body)
+            mix.observe(route, status, data)
+    if args.warmup_requests:
+        run_load(make_transport, mix, args.concurrency, duration=None, max_requests=args.warmup_requests, seed=args.seed + 1)
+
+    logger.info(f"🚀 {args.concurrency} workers against {args.target} for "
+                f"{args.requests or 'unlimited'} requests / {args.duration or 'unlimited'}s")
+    samples, wall = run_load(make_transport, mix, args.concurrency, args.duration, args.requests, args.seed)
+    report = summarize(samples, wall)
+    report["config"] = {
+        "target": args.target,
+        "concurrency": args.concurrency,
+        "mix": dict(zip(mix.routes, mix.weights)),
+    }
+    if args.target == "inprocess":
+        # Over HTTP the stub settings are whatever the server was started with
+        report["config"].update({
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+            "db_latency_ms": args.db_latency_ms,
+            "seed_count": args.seed_count,
+            "answer_cache": args.answer_cache,
+        })
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        if os.path.dirname(args.save_baseline):
+            os.makedirs(os.path.dirname(args.save_baseline), exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"💾 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            logger.warning("⚠️ Baseline was recorded with a different configuration; comparison may be meaningless")
+        regressions = compare(report, baseline, args.threshold, args.min_samples)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+def command_serve(args):
+    app = stubbed_app(args)
+    logger.info(f"🌐 Serving stubbed app on {args.host}:{args.port}")
+    app.run(host=args.host, port=args.port, threaded=True, debug=False)
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    parser = argparse.ArgumentParser(description="Load benchmark for the combined hf_app service")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stubs = argparse.ArgumentParser(add_help=False)
+    stubs.add_argument("--workdir", default=WORKDIR, help="local database and indexes for the stubbed backend")
+    stubs.add_argument("--seed-count", type=int, default=20000, help="synthetic FIRs in the local database")
+    stubs.add_argument("--llm-latency-ms", type=float, default=800)
+    stubs.add_argument("--llm-jitter-ms", type=float, default=0)
+    stubs.add_argument("--db-latency-ms", type=float, default=0, help="emulated round trip per database request")
+    stubs.add_argument("--answer-cache", action="store_true", help="keep the chat answer cache on (off by default)")
+    stubs.add_argument("--seed", type=int, default=0)
+
+    run = commands.add_parser("run", parents=[stubs], help="drive load and report latency percentiles")
+    run.add_argument("--target", default="inprocess", help="'inprocess' or a base URL such as http://127.0.0.1:7861")
+    run.add_argument("--mix", help=f"route weights, e.g. chat=3,list=2 (routes: {', '.join(DEFAULT_MIX)})")
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument("--duration", type=float, default=30, help="seconds; 0 runs until --requests is reached")
+    run.add_argument("--requests", type=int, help="stop after this many requests")
+    run.add_argument("--warmup-requests", type=int, default=50)
+    run.add_argument("--timeout", type=float, default=60, help="HTTP timeout per request")
+    run.add_argument("--output", help="write the JSON report here")
+    run.add_argument("--save-baseline", help="write the JSON report as a baseline")
+    run.add_argument("--baseline", help="compare against this baseline; exit 1 on regression")
+    run.add_argument("--threshold", type=float, default=0.2, help="allowed regression as a fraction")
+    run.add_argument("--min-samples", type=int, default=20, help="routes with fewer samples are not compared")
+
+    serve = commands.add_parser("serve", parents=[stubs], help="serve the stubbed app over HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=7861)
+
+    args = parser.parse_args()
+    # Per-request app logs would drown the report; keep this module's progress lines
+    logging.basicConfig(level=logging.WARNING)
+    logger.setLevel(logging.INFO)
+    if args.command == "run" and not args.duration and not args.requests:
+        parser.error("--duration 0 needs --requests")
+    sys.exit(command_run(args) if args.command == "run" else command_serve(args))
@@ -0,0 +1,642 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", os.path.join("models", "local_supabase.sqlite3"))
+# Emulated PostgREST round trip added to every request (benchmarks)
+LOCAL_DB_LATENCY_MS = float(os.getenv("LOCAL_DB_LATENCY_MS", 0))
+
+NOW_SQL = "(strftime('%Y-%m-%dT%H:%M:%f', 'now') || '+00:00')"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS fir_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fir_number TEXT NOT NULL UNIQUE,
+    police_station TEXT,
+    district TEXT,
+    state TEXT,
+    incident_type TEXT,
+    incident_date TEXT,
+    incident_time TEXT,
+    incident_location TEXT,
+    incident_description TEXT,
+    victim_name TEXT,
+    victim_contact TEXT,
+    victim_address TEXT,
+    victim_age INTEGER,
+    victim_gender TEXT,
+    accused_name TEXT,
+    accused_description TEXT,
+    modus_operandi TEXT,
+    ipc_sections TEXT,
+    investigating_officer TEXT,
+    additional_comments TEXT,
+    investigation_notes TEXT,
+    status TEXT DEFAULT 'registered',
+    pdf_path TEXT,
+    created_at TEXT NOT NULL DEFAULT {NOW_SQL},
+    updated_at TEXT NOT NULL DEFAULT {NOW_SQL}
+);
+CREATE INDEX IF NOT EXISTS idx_fir_records_created ON fir_records (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_fir_records_incident_date ON fir_records (incident_date, id);
+CREATE INDEX IF NOT EXISTS idx_fir_records_updated ON fir_records (updated_at);
+CREATE INDEX IF NOT EXISTS idx_fir_records_status_date ON fir_records (status, incident_date);
+
+CREATE TABLE IF NOT EXISTS case_activities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fir_number TEXT NOT NULL,
+    activity_type TEXT,
+    title TEXT,
+    description TEXT,
+    previous_value TEXT,
+    new_value TEXT,
+    officer_name TEXT,
+    officer_badge TEXT,
+    activity_date TEXT NOT NULL DEFAULT {NOW_SQL},
+    created_at TEXT NOT NULL DEFAULT {NOW_SQL}
+);
+CREATE INDEX IF NOT EXISTS idx_case_activities_fir ON case_activities (fir_number, activity_date);
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name TEXT,
+    email TEXT NOT NULL UNIQUE,
+    password TEXT,
+    role TEXT,
+    is_verified BOOLEAN DEFAULT 0,
+    badge_number TEXT,
+    police_station TEXT,
+    rank TEXT,
+    created_at TEXT NOT NULL DEFAULT {NOW_SQL}
+);
+CREATE INDEX IF NOT EXISTS idx_users_email_role ON users (email, role);
+
+CREATE TABLE IF NOT EXISTS fir_sequences (
+    station TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    last_value INTEGER NOT NULL,
+    PRIMARY KEY (station, year, month)
+);
+
+CREATE TABLE IF NOT EXISTS fir_rollups (
+    day TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, dimension, key)
+);
+"""
+
+BOOLEAN_COLUMNS = {"users": {"is_verified"}}
+GROUPABLE_COLUMNS = ("status", "incident_type", "incident_location", "police_station", "district")
+ACTIVITY_COLUMNS = ("activity_type", "title", "description", "previous_value", "new_value", "officer_name", "officer_badge")
+ROLLUP_WATCHED = ("status", "incident_type", "incident_date", "incident_time", "incident_location", "police_station", "district")
+
+IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+COMPARISONS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+# -------------------------
+# Rollups (same buckets as sql/fir_rollups.sql)
+# -------------------------
+def _rollup_day(row):
+    return f"COALESCE(NULLIF(substr({row}.incident_date, 1, 10), ''), substr({row}.created_at, 1, 10))"
+
+
+def _rollup_hour(row):
+    return (f"NULLIF(CASE WHEN instr({row}.incident_time, ':') > 0 "
+            f"THEN substr({row}.incident_time, 1, instr({row}.incident_time, ':') - 1) "
+            f"ELSE {row}.incident_time END, '')")
+
+
+def _rollup_upsert(row, delta):
+    buckets = " UNION ALL ".join(
+        ["SELECT 'total' AS dimension, 'all' AS key"]
+        + [f"SELECT '{column}', {row}.{column}" for column in GROUPABLE_COLUMNS]
+        + [f"SELECT 'hour', {_rollup_hour(row)}"]
+    )
+    return f"""
+        INSERT INTO fir_rollups (day, dimension, key, count)
+        SELECT {_rollup_day(row)}, dimension, COALESCE(key, ''), {delta} FROM ({buckets}) WHERE true
+        ON CONFLICT (day, dimension, key) DO UPDATE SET count = count + excluded.count;"""
+
+
+def create_rollup_triggers(conn):
+    changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in ROLLUP_WATCHED)
+    conn.executescript(f"""
+        CREATE TRIGGER IF NOT EXISTS fir_rollups_insert AFTER INSERT ON fir_records
+        BEGIN {_rollup_upsert('NEW', 1)} END;
+        CREATE TRIGGER IF NOT EXISTS fir_rollups_delete AFTER DELETE ON fir_records
+        BEGIN {_rollup_upsert('OLD', -1)} END;
+        CREATE TRIGGER IF NOT EXISTS fir_rollups_update AFTER UPDATE OF {', '.join(ROLLUP_WATCHED)} ON fir_records
+        WHEN {changed}
+        BEGIN {_rollup_upsert('OLD', -1)} {_rollup_upsert('NEW', 1)} END;
+    """)
+
+
+def drop_rollup_triggers(conn):
+    """Bulk loads drop the triggers and call rebuild_rollups afterwards"""
+    conn.executescript("""
+        DROP TRIGGER IF EXISTS fir_rollups_insert;
+        DROP TRIGGER IF EXISTS fir_rollups_delete;
+        DROP TRIGGER IF EXISTS fir_rollups_update;
+    """)
+
+
+def rebuild_rollups(conn):
+    """Recompute fir_rollups from fir_records in one scan; returns the bucket count"""
+    dimensions = " UNION ALL ".join(f"SELECT '{d}' AS dimension" for d in ("total", *GROUPABLE_COLUMNS, "hour"))
+    key = "CASE d.dimension WHEN 'total' THEN 'all' " + " ".join(
+        f"WHEN '{c}' THEN r.{c}" for c in GROUPABLE_COLUMNS
+    ) + f" WHEN 'hour' THEN {_rollup_hour('r')} END"
+    conn.execute("DELETE FROM fir_rollups")
+    conn.execute(f"""
+        INSERT INTO fir_rollups (day, dimension, key, count)
+        SELECT {_rollup_day('r')}, d.dimension, COALESCE({key}, ''), COUNT(*)
+        FROM fir_records AS r CROSS JOIN ({dimensions}) AS d
+        GROUP BY 1, 2, 3
+    """)
+    return conn.execute("SELECT COUNT(*) FROM fir_rollups").fetchone()[0]
+
+
+# -------------------------
+# PostgREST filter syntax
+# -------------------------
+def _split_top(text):
+    """Split on commas outside parentheses and double quotes"""
+    parts, depth, quoted, escaped, current = [], 0, False, False, []
+    for ch in text:
+        if escaped:
+            escaped = False
+        elif ch == "\\" and quoted:
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(ch)
+    parts.append("".join(current))
+    return [p for p in parts if p]
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value
+
+
+def _like_to_glob(pattern):
+    """Case-sensitive LIKE pattern (% _ with backslash escapes) as a GLOB pattern"""
+    out, chars = [], iter(pattern)
+    for ch in chars:
+        if ch == "\\":
+            ch = next(chars, "")
+            out.append(f"[{ch}]" if ch in "*?[" else ch)
+        elif ch == "%":
+            out.append("*")
+        elif ch == "_":
+            out.append("?")
+        elif ch in "*?[":
+            out.append(f"[{ch}]")
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _db_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+class APIError(Exception):
+    """Error raised like postgrest's APIError: message plus a PostgREST/Postgres code"""
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class LocalResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+        self.error = None
+
+
+class LocalQuery:
+    """The subset of the postgrest query builder the app uses, compiled to SQLite"""
+
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._columns = client.columns(table)
+        self._action = "select"
+        self._select = "*"
+        self._count = None
+        self._payload = None
+        self._where = []
+        self._params = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+
+    def _column(self, name):
+        name = name.strip()
+        if name not in self._columns:
+            raise APIError(f"column {self._table}.{name} does not exist", "42703")
+        return f'"{name}"'
+
+    # Actions
+    def select(self, columns="*", count=None):
+        self._select = columns
+        self._count = count
+        return self
+
+    def insert(self, data):
+        self._action, self._payload = "insert", data
+        return self
+
+    def update(self, data):
+        self._action, self._payload = "update", data
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    # Filters
+    def _filter(self, sql, params=()):
+        self._where.append(sql)
+        self._params.extend(params)
+        return self
+
+    def _condition(self, column, op, value):
+        column = self._column(column)
+        if op in COMPARISONS:
+            return f"{column} {COMPARISONS[op]} ?", [_db_value(value)]
+        if op == "like":
+            return f"{column} GLOB ?", [_like_to_glob(value)]
+        if op == "ilike":
+            return f"{column} LIKE ? ESCAPE '\\'", [value]
+        if op == "in":
+            values = list(value)
+            return f"{column} IN ({', '.join('?' * len(values))})", [_db_value(v) for v in values]
+        if op == "is":
+            keyword = {"null": "NULL", None: "NULL", "true": "1", True: "1", "false": "0", False: "0"}.get(value)
+            if keyword is None:
+                raise APIError(f"invalid is. value: {value}", "22P02")
+            return (f"{column} IS NULL", []) if keyword == "NULL" else (f"{column} = {keyword}", [])
+        raise APIError(f"unsupported operator: {op}", "PGRST100")
+
+    def eq(self, column, value):
+        return self._filter(*self._condition(column, "eq", value))
+
+    def neq(self, column, value):
+        return self._filter(*self._condition(column, "neq", value))
+
+    def gt(self, column, value):
+        return self._filter(*self._condition(column, "gt", value))
+
+    def gte(self, column, value):
+        return self._filter(*self._condition(column, "gte", value))
+
+    def lt(self, column, value):
+        return self._filter(*self._condition(column, "lt", value))
+
+    def lte(self, column, value):
+        return self._filter(*self._condition(column, "lte", value))
+
+    def like(self, column, pattern):
+        return self._filter(*self._condition(column, "like", pattern))
+
+    def ilike(self, column, pattern):
+        return self._filter(*self._condition(column, "ilike", pattern))
+
+    def in_(self, column, values):
+        return self._filter(*self._condition(column, "in", values))
+
+    def is_(self, column, value):
+        return self._filter(*self._condition(column, "is", value))
+
+    def or_(self, filters):
+        return self._filter(*self._logic_tree(filters, "OR"))
+
+    def _logic_tree(self, text, joiner):
+        """PostgREST logic tree, e.g. a.gt."x",and(a.eq."x",id.lt."5")"""
+        clauses, params = [], []
+        for item in _split_top(text):
+            item = item.strip()
+            nested = re.match(r"^(and|or)\((.*)\)$", item, re.S)
+            if nested:
+                sql, values = self._logic_tree(nested.group(2), nested.group(1).upper())
+            else:
+                try:
+                    column, op, value = item.split(".", 2)
+                except ValueError:
+                    raise APIError(f"failed to parse logic tree ({item})", "PGRST100")
+                if op == "in":
+                    value = [_unquote(v) for v in _split_top(value.strip("()"))]
+                else:
+                    value = _unquote(value)
+                    if op in ("like", "ilike"):
+                        value = value.replace("*", "%")
+                sql, values = self._condition(column, op, value)
+            clauses.append(sql)
+            params.extend(values)
+        return "(" + f" {joiner} ".join(clauses) + ")", params
+
+    # Modifiers
+    def order(self, column, desc=False):
+        self._order.append(f"{self._column(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size):
+        self._limit = int(size)
+        return self
+
+    def range(self, start, end):
+        self._offset = int(start)
+        self._limit = int(end) - int(start) + 1
+        return self
+
+    # Execution
+    def _where_sql(self):
+        return f" WHERE {' AND '.join(self._where)}" if self._where else ""
+
+    def _select_sql(self):
+        if self._select.strip() == "*":
+            return "*"
+        return ", ".join(self._column(c) for c in self._select.split(",") if c.strip())
+
+    def _rows(self, cursor):
+        booleans = BOOLEAN_COLUMNS.get(self._table, ())
+        rows = [dict(row) for row in cursor.fetchall()]
+        for row in rows:
+            for column in booleans:
+                if row.get(column) is not None:
+                    row[column] = bool(row[column])
+        return rows
+
+    def _values(self, record):
+        unknown = [c for c in record if c not in self._columns]
+        if unknown:
+            raise APIError(f"Could not find the '{unknown[0]}' column of '{self._table}'", "PGRST204")
+        return [_db_value(v) for v in record.values()]
+
+    def execute(self):
+        self._client.round_trip()
+        try:
+            return getattr(self, f"_execute_{self._action}")()
+        except sqlite3.IntegrityError as e:
+            raise APIError(str(e), "23505" if "UNIQUE" in str(e) else "23502")
+
+    def _execute_select(self):
+        sql = f'SELECT {self._select_sql()} FROM "{self._table}"{self._where_sql()}'
+        if self._order:
+            sql += f" ORDER BY {', '.join(self._order)}"
+        if self._limit is not None or self._offset:
+            sql += f" LIMIT {self._limit if self._limit is not None else -1} OFFSET {self._offset or 0}"
+
+        conn = self._client.connection()
+        rows = self._rows(conn.execute(sql, self._params))
+        count = None
+        if self._count:
+            if self._count in ("estimated", "planned") and not self._where:
+                count = conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{self._table}"').fetchone()[0]
+            else:
+                count = conn.execute(f'SELECT COUNT(*) FROM "{self._table}"{self._where_sql()}', self._params).fetchone()[0]
+        return LocalResponse(rows, count)
+
+    def _execute_insert(self):
+        records = self._payload if isinstance(self._payload, list) else [self._payload]
+        rows = []
+        with self._client.transaction() as conn:
+            for record in records:
+                columns = ", ".join(self._column(c) for c in record)
+                placeholders = ", ".join("?" * len(record))
+                cursor = conn.execute(
+                    f'INSERT INTO "{self._table}" ({columns}) VALUES ({placeholders}) RETURNING *',
+                    self._values(record),
+                )
+                rows.extend(self._rows(cursor))
+        return LocalResponse(rows)
+
+    def _execute_update(self):
+        assignments = ", ".join(f"{self._column(c)} = ?" for c in self._payload)
+        with self._client.transaction() as conn:
+            cursor = conn.execute(
+                f'UPDATE "{self._table}" SET {assignments}{self._where_sql()} RETURNING *',
+                self._values(self._payload) + self._params,
+            )
+            rows = self._rows(cursor)
+        return LocalResponse(rows)
+
+    def _execute_delete(self):
+        with self._client.transaction() as conn:
+            rows = self._rows(conn.execute(f'DELETE FROM "{self._table}"{self._where_sql()} RETURNING *', self._params))
+        return LocalResponse(rows)
+
+
+class LocalRPC:
+    def __init__(self, client, fn, params):
+        self._client = client
+        self._fn = fn
+        self._params = params or {}
+
+    def execute(self):
+        self._client.round_trip()
+        try:
+            return LocalResponse(self._fn(**self._params))
+        except sqlite3.IntegrityError as e:
+            raise APIError(str(e), "23505" if "UNIQUE" in str(e) else "23502")
+
+
+class LocalSupabaseClient:
+    """Embedded SQLite stand-in for the Supabase client (DB_BACKEND=sqlite).
+
+    Supports the query-builder calls the app makes (table().select/insert/
+    update/delete with eq/neq/gt/gte/lt/lte/like/ilike/in_/is_/or_, order,
+    range, limit and count=) and local versions of the RPCs in sql/, so
+    every data path runs on a disconnected machine. Rollups are kept by
+    triggers as in Postgres. ``latency_ms`` adds an emulated round trip
+    per request for capacity tests.
+    """
+
+    def __init__(self, path=LOCAL_DB_PATH, latency_ms=LOCAL_DB_LATENCY_MS):
+        self.path = path
+        self.latency = latency_ms / 1000.0
+        self._local = threading.local()
+        self._columns = {}
+        self._rpcs = {
+            "fir_group_counts": self._fir_group_counts,
+            "fir_rollup_counts": self._fir_rollup_counts,
+            "rebuild_fir_rollups": self._rebuild_fir_rollups,
+            "next_fir_sequence": self._next_fir_sequence,
+            "release_fir_sequence": self._release_fir_sequence,
+            "register_fir": self._register_fir,
+            "update_fir_status": self._update_fir_status,
+            "mark_fir_pdf_failed": self._mark_fir_pdf_failed,
+        }
+        self._init_db()
+        logger.info(f"✅ Local SQLite backend at {self.path}")
+
+    def connection(self):
+        # Per thread and per process, like the other SQLite stores
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _init_db(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+        create_rollup_triggers(conn)
+
+    def columns(self, table):
+        if table not in self._columns:
+            if not IDENTIFIER_RE.match(table):
+                raise APIError(f"invalid table name {table}", "PGRST205")
+            columns = {row[1] for row in self.connection().execute(f'PRAGMA table_info("{table}")')}
+            if not columns:
+                raise APIError(f"Could not find the table 'public.{table}'", "PGRST205")
+            self._columns[table] = columns
+        return self._columns[table]
+
+    def round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+    def rpc(self, name, params=None):
+        fn = self._rpcs.get(name)
+        if fn is None:
+            raise APIError(f"Could not find the function public.{name}", "PGRST202")
+        return LocalRPC(self, fn, params)
+
+    # -------------------------
+    # RPCs
+    # -------------------------
+    def _fir_group_counts(self, p_column, p_start_date=None, p_end_date=None):
+        if p_column not in GROUPABLE_COLUMNS:
+            raise APIError(f"cannot group fir_records by {p_column}", "P0001")
+        rows = self.connection().execute(
+            f"SELECT CAST({p_column} AS TEXT) AS key, COUNT(*) AS count FROM fir_records "
+            f"WHERE (? IS NULL OR incident_date >= ?) AND (? IS NULL OR incident_date <= ?) GROUP BY 1",
+            (p_start_date, p_start_date, p_end_date, p_end_date),
+        )
+        return [dict(row) for row in rows]
+
+    def _fir_rollup_counts(self, p_start_date=None, p_end_date=None):
+        rows = self.connection().execute(
+            "SELECT dimension, key, SUM(count) AS count FROM fir_rollups "
+            "WHERE (? IS NULL OR day >= ?) AND (? IS NULL OR day <= ?) "
+            "GROUP BY dimension, key HAVING SUM(count) <> 0",
+            (p_start_date, p_start_date, p_end_date, p_end_date),
+        )
+        return [dict(row) for row in rows]
+
+    def _rebuild_fir_rollups(self):
+        with self.transaction() as conn:
+            return rebuild_rollups(conn)
+
+    def _next_fir_sequence(self, p_station, p_year, p_month):
+        with self.transaction() as conn:
+            return conn.execute(
+                "INSERT INTO fir_sequences (station, year, month, last_value) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (station, year, month) DO UPDATE SET last_value = last_value + 1 "
+                "RETURNING last_value",
+                (p_station, p_year, p_month),
+            ).fetchone()[0]
+
+    def _release_fir_sequence(self, p_station, p_year, p_month, p_value):
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE fir_sequences SET last_value = last_value - 1 "
+                "WHERE station = ? AND year = ? AND month = ? AND last_value = ?",
+                (p_station, p_year, p_month, p_value),
+            )
+            return cursor.rowcount == 1
+
+    def _insert_activity(self, conn, fir_number, activity, **overrides):
+        values = {c: activity.get(c) for c in ACTIVITY_COLUMNS}
+        values.update(overrides)
+        conn.execute(
+            f"INSERT INTO case_activities (fir_number, {', '.join(ACTIVITY_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' * len(ACTIVITY_COLUMNS))})",
+            [fir_number] + [values[c] for c in ACTIVITY_COLUMNS],
+        )
+
+    def _register_fir(self, p_record, p_activity):
+        query = LocalQuery(self, "fir_records")
+        values = query._values(p_record)
+        columns = ", ".join(query._column(c) for c in p_record)
+        with self.transaction() as conn:
+            fir_id = conn.execute(
+                f"INSERT INTO fir_records ({columns}) VALUES ({', '.join('?' * len(values))}) RETURNING id",
+                values,
+            ).fetchone()[0]
+            self._insert_activity(conn, p_record.get("fir_number"), p_activity or {})
+        return {"id": fir_id}
+
+    def _update_fir_status(self, p_fir_number, p_status, p_notes, p_activity):
+        with self.transaction() as conn:
+            row = conn.execute("SELECT id, status FROM fir_records WHERE fir_number = ?", (p_fir_number,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                f"UPDATE fir_records SET status = ?, investigation_notes = ?, updated_at = {NOW_SQL} WHERE id = ?",
+                (p_status, p_notes, row["id"]),
+            )
+            self._insert_activity(conn, p_fir_number, p_activity or {},
+                                  previous_value=row["status"], new_value=p_status)
+        return {"id": row["id"], "previous_status": row["status"]}
+
+    def _mark_fir_pdf_failed(self, p_fir_number, p_activity):
+        with self.transaction() as conn:
+            row = conn.execute(
+                f"UPDATE fir_records SET pdf_path = NULL, updated_at = {NOW_SQL} WHERE fir_number = ? RETURNING id",
+                (p_fir_number,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._insert_activity(conn, p_fir_number, p_activity or {})
+        return {"id": row["id"]}
@@ -5,11 +5,268 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import io
+import json
+from scripts.pdf_index import DRAFTS_DIR, get_pdf_index
 import logging
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+LOGO_PATH = "static/logo.png"
+PDF_RENDER_PROCESSES = int(os.getenv("PDF_RENDER_PROCESSES", 0))
+# Render workers never fork: a forked child inherits the app's threads, locks and open connections
+PDF_RENDER_START_METHOD = os.getenv("PDF_RENDER_START_METHOD") or (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+def _table_style(label_background, valign=None, bottom_padding=True):
+    commands = [
+        ('BOX', (0, 0), (-1, -1), 1, colors.black),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]
+    if label_background is not None:
+        commands.append(('BACKGROUND', (0, 0), (0, -1), label_background))
+    if valign:
+        commands.append(('VALIGN', (0, 0), (-1, -1), valign))
+    commands += [
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ]
+    if bottom_padding:
+        commands.append(('BOTTOMPADDING', (0, 0), (-1, -1), 6))
+    return TableStyle(commands)
+
+
+class FIRTemplate:
+    """FIR layout compiled once: paragraph styles, table styles and the logo.
+
+    Only the flowables that carry FIR data are created per render.
+    """
+
+    def __init__(self, logo_path=LOGO_PATH):
+        styles = getSampleStyleSheet()
+
+        # Custom Styles
+        self.title_style = ParagraphStyle(
+            'FIRTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            textColor=colors.HexColor('#0d47a1'),
+            alignment=1,
+            spaceAfter=20
+        )
+
+        self.header_style = ParagraphStyle(
+            'Header',
+            parent=styles['Heading2'],
+            fontSize=12,
+            textColor=colors.HexColor('#b71c1c'),
+            spaceBefore=10,
+            spaceAfter=8,
+            underlineWidth=1
+        )
+
+        self.content_style = ParagraphStyle(
+            'Content',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=6
+        )
+
+        self.description_style = ParagraphStyle(
+            'Description',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=12,
+            backColor=colors.HexColor('#f8f9fa'),
+            borderPadding=8,
+            borderColor=colors.HexColor('#dee2e6'),
+            borderWidth=1
+        )
+
+        self.fir_table_style = _table_style(colors.whitesmoke, valign='MIDDLE', bottom_padding=False)
+        self.incident_table_style = _table_style(colors.HexColor('#f5f5f5'), valign='TOP')
+        self.victim_table_style = _table_style(colors.whitesmoke)
+        self.accused_table_style = _table_style(colors.HexColor('#f5f5f5'), bottom_padding=False)
+        self.sections_table_style = _table_style(None)
+
+        # Optional: Police Logo (read once; a fresh Image flowable is needed per document)
+        self.logo_bytes = None
+        if os.path.exists(logo_path):
+            try:
+                with open(logo_path, "rb") as f:
+                    self.logo_bytes = f.read()
+            except Exception as logo_error:
+                logger.warning(f"⚠️ Could not load logo: {logo_error}")
+
+    def story(self, fir_data):
+        story = []
+
+        if self.logo_bytes:
+            try:
+                logo = Image(io.BytesIO(self.logo_bytes), width=60, height=60)
+                logo.hAlign = 'CENTER'
+                story.append(logo)
+                story.append(Spacer(1, 10))
+            except Exception as logo_error:
+                logger.warning(f"⚠️ Could not load logo: {logo_error}")
+
+        # Title
+        story.append(Paragraph("<b>FIRST INFORMATION REPORT (FIR)</b>", self.title_style))
+        story.append(Spacer(1, 10))
+
+        # === FIR Header Info ===
+        fir_info = [
+            ["FIR Number", fir_data.get('fir_number', 'N/A')],
+            ["Date & Time", registered_at(fir_data).strftime("%d/%m/%Y %H:%M")],
+            ["Police Station", fir_data.get('police_station', 'N/A')],
+            ["District", fir_data.get('district', 'N/A')],
+            ["State", fir_data.get('state', 'N/A')]
+        ]
+
+        fir_table = Table(fir_info, colWidths=[120, 350])
+        fir_table.setStyle(self.fir_table_style)
+        story.append(fir_table)
+        story.append(Spacer(1, 15))
+
+        # === INCIDENT DETAILS ===
+        story.append(Paragraph("INCIDENT DETAILS", self.header_style))
+
+        inc = fir_data.get('incident_details', {})
+        if not inc:
+            logger.warning("⚠️ No incident details found in FIR data")
+
+        # Table part (without description)
+        incident_data = [
+            ["Type of Incident", inc.get('type', 'N/A')],
+            ["Date of Incident", inc.get('date', 'N/A')],
+            ["Time of Incident", inc.get('time', 'N/A')],
+            ["Location", inc.get('location', 'N/A')],
+        ]
+
+        incident_table = Table(incident_data, colWidths=[120, 350])
+        incident_table.setStyle(self.incident_table_style)
+        story.append(incident_table)
+        story.append(Spacer(1, 5))
+
+        # Description as a separate paragraph block
+        story.append(Paragraph("<b>Description:</b>", self.content_style))
+        incident_desc = inc.get('description', 'No description provided')
+        story.append(Paragraph(incident_desc, self.description_style))
+        story.append(Spacer(1, 15))
+
+        # === VICTIM INFORMATION ===
+        story.append(Paragraph("VICTIM INFORMATION", self.header_style))
+        vic = fir_data.get('victim_info', {})
+        victim_data = [
+            ["Name", vic.get('name', 'N/A')],
+            ["Contact", vic.get('contact', 'N/A')],
+            ["Address", vic.get('address', 'N/A')],
+            ["Age", str(vic.get('age', 'N/A'))],
+            ["Gender", vic.get('gender', 'N/A')],
+        ]
+
+        victim_table = Table(victim_data, colWidths=[120, 350])
+        victim_table.setStyle(self.victim_table_style)
+        story.append(victim_table)
+        story.append(Spacer(1, 15))
+
+        # === ACCUSED INFO ===
+        acc = fir_data.get('accused_info', {})
+        if acc.get('name'):
+            story.append(Paragraph("ACCUSED INFORMATION", self.header_style))
+            accused_data = [
+                ["Name", acc.get('name', 'N/A')],
+                ["Description", acc.get('description', 'N/A')],
+            ]
+            accused_table = Table(accused_data, colWidths=[120, 350])
+            accused_table.setStyle(self.accused_table_style)
+            story.append(accused_table)
+            story.append(Spacer(1, 15))
+
+        # === LEGAL SECTIONS ===
+        story.append(Paragraph("LEGAL SECTIONS APPLIED", self.header_style))
+        sections_applied = fir_data.get('sections_applied', [])
+        if sections_applied:
+            sections = [
+                [f"IPC Section {s.get('section_number', 'N/A')}: {s.get('section_title', 'N/A')}"]
+                for s in sections_applied
+            ]
+            sec_table = Table(sections, colWidths=[470])
+            sec_table.setStyle(self.sections_table_style)
+            story.append(sec_table)
+        else:
+            story.append(Paragraph("No specific sections applied", self.content_style))
+
+        story.append(Spacer(1, 15))
+
+        # === OFFICER INFO ===
+        story.append(Paragraph("INVESTIGATING OFFICER", self.header_style))
+        story.append(Paragraph(fir_data.get('investigating_officer', 'N/A'), self.content_style))
+        story.append(Spacer(1, 25))
+
+        # === ADDITIONAL COMMENTS ===
+        additional_comments = fir_data.get('additional_comments', '')
+        if additional_comments:
+            story.append(Paragraph("ADDITIONAL COMMENTS", self.header_style))
+            story.append(Paragraph(additional_comments, self.description_style))
+            story.append(Spacer(1, 15))
+
+        # === SIGNATURE AREA ===
+        story.append(Spacer(1, 20))
+        story.append(Paragraph("<b>Signature of Officer:</b> ____________________________", self.content_style))
+        story.append(Spacer(1, 10))
+        story.append(Paragraph("<b>Date:</b> ____________________________", self.content_style))
+        return story
+
+    def render(self, fir_data, filepath):
+        doc = SimpleDocTemplate(
+            filepath,
+            pagesize=A4,
+            rightMargin=40,
+            leftMargin=40,
+            topMargin=40,
+            bottomMargin=40,
+            # No creation date or random document ID: the same FIR always renders to the same bytes (and ETag)
+            invariant=1
+        )
+        doc.build(self.story(fir_data))
+        return filepath
+
+
+_template = None
+
+def get_template():
+    """The FIRTemplate for this process (built on first use)."""
+    global _template
+    if _template is None:
+        _template = FIRTemplate()
+    return _template
+
+def registered_at(fir_data):
+    """Registration time printed on the FIR, in the server's local time zone.
+
+    The timestamp is the FIR's created_at (aware UTC) on both the first
+    render and regenerate_month, so re-renders print the same value.
+    Naive timestamps from older FIRs are taken as local time.
+    """
+    try:
+        return datetime.fromisoformat(str(fir_data.get('timestamp')).replace("Z", "+00:00")).astimezone()
+    except (TypeError, ValueError):
+        return datetime.now()
+
+def fir_pdf_path(fir_number):
+    """Where the PDF for ``fir_number`` (STATION/YYYY/MM/NNNN) is written, or None if malformed."""
+    parts = fir_number.split('/')
+    if len(parts) < 4:
+        return None
+    year = parts[1]
+    month = int(parts[2])
+    month_name = datetime(2000, month, 1).strftime('%B')
+    return os.path.join(DRAFTS_DIR, year, f"{month:02d}_{month_name}", f"{fir_number.replace('/', '_')}.pdf")
+
 def generate_fir_pdf(fir_data):
     """Generate FIR PDF in official structured format with proper error handling"""
     try:
@@ -23,237 +280,30 @@ def generate_fir_pdf(fir_data):
         
         # Directory setup with proper error handling
         try:
-            parts = fir_number.split('/')
-            if len(parts) < 4:
+            filepath = fir_pdf_path(fir_number)
+            if not filepath:
                 logger.error(f"❌ Invalid FIR number format: {fir_number}")
                 return None
-                
-            year = parts[1]
-            month = int(parts[2])
-            month_name = datetime(2000, month, 1).strftime('%B')
 
-            dir_path = f"fir_drafts/{year}/{month:02d}_{month_name}"
+            dir_path = os.path.dirname(filepath)
             os.makedirs(dir_path, exist_ok=True)
             logger.info(f"✅ Created directory: {dir_path}")
-
-            filename = f"{fir_number.replace('/', '_')}.pdf"
-            filepath = os.path.join(dir_path, filename)
             
         except Exception as dir_error:
             logger.error(f"❌ Directory creation failed: {dir_error}")
             return None
 
-        # Create Document
+        # Render with the per-process compiled template
         try:
-            doc = SimpleDocTemplate(
-                filepath,
-                pagesize=A4,
-                rightMargin=40,
-                leftMargin=40,
-                topMargin=40,
-                bottomMargin=40
-            )
-
-            styles = getSampleStyleSheet()
-
-            # Custom Styles
-            title_style = ParagraphStyle(
-                'FIRTitle',
-                parent=styles['Heading1'],
-                fontSize=18,
-                textColor=colors.HexColor('#0d47a1'),
-                alignment=1,
-                spaceAfter=20
-            )
-
-            header_style = ParagraphStyle(
-                'Header',
-                parent=styles['Heading2'],
-                fontSize=12,
-                textColor=colors.HexColor('#b71c1c'),
-                spaceBefore=10,
-                spaceAfter=8,
-                underlineWidth=1
-            )
-
-            content_style = ParagraphStyle(
-                'Content',
-                parent=styles['Normal'],
-                fontSize=10,
-                spaceAfter=6
-            )
-
-            description_style = ParagraphStyle(
-                'Description',
-                parent=styles['Normal'],
-                fontSize=10,
-                spaceAfter=12,
-                backColor=colors.HexColor('#f8f9fa'),
-                borderPadding=8,
-                borderColor=colors.HexColor('#dee2e6'),
-                borderWidth=1
-            )
-
-            story = []
-
-            # Optional: Add Police Logo (if available)
-            logo_path = "static/logo.png"
-            if os.path.exists(logo_path):
-                try:
-                    logo = Image(logo_path, width=60, height=60)
-                    logo.hAlign = 'CENTER'
-                    story.append(logo)
-                    story.append(Spacer(1, 10))
-                except Exception as logo_error:
-                    logger.warning(f"⚠️ Could not load logo: {logo_error}")
-
-            # Title
-            story.append(Paragraph("<b>FIRST INFORMATION REPORT (FIR)</b>", title_style))
-            story.append(Spacer(1, 10))
-
-            # === FIR Header Info ===
-            fir_info = [
-                ["FIR Number", fir_data.get('fir_number', 'N/A')],
-                ["Date & Time", datetime.now().strftime("%d/%m/%Y %H:%M")],
-                ["Police Station", fir_data.get('police_station', 'N/A')],
-                ["District", fir_data.get('district', 'N/A')],
-                ["State", fir_data.get('state', 'N/A')]
-            ]
-
-            fir_table = Table(fir_info, colWidths=[120, 350])
-            fir_table.setStyle(TableStyle([
-                ('BOX', (0, 0), (-1, -1), 1, colors.black),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.whitesmoke),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            story.append(fir_table)
-            story.append(Spacer(1, 15))
-
-            # === INCIDENT DETAILS ===
-            story.append(Paragraph("INCIDENT DETAILS", header_style))
-
-            inc = fir_data.get('incident_details', {})
-            if not inc:
-                logger.warning("⚠️ No incident details found in FIR data")
-
-            # Table part (without description)
-            incident_data = [
-                ["Type of Incident", inc.get('type', 'N/A')],
-                ["Date of Incident", inc.get('date', 'N/A')],
-                ["Time of Incident", inc.get('time', 'N/A')],
-                ["Location", inc.get('location', 'N/A')],
-            ]
-
-            incident_table = Table(incident_data, colWidths=[120, 350])
-            incident_table.setStyle(TableStyle([
-                ('BOX', (0, 0), (-1, -1), 1, colors.black),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f5f5f5')),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            story.append(incident_table)
-            story.append(Spacer(1, 5))
-
-            # Description as a separate paragraph block
-            story.append(Paragraph("<b>Description:</b>", content_style))
-            incident_desc = inc.get('description', 'No description provided')
-            story.append(Paragraph(incident_desc, description_style))
-            story.append(Spacer(1, 15))
-
-            # === VICTIM INFORMATION ===
-            story.append(Paragraph("VICTIM INFORMATION", header_style))
-            vic = fir_data.get('victim_info', {})
-            victim_data = [
-                ["Name", vic.get('name', 'N/A')],
-                ["Contact", vic.get('contact', 'N/A')],
-                ["Address", vic.get('address', 'N/A')],
-                ["Age", str(vic.get('age', 'N/A'))],
-                ["Gender", vic.get('gender', 'N/A')],
-            ]
-
-            victim_table = Table(victim_data, colWidths=[120, 350])
-            victim_table.setStyle(TableStyle([
-                ('BOX', (0, 0), (-1, -1), 1, colors.black),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.whitesmoke),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            story.append(victim_table)
-            story.append(Spacer(1, 15))
-
-            # === ACCUSED INFO ===
-            acc = fir_data.get('accused_info', {})
-            if acc.get('name'):
-                story.append(Paragraph("ACCUSED INFORMATION", header_style))
-                accused_data = [
-                    ["Name", acc.get('name', 'N/A')],
-                    ["Description", acc.get('description', 'N/A')],
-                ]
-                accused_table = Table(accused_data, colWidths=[120, 350])
-                accused_table.setStyle(TableStyle([
-                    ('BOX', (0, 0), (-1, -1), 1, colors.black),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f5f5f5')),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                ]))
-                story.append(accused_table)
-                story.append(Spacer(1, 15))
-
-            # === LEGAL SECTIONS ===
-            story.append(Paragraph("LEGAL SECTIONS APPLIED", header_style))
-            sections_applied = fir_data.get('sections_applied', [])
-            if sections_applied:
-                sections = [
-                    [f"IPC Section {s.get('section_number', 'N/A')}: {s.get('section_title', 'N/A')}"]
-                    for s in sections_applied
-                ]
-                sec_table = Table(sections, colWidths=[470])
-                sec_table.setStyle(TableStyle([
-                    ('BOX', (0, 0), (-1, -1), 1, colors.black),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                ]))
-                story.append(sec_table)
-            else:
-                story.append(Paragraph("No specific sections applied", content_style))
-
-            story.append(Spacer(1, 15))
-
-            # === OFFICER INFO ===
-            story.append(Paragraph("INVESTIGATING OFFICER", header_style))
-            story.append(Paragraph(fir_data.get('investigating_officer', 'N/A'), content_style))
-            story.append(Spacer(1, 25))
-
-            # === ADDITIONAL COMMENTS ===
-            additional_comments = fir_data.get('additional_comments', '')
-            if additional_comments:
-                story.append(Paragraph("ADDITIONAL COMMENTS", header_style))
-                story.append(Paragraph(additional_comments, description_style))
-                story.append(Spacer(1, 15))
-
-            # === SIGNATURE AREA ===
-            story.append(Spacer(1, 20))
-            story.append(Paragraph("<b>Signature of Officer:</b> ____________________________", content_style))
-            story.append(Spacer(1, 10))
-            story.append(Paragraph("<b>Date:</b> ____________________________", content_style))
-
-            # Build PDF
-            doc.build(story)
+            get_template().render(fir_data, filepath)
             
             # Verify PDF was created
             if os.path.exists(filepath):
                 logger.info(f"✅ PDF generated successfully: {filepath}")
+                try:
+                    get_pdf_index().record(fir_number, filepath)
+                except Exception as index_error:
+                    logger.warning(f"⚠️ Could not index PDF for {fir_number}: {index_error}")
                 return filepath
             else:
                 logger.error(f"❌ PDF file was not created: {filepath}")
@@ -266,3 +316,120 @@ def generate_fir_pdf(fir_data):
     except Exception as e:
         logger.error(f"💥 Fatal error in generate_fir_pdf: {str(e)}")
         return None
+
+
+def fir_data_from_record(record):
+    """FIR document structure from a fir_records row (inverse of the API's build_fir_record)."""
+    sections = record.get('ipc_sections') or []
+    if isinstance(sections, str):
+        try:
+            sections = json.loads(sections)
+        except ValueError:
+            sections = []
+    return {
+        'fir_number': record.get('fir_number'),
+        'timestamp': record.get('created_at'),
+        'police_station': record.get('police_station', 'Local Police Station'),
+        'district': record.get('district', 'District'),
+        'state': record.get('state', 'State'),
+        'incident_details': {
+            'type': record.get('incident_type', ''),
+            'date': record.get('incident_date', ''),
+            'time': record.get('incident_time', ''),
+            'location': record.get('incident_location', ''),
+            'description': record.get('incident_description', '')
+        },
+        'victim_info': {
+            'name': record.get('victim_name', ''),
+            'contact': record.get('victim_contact', ''),
+            'address': record.get('victim_address', ''),
+            'age': record.get('victim_age', ''),
+            'gender': record.get('victim_gender', '')
+        },
+        'accused_info': {
+            'name': record.get('accused_name', ''),
+            'description': record.get('accused_description', '')
+        },
+        'sections_applied': sections if isinstance(sections, list) else [],
+        'investigating_officer': record.get('investigating_officer', 'Investigation Officer'),
+        'additional_comments': record.get('additional_comments', '')
+    }
+
+
+def _init_render_worker():
+    get_template()
+
+class PDFRenderPool:
+    """Renders FIR PDFs in worker processes, each holding its own compiled template.
+
+    ReportLab is pure Python and holds the GIL, so processes (not threads)
+    are what spread rendering across cores.
+    """
+
+    def __init__(self, processes=None, start_method=PDF_RENDER_START_METHOD):
+        self.processes = processes or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_render_worker,
+        )
+
+    def submit(self, fir_data):
+        return self._executor.submit(generate_fir_pdf, fir_data)
+
+    def render(self, fir_data):
+        """Render one FIR in a worker process and wait for its path."""
+        return self.submit(fir_data).result()
+
+    def render_many(self, fir_datas):
+        """Yield (fir_number, pdf_path or None) in input order."""
+        futures = [(fir_data.get('fir_number'), self.submit(fir_data)) for fir_data in fir_datas]
+        for fir_number, future in futures:
+            try:
+                yield fir_number, future.result()
+            except Exception as e:
+                logger.error(f"💥 Render failed for {fir_number}: {e}")
+                yield fir_number, None
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+def regenerate_month(year, month, processes=None, supabase_client=None):
+    """Re-render every FIR registered in a month (<FIR_DRAFTS_DIR>/<year>/<MM>_<Month>) from the database."""
+    import time
+
+    client = supabase_client
+    if client is None:
+        from scripts.supabase_client import SupabaseFIRClient
+        client = SupabaseFIRClient()
+    records = list(client.iter_firs_registered_in_month(year, month))
+    logger.info(f"🗂️ Regenerating {len(records)} FIRs for {month:02d}/{year}")
+
+    t0 = time.time()
+    pool = PDFRenderPool(processes)
+    try:
+        results = list(pool.render_many(fir_data_from_record(r) for r in records))
+    finally:
+        pool.shutdown()
+
+    failed = [fir_number for fir_number, path in results if not path]
+    logger.info(f"✅ Rendered {len(results) - len(failed)}/{len(results)} FIRs in {time.time() - t0:.2f}s "
+                f"with {pool.processes} processes")
+    return {"rendered": len(results) - len(failed), "failed": failed}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Regenerate FIR PDFs for a month from the database")
+    parser.add_argument("command", choices=["regenerate"])
+    parser.add_argument("year", type=int)
+    parser.add_argument("month", type=int)
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    summary = regenerate_month(args.year, args.month, args.processes)
+    if summary["failed"]:
+        print("Failed:", ", ".join(summary["failed"]))
@@ -0,0 +1,145 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+import logging
+
+from scripts.artifacts import file_sha256
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+PDF_INDEX_PATH = os.getenv("FIR_PDF_INDEX_PATH", os.path.join("models", "fir_pdfs.sqlite3"))
+DRAFTS_DIR = os.getenv("FIR_DRAFTS_DIR", "fir_drafts")
+
+# fir_drafts/<year>/<MM>_<Month>/<STATION>_<YYYY>_<MM>_<NNNN>.pdf
+PDF_NAME_RE = re.compile(r"^([A-Za-z0-9]+)_(\d{4})_(\d{2})_(\d+)\.pdf$")
+
+
+def fir_number_from_filename(name):
+    match = PDF_NAME_RE.match(name)
+    return "/".join(match.groups()) if match else None
+
+
+class PDFIndex:
+    """fir_number -> (path, size, mtime, etag) for rendered FIR PDFs.
+
+    Entries are written when a PDF is rendered, so a download is a single
+    primary-key lookup instead of probing or globbing fir_drafts. The etag
+    is the SHA-256 of the file contents, computed once at render time.
+    ``rebuild`` recreates the index from one scan of the archive.
+    """
+
+    def __init__(self, path=PDF_INDEX_PATH, drafts_dir=DRAFTS_DIR):
+        self.path = path
+        self.drafts_dir = drafts_dir
+        self._local = threading.local()
+        self._init_db()
+
+    def _conn(self):
+        # Per thread and per process: render-pool workers may be forked from a thread that had one
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fir_pdfs (
+                    fir_number TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    indexed_at REAL NOT NULL,
+                    etag TEXT
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(fir_pdfs)")}
+            if "etag" not in columns:
+                conn.execute("ALTER TABLE fir_pdfs ADD COLUMN etag TEXT")
+
+    @staticmethod
+    def _row(fir_number, path):
+        stat = os.stat(path)
+        return (fir_number, path, stat.st_size, stat.st_mtime, time.time(), file_sha256(path))
+
+    def record(self, fir_number, path):
+        """Index (or re-index) the PDF just written for ``fir_number``."""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fir_pdfs (fir_number, path, size, mtime, indexed_at, etag) VALUES (?, ?, ?, ?, ?, ?)",
+                self._row(fir_number, path),
+            )
+
+    def lookup(self, fir_number):
+        row = self._conn().execute(
+            "SELECT path, size, mtime, etag FROM fir_pdfs WHERE fir_number = ?", (fir_number,)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = {"fir_number": fir_number, "path": row[0], "size": row[1], "mtime": row[2], "etag": row[3]}
+        if entry["etag"] is None and os.path.exists(entry["path"]):
+            # Indexed before etags were stored
+            self.record(fir_number, entry["path"])
+            return self.lookup(fir_number)
+        return entry
+
+    def remove(self, fir_number):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM fir_pdfs WHERE fir_number = ?", (fir_number,))
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM fir_pdfs").fetchone()[0]
+
+    def rebuild(self):
+        """Replace the index with one scan of the drafts directory; returns the entry count."""
+        rows = []
+        for root, _, files in os.walk(self.drafts_dir):
+            for name in files:
+                fir_number = fir_number_from_filename(name)
+                if fir_number:
+                    try:
+                        rows.append(self._row(fir_number, os.path.join(root, name)))
+                    except OSError:
+                        continue
+
+        with self._conn() as conn:
+            conn.execute("DELETE FROM fir_pdfs")
+            conn.executemany(
+                "INSERT OR REPLACE INTO fir_pdfs (fir_number, path, size, mtime, indexed_at, etag) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        logger.info(f"✅ Indexed {len(rows)} FIR PDFs from {self.drafts_dir}")
+        return len(rows)
+
+
+_pdf_index = None
+_pdf_index_lock = threading.Lock()
+
+def get_pdf_index():
+    """Process-wide PDFIndex; built from a one-time scan if it starts out empty."""
+    global _pdf_index
+    with _pdf_index_lock:
+        if _pdf_index is None:
+            index = PDFIndex()
+            if len(index) == 0 and os.path.isdir(index.drafts_dir):
+                index.rebuild()
+            _pdf_index = index
+        return _pdf_index
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild":
+        logging.basicConfig(level=logging.INFO)
+        PDFIndex().rebuild()
+    else:
+        print("Usage: python -m scripts.pdf_index rebuild")
@@ -0,0 +1,143 @@
+import os
+import time
+import uuid
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.cache import LRUTTLCache
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+PDF_JOB_WORKERS = int(os.getenv("PDF_JOB_WORKERS", 4))
+PDF_JOB_TTL = float(os.getenv("PDF_JOB_TTL", 3600))
+PDF_JOB_MAX_JOBS = int(os.getenv("PDF_JOB_MAX_JOBS", 10000))
+PDF_JOB_RETRIES = int(os.getenv("PDF_JOB_RETRIES", 2))
+PDF_JOB_RETRY_DELAY = float(os.getenv("PDF_JOB_RETRY_DELAY", 2))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class PDFJob:
+    def __init__(self, fir_number, download_url=None):
+        self.id = uuid.uuid4().hex
+        self.fir_number = fir_number
+        self.download_url = download_url
+        self.status = QUEUED
+        self.pdf_path = None
+        self.error = None
+        self.attempts = 0
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._changed = threading.Condition()
+        self._version = 0
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def _update(self, **fields):
+        with self._changed:
+            for key, value in fields.items():
+                setattr(self, key, value)
+            self._version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, version, timeout):
+        """Block until the job changes after ``version``; returns the current version."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout=timeout)
+            return self._version
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "fir_number": self.fir_number,
+            "status": self.status,
+            "pdf_path": self.pdf_path,
+            "download_url": self.download_url if self.status == DONE else None,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class PDFJobQueue:
+    """Renders FIR PDFs off the request thread.
+
+    ``render`` is called on a worker thread and must return the PDF path
+    (or raise). A failed render is retried up to ``retries`` more times,
+    ``retry_delay`` seconds apart (growing linearly); after the last failure
+    ``on_failed(error)`` runs so the caller can record it durably. Jobs are
+    tracked in memory for PDF_JOB_TTL seconds, so status polling must reach
+    the same process that accepted the job.
+    """
+
+    def __init__(self, max_workers=PDF_JOB_WORKERS, ttl=PDF_JOB_TTL, max_jobs=PDF_JOB_MAX_JOBS,
+                 retries=PDF_JOB_RETRIES, retry_delay=PDF_JOB_RETRY_DELAY):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-job")
+        self._jobs = LRUTTLCache(max_jobs, ttl)
+        self.retries = max(0, int(retries))
+        self.retry_delay = max(0.0, float(retry_delay))
+
+    def submit(self, fir_number, render, *args, download_url=None, on_done=None, on_failed=None):
+        job = PDFJob(fir_number, download_url)
+        self._jobs.set(job.id, job)
+        self._pool.submit(self._run, job, render, args, on_done, on_failed)
+        logger.info(f"🗂️ Queued PDF job {job.id} for FIR {fir_number}")
+        return job
+
+    def _render(self, job, render, args):
+        """PDF path from the first successful attempt; raises the last error"""
+        for attempt in range(1, self.retries + 2):
+            try:
+                pdf_path = render(*args)
+                if not pdf_path or not os.path.exists(pdf_path):
+                    raise RuntimeError("Failed to generate PDF")
+                job._update(attempts=attempt)
+                return pdf_path
+            except Exception as e:
+                job._update(attempts=attempt, error=str(e))
+                if attempt > self.retries:
+                    raise
+                logger.warning(f"⚠️ PDF job {job.id} attempt {attempt} failed, retrying: {e}")
+                time.sleep(self.retry_delay * attempt)
+
+    def _run(self, job, render, args, on_done, on_failed):
+        job._update(status=RUNNING, started_at=time.time())
+        try:
+            pdf_path = self._render(job, render, args)
+        except Exception as e:
+            job._update(status=FAILED, error=str(e), finished_at=time.time())
+            logger.error(f"❌ PDF job {job.id} failed after {job.attempts} attempt(s): {e}")
+            if on_failed:
+                try:
+                    on_failed(str(e))
+                except Exception as hook_error:
+                    logger.warning(f"⚠️ PDF job {job.id} failure handling failed: {hook_error}")
+            return
+
+        if on_done:
+            try:
+                on_done(pdf_path)
+            except Exception as e:
+                logger.warning(f"⚠️ PDF job {job.id} post-processing failed: {e}")
+        job._update(status=DONE, pdf_path=pdf_path, error=None, finished_at=time.time())
+        logger.info(f"✅ PDF job {job.id} finished in {job.finished_at - job.started_at:.2f}s")
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def stats(self):
+        jobs = [job for _, job in self._jobs.items()]
+        counts = {state: 0 for state in (QUEUED, RUNNING, DONE, FAILED)}
+        for job in jobs:
+            counts[job.status] += 1
+        return counts
@@ -0,0 +1,52 @@
+# Columns of fir_records that may be requested with ?fields=
+FIR_COLUMNS = (
+    "id", "fir_number", "police_station", "district", "state",
+    "incident_type", "incident_date", "incident_time", "incident_location", "incident_description",
+    "victim_name", "victim_contact", "victim_address", "victim_age", "victim_gender",
+    "accused_name", "accused_description", "ipc_sections", "investigating_officer",
+    "additional_comments", "investigation_notes", "status", "pdf_path", "created_at", "updated_at",
+)
+
+# Named projections; None selects every column
+FIR_PROJECTIONS = {
+    "full": None,
+    # Case tables (/api/fir/list, dashboard lists)
+    "table": ("id", "fir_number", "incident_type", "incident_date", "incident_location",
+              "investigating_officer", "status", "created_at"),
+    # Search result cards
+    "search": ("id", "fir_number", "police_station", "incident_type", "incident_date", "incident_location",
+               "victim_name", "ipc_sections", "investigating_officer", "status", "created_at"),
+    # Pending case cards
+    "pending": ("id", "fir_number", "incident_type", "incident_date", "incident_location",
+                "victim_name", "investigating_officer", "status", "created_at"),
+    # Recent updates / activity feed
+    "updates": ("fir_number", "incident_type", "status", "investigating_officer", "updated_at"),
+}
+
+
+def resolve_fields(fields, default="full", required=()):
+    """Column tuple for a ?fields= value, or None for every column.
+
+    ``fields`` is a projection name from FIR_PROJECTIONS or a comma
+    separated list of FIR_COLUMNS; empty means ``default``. ``required``
+    columns (e.g. pagination keys) are always included. Raises ValueError
+    for unknown names.
+    """
+    fields = (fields or "").strip() or default
+    if fields in FIR_PROJECTIONS:
+        columns = FIR_PROJECTIONS[fields]
+    else:
+        columns = tuple(c.strip() for c in fields.split(",") if c.strip())
+        unknown = [c for c in columns if c not in FIR_COLUMNS]
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(unknown)} (use one of {', '.join(FIR_PROJECTIONS)} or FIR columns)"
+            )
+    if columns is None:
+        return None
+    return columns + tuple(c for c in required if c not in columns)
+
+
+def select_list(columns):
+    """PostgREST select string for resolve_fields output"""
+    return "*" if columns is None else ",".join(columns)
@@ -1,11 +1,16 @@
 import os
 import re
 import pickle
-import numpy as np
-from sentence_transformers import SentenceTransformer
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
 from google import genai
 from google.genai.types import GenerateContentConfig
 from dotenv import load_dotenv
+from scripts.embedding_service import get_embedding_service
+from scripts.kb_index import KBIndex, normalize
+from scripts.artifacts import KB_ARTIFACT, ArtifactError, load_artifact
+from scripts.citation_index import CitationIndex
 
 # Load .env (for GEMINI_API_KEY)
 load_dotenv()
@@ -13,12 +18,24 @@ load_dotenv()
 # Paths
 EMB_FILE = os.path.join("embeddings.pkl")
 
-# Load data + embeddings
-with open(EMB_FILE, "rb") as f:
-    df, embeddings = pickle.load(f)
+# Load data + embeddings (memory-mapped, pre-normalized artifact; legacy pickle as fallback)
+try:
+    embeddings, kb_meta, _ = load_artifact(KB_ARTIFACT)
+    df = pd.DataFrame(kb_meta)
+except ArtifactError as e:
+    print(f"⚠️ {e}. Falling back to {EMB_FILE} (run: python -m scripts.artifacts migrate)")
+    with open(EMB_FILE, "rb") as f:
+        df, embeddings = pickle.load(f)
+    embeddings = normalize(embeddings)
 
-# Load same embedding model for query encoding
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+# ANN index over the KB (mode from KB_INDEX_MODE: exact, flat, hnsw, ivf)
+kb_index = KBIndex(embeddings, normalized=True)
+
+# Section / act / legal-term citations -> KB rows
+citation_index = CitationIndex(df)
+
+# Shared process-wide embedding model for query encoding
+embedder = get_embedding_service()
 
 # Gemini client
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
@@ -27,16 +44,11 @@ client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 # 🔎 Direct Section Lookup
 # -------------------------
 def direct_section_lookup(query):
-    """Extract IPC/Section number from query and fetch directly from CSV if available."""
-    match = re.search(r"(ipc|section)\s*(\d+)", query.lower())
-    if match:
-        sec_num = match.group(2)
-        hits = df[df["title"].str.contains(
-            rf"(^|\b)(Section|IPC)\s*{sec_num}(\b|$)",
-            case=False, na=False, regex=True
-        )]
-        if not hits.empty:
-            return "\n\n".join(hits["title"] + " - " + hits["content"])
+    """Resolve IPC/Section citations (lists, ranges, suffixes) or act/term names straight from the KB."""
+    rows = citation_index.resolve(query)
+    if rows:
+        hits = df.iloc[rows]
+        return "\n\n".join(dict.fromkeys(hits["title"] + " - " + hits["content"]))
     return None
 
 # -------------------------
@@ -45,61 +57,67 @@ def direct_section_lookup(query):
 def search(query, top_k=5):
     """Search embeddings across ALL types (sections, faq, procedure, legalterm, act)."""
     q_emb = embedder.encode([query], convert_to_numpy=True)[0]
-    scores = np.dot(embeddings, q_emb) / (
-        np.linalg.norm(embeddings, axis=1) * np.linalg.norm(q_emb)
-    )
-    top_idx = np.argsort(scores)[::-1][:top_k]
-    results = [(df.iloc[i]["title"], df.iloc[i]["content"], scores[i]) for i in top_idx]
+    top_idx, scores = kb_index.search(q_emb, top_k)
+    results = [(df.iloc[i]["title"], df.iloc[i]["content"], float(s)) for i, s in zip(top_idx, scores)]
     return results
 
 # -------------------------
-# 🌐 Gemini Fallback
+# 🧭 Retrieval
+# -------------------------
+KB_THRESHOLD = 0.40
+KB_MODEL = "models/gemini-2.5-flash"
+FALLBACK_MODEL = "models/gemini-1.5-flash"
+NOT_A_LEGAL_TOKEN = "NOT_A_LEGAL_QUERY"
+
+# Speculative mode: for weak KB matches, send the KB-grounded and general
+# prompts concurrently and keep whichever is usable (KB preferred).
+SPECULATIVE = os.getenv("CHAT_SPECULATIVE", "0") == "1"
+SPECULATIVE_MAX_SCORE = float(os.getenv("CHAT_SPECULATIVE_MAX_SCORE", 0.6))
+SPECULATIVE_WORKERS = int(os.getenv("CHAT_SPECULATIVE_WORKERS", 8))
+
+def retrieve(query):
+    """Decide how a query is answered: direct citation, KB context, or no usable KB context."""
+    # 1️⃣ Try direct section lookup
+    direct_context = direct_section_lookup(query)
+    if direct_context:
+        return {"mode": "direct", "context": direct_context, "matches": [], "best_score": 1.0}
+
+    # 2️⃣ Embedding search across all entries
+    results = search(query, top_k=5)
+    best_score = results[0][2] if results else 0.0
+    matches = [{"title": r[0], "score": round(r[2], 4)} for r in results]
+
+    if best_score < KB_THRESHOLD:  # threshold
+        return {"mode": "fallback", "context": None, "matches": matches, "best_score": best_score}
+
+    context = "\n\n".join([f"{r[0]} - {r[1]}" for r in results])
+    return {"mode": "kb", "context": context, "matches": matches, "best_score": best_score}
+
+# -------------------------
+# 📝 Prompts
 # -------------------------
-def web_fallback(query):
-    prompt = f"""
+def fallback_prompt(query):
+    return f"""
 You are a legal assistant. 
 The knowledge base did not contain the answer.
 Determine if the query is about law, rights, procedures, legal terms, or courts.
 
-- If it is NOT legal → reply exactly: "Not a legal question."
+- If it is NOT legal → reply exactly: NOT_A_LEGAL_QUERY
 - If it IS legal → provide a clear and correct explanation, using your own legal knowledge and, if needed, search the internet.
 
 Query:
 {query}
 """
-    resp = client.models.generate_content(
-        model="models/gemini-1.5-flash",
-        contents=prompt,
-        config=GenerateContentConfig(temperature=0.3),
-    )
-    return resp.text
-
-# -------------------------
-# 🧠 Main Answer Logic
-# -------------------------
-def answer_query(query):
-    # 1️⃣ Try direct section lookup
-    direct_context = direct_section_lookup(query)
-    if direct_context:
-        context = direct_context
-    else:
-        # 2️⃣ Embedding search across all entries
-        results = search(query, top_k=5)
-        best_title, best_match, best_score = results[0]
-
-        if best_score < 0.40:  # threshold
-            return web_fallback(query)
-
-        context = "\n\n".join([f"{r[0]} - {r[1]}" for r in results])
 
-    # 3️⃣ Build prompt for Gemini (KB mode)
-    prompt = f"""
+def kb_prompt(query, context):
+    return f"""
 You are a legal assistant. Use the knowledge base context provided below.
 
 Rules:
 - If the context contains a legal answer, explain it clearly.
-- If context is EMPTY, reply exactly: "Not found in knowledge base."
-- Do NOT say "I will search", just use the context to explain.
+- If the context is incomplete but the query is legal, answer from your own legal knowledge.
+- If the query is NOT about law, rights, procedures, legal terms, or courts, reply exactly: NOT_A_LEGAL_QUERY
+- Do NOT say "I will search" or that the answer was not found, just explain.
 
 Context:
 {context}
@@ -107,13 +125,125 @@ Context:
 Query:
 {query}
 """
+
+def build_prompt(query, retrieval):
+    """(prompt, model, temperature) for a retrieve() result."""
+    if retrieval["mode"] == "fallback":
+        return fallback_prompt(query), FALLBACK_MODEL, 0.3
+    return kb_prompt(query, retrieval["context"]), KB_MODEL, 0.2
+
+# -------------------------
+# 🤖 Gemini Calls
+# -------------------------
+def generate(prompt, model=KB_MODEL, temperature=0.2):
     resp = client.models.generate_content(
-        model="models/gemini-2.5-flash",
+        model=model,
         contents=prompt,
-        config=GenerateContentConfig(temperature=0.2),
+        config=GenerateContentConfig(temperature=temperature),
     )
     return resp.text
 
+def generate_stream(prompt, model=KB_MODEL, temperature=0.2):
+    """Yield text chunks as Gemini produces them.
+
+    Closing this generator also closes the SDK stream, so an abandoned
+    request stops reading from the connection straight away.
+    """
+    stream = client.models.generate_content_stream(
+        model=model,
+        contents=prompt,
+        config=GenerateContentConfig(temperature=temperature),
+    )
+    try:
+        for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+    finally:
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+
+# -------------------------
+# 🏁 Speculative Fallback
+# -------------------------
+_speculative_pool = None
+_speculative_lock = threading.Lock()
+
+def _get_speculative_pool():
+    global _speculative_pool
+    with _speculative_lock:
+        if _speculative_pool is None:
+            _speculative_pool = ThreadPoolExecutor(max_workers=SPECULATIVE_WORKERS, thread_name_prefix="speculative")
+        return _speculative_pool
+
+def _collect(prompt, model, temperature, stop):
+    """Stream a completion into a string; closing the stream early cancels the request."""
+    parts = []
+    stream = generate_stream(prompt, model, temperature)
+    try:
+        for text in stream:
+            if stop.is_set():
+                return None
+            parts.append(text)
+    finally:
+        stream.close()
+    return "".join(parts)
+
+def should_speculate(retrieval):
+    return SPECULATIVE and retrieval["mode"] == "kb" and retrieval["best_score"] < SPECULATIVE_MAX_SCORE
+
+def speculative_answer(query, retrieval, accept=bool):
+    """Race the KB-grounded and general prompts; returns (answer, grounded).
+
+    The KB answer wins whenever ``accept`` approves it, and the general
+    request is then abandoned at its next chunk. Latency is that of the
+    slower of the two calls rather than their sum.
+    """
+    pool = _get_speculative_pool()
+    stop_kb, stop_general = threading.Event(), threading.Event()
+    kb = pool.submit(_collect, kb_prompt(query, retrieval["context"]), KB_MODEL, 0.2, stop_kb)
+    general = pool.submit(_collect, fallback_prompt(query), FALLBACK_MODEL, 0.3, stop_general)
+
+    try:
+        kb_answer = kb.result()
+    except Exception as e:
+        print(f"⚠️ Speculative KB answer failed: {e}")
+        kb_answer = None
+
+    if accept(kb_answer):
+        stop_general.set()
+        general.cancel()
+        return kb_answer, True
+    return general.result(), False
+
+# -------------------------
+# 🧠 Main Answer Logic
+# -------------------------
+def resolve_answer(query, retrieval=None, accept=bool):
+    """One LLM round trip per query: (answer, grounded).
+
+    Retrieval confidence picks the prompt up front; ``grounded`` is False
+    when the answer came from the general (non-KB) prompt. A KB-grounded
+    answer that ``accept`` rejects comes back as ``(None, False)`` so the
+    caller can fall back instead of serving (or caching) it.
+    """
+    retrieval = retrieval or retrieve(query)
+    if should_speculate(retrieval):
+        return speculative_answer(query, retrieval, accept)
+    answer = generate(*build_prompt(query, retrieval))
+    grounded = retrieval["mode"] != "fallback"
+    if grounded and not accept(answer):
+        return None, False
+    return answer, grounded
+
+def answer_query(query, retrieval=None):
+    return resolve_answer(query, retrieval)[0]
+
+def stream_answer(query, retrieval=None):
+    """Streaming counterpart of answer_query()."""
+    retrieval = retrieval or retrieve(query)
+    yield from generate_stream(*build_prompt(query, retrieval))
+
 # -------------------------
 # 🔄 CLI Loop
 # -------------------------
@@ -0,0 +1,102 @@
+import logging
+from datetime import date, timedelta
+
+from scripts.aggregations import scan_group_counts
+from scripts.supabase_client import missing_rpc
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+ROLLUP_DIMENSIONS = ("total", "status", "incident_type", "incident_location", "police_station", "district", "hour")
+
+_rollups_available = True
+
+
+def _rpc_rollup_counts(supabase, start_date, end_date):
+    response = supabase.rpc("fir_rollup_counts", {
+        "p_start_date": start_date,
+        "p_end_date": end_date,
+    }).execute()
+    counts = {dimension: {} for dimension in ROLLUP_DIMENSIONS}
+    for row in response.data or []:
+        counts.setdefault(row["dimension"], {})[row["key"]] = int(row["count"])
+    return counts
+
+
+def _rollup_day_range(query, start_date=None, end_date=None):
+    """Rows whose rollup day, COALESCE(incident_date, created_at::date), is in [start_date, end_date]"""
+    if not start_date and not end_date:
+        return query
+    by_incident, by_created = [], []
+    if start_date:
+        by_incident.append(f"incident_date.gte.{start_date}")
+        by_created.append(f"created_at.gte.{start_date}")
+    if end_date:
+        next_day = date.fromisoformat(str(end_date)[:10]) + timedelta(days=1)
+        by_incident.append(f"incident_date.lte.{end_date}")
+        by_created.append(f"created_at.lt.{next_day.isoformat()}")
+    return query.or_(f"and({','.join(by_incident)}),and(incident_date.is.null,{','.join(by_created)})")
+
+
+def rollup_counts(supabase, start_date=None, end_date=None, dimensions=ROLLUP_DIMENSIONS, missing="Unknown"):
+    """{dimension: {key: count}} for FIRs whose day falls in [start_date, end_date].
+
+    A FIR's day is its incident_date, or the date of created_at when it has
+    none, on both paths. Reads the fir_rollups counters (sql/fir_rollups.sql),
+    which a trigger keeps current on every insert and status change, so the
+    cost is one row per bucket however many FIRs fall in the range. ``total``
+    holds {"all": n}. If the rollups are not installed, the columns are
+    counted from a paged scan instead (no ``hour`` dimension there); other
+    RPC errors use the scan for that call only.
+    """
+    global _rollups_available
+    raw = None
+    if _rollups_available:
+        try:
+            raw = _rpc_rollup_counts(supabase, start_date, end_date)
+        except Exception as e:
+            if missing_rpc(e):
+                _rollups_available = False
+                logger.warning("⚠️ fir_rollup_counts RPC not installed, counting from paged scans")
+            else:
+                logger.warning(f"⚠️ fir_rollup_counts RPC failed, counting from a paged scan: {e}")
+
+    if raw is None:
+        columns = [d for d in dimensions if d not in ("total", "hour")] or ["status"]
+        raw = scan_group_counts(supabase, columns, lambda query: _rollup_day_range(query, start_date, end_date))
+        raw["total"] = {"all": sum(raw[columns[0]].values())}
+        raw.setdefault("hour", {})
+
+    result = {}
+    for dimension in dimensions:
+        buckets = {}
+        for key, count in raw.get(dimension, {}).items():
+            key = key or missing
+            if key is not None:
+                buckets[key] = buckets.get(key, 0) + count
+        result[dimension] = buckets
+    return result
+
+
+def rollup_total(counts):
+    return counts.get("total", {}).get("all", 0)
+
+
+def backfill(supabase):
+    """Rebuild every rollup counter from fir_records; returns the bucket count"""
+    response = supabase.rpc("rebuild_fir_rollups", {}).execute()
+    buckets = response.data if isinstance(response.data, int) else (response.data or [0])[0]
+    logger.info(f"✅ Rebuilt FIR rollups: {buckets} buckets")
+    return buckets
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill":
+        from scripts.supabase_client import SupabaseFIRClient
+
+        logging.basicConfig(level=logging.INFO)
+        backfill(SupabaseFIRClient().supabase)
+    else:
+        print("Usage: python -m scripts.rollups backfill")
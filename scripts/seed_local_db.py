@@ -0,0 +1,193 @@
+"""Fill the local SQLite backend (DB_BACKEND=sqlite) with synthetic FIRs.
+
+    python -m scripts.seed_local_db --count 2000000
+    python -m scripts.seed_local_db --count 500000 --path /tmp/bench.sqlite3 --reset
+
+Rows go in with the rollup triggers dropped, in batches of ``--batch``
+per transaction; the rollups, FIR sequences and planner statistics are
+rebuilt once at the end. Output is deterministic for a given ``--seed``.
+"""
+import json
+import time
+import random
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+
+from scripts.fir_numbers import format_fir_number
+from scripts.local_supabase import (
+    LOCAL_DB_PATH,
+    LocalSupabaseClient,
+    create_rollup_triggers,
+    drop_rollup_triggers,
+    rebuild_rollups,
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+STATIONS = [
+    ("CPS", "Central Police Station", "Mumbai", "Maharashtra"),
+    ("NPS", "North Police Station", "Mumbai", "Maharashtra"),
+    ("KPS", "Kothrud Police Station", "Pune", "Maharashtra"),
+    ("HPS", "Hazratganj Police Station", "Lucknow", "Uttar Pradesh"),
+    ("CNP", "Connaught Place Police Station", "New Delhi", "Delhi"),
+    ("KRM", "Koramangala Police Station", "Bengaluru", "Karnataka"),
+    ("ADY", "Adyar Police Station", "Chennai", "Tamil Nadu"),
+    ("PKS", "Park Street Police Station", "Kolkata", "West Bengal"),
+]
+LOCATIONS = ["Market Area", "Railway Station", "Bus Stand", "Residential Colony", "Highway", "College Campus",
+             "Shopping Mall", "Industrial Area", "Main Road", "Park"]
+# (incident type, IPC sections, relative frequency)
+INCIDENTS = [
+    ("Theft", ["379"], 30),
+    ("Burglary", ["454", "380"], 12),
+    ("Robbery", ["392"], 8),
+    ("Assault", ["323", "352"], 14),
+    ("Cheating", ["420"], 10),
+    ("Cyber Crime", ["420", "66D IT Act"], 8),
+    ("Criminal Intimidation", ["506"], 6),
+    ("Rash Driving", ["279", "337"], 7),
+    ("Domestic Violence", ["498A"], 4),
+    ("Murder", ["302"], 1),
+]
+STATUSES = [("registered", 20), ("under_investigation", 35), ("charges_filed", 12),
+            ("court_proceeding", 8), ("resolved", 18), ("closed", 7)]
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Sneha", "Vikram", "Anjali", "Rohan", "Kavya", "Arjun", "Meera"]
+LAST_NAMES = ["Sharma", "Patel", "Reddy", "Iyer", "Singh", "Gupta", "Nair", "Das", "Kulkarni", "Khan"]
+MODUS = ["Snatched from pedestrian", "Broke window lock at night", "Posed as bank official on phone",
+         "Two-wheeler, fled towards highway", "Forged documents", "Threatened with knife"]
+DEMO_USERS = [
+    {"full_name": "Demo Citizen", "email": "citizen@example.com", "password": "password",
+     "role": "citizen", "is_verified": 1},
+    {"full_name": "Demo Officer", "email": "police@example.com", "password": "password",
+     "role": "police", "is_verified": 1, "badge_number": "MH1234",
+     "police_station": "Central Police Station", "rank": "Inspector"},
+]
+
+FIR_INSERT_COLUMNS = (
+    "fir_number", "police_station", "district", "state", "incident_type", "incident_date", "incident_time",
+    "incident_location", "incident_description", "victim_name", "victim_contact", "victim_address",
+    "victim_age", "victim_gender", "accused_name", "accused_description", "modus_operandi", "ipc_sections",
+    "investigating_officer", "status", "created_at", "updated_at",
+)
+ACTIVITY_INSERT_COLUMNS = ("fir_number", "activity_type", "title", "description", "officer_name",
+                           "activity_date", "created_at")
+
+
+def _weighted(rng, choices):
+    return rng.choices([c[0] for c in choices], weights=[c[-1] for c in choices])[0]
+
+
+class FIRGenerator:
+    """Synthetic FIR rows, numbered per station and month like FIRNumberAllocator"""
+
+    def __init__(self, seed=42, years=3, sequences=None, now=None):
+        self.rng = random.Random(seed)
+        self.now = now or datetime.now(timezone.utc)
+        self.span = int(years * 365 * 86400)
+        self.sequences = dict(sequences or {})
+        self.incidents = [(name, sections) for name, sections, _ in INCIDENTS]
+        self.incident_weights = [weight for _, _, weight in INCIDENTS]
+
+    def _person(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def record(self):
+        rng = self.rng
+        code, station, district, state = rng.choice(STATIONS)
+        incident_type, sections = rng.choices(self.incidents, weights=self.incident_weights)[0]
+        incident_at = self.now - timedelta(seconds=rng.randrange(self.span))
+        created_at = min(incident_at + timedelta(minutes=rng.randrange(30, 4320)), self.now)
+        updated_at = min(created_at + timedelta(days=rng.randrange(0, 120)), self.now)
+
+        key = (code, created_at.year, created_at.month)
+        self.sequences[key] = self.sequences.get(key, 0) + 1
+        fir_number = format_fir_number(code, created_at.year, created_at.month, self.sequences[key])
+
+        location = f"{rng.choice(LOCATIONS)}, {district}"
+        accused = self._person() if rng.random() < 0.4 else None
+        officer = f"SI {self._person()}"
+        record = (
+            fir_number, station, district, state, incident_type,
+            incident_at.date().isoformat(), incident_at.strftime("%H:%M"), location,
+            f"{incident_type} reported at {location}. {rng.choice(MODUS)}.",
+            self._person(), f"9{rng.randrange(10**8, 10**9)}", f"{rng.randrange(1, 400)}, {district}",
+            rng.randrange(16, 80), rng.choice(["Male", "Female"]),
+            accused, "Medium build, around 30 years" if accused else None, rng.choice(MODUS),
+            json.dumps([{"section": s} for s in sections]),
+            officer, _weighted(rng, STATUSES), created_at.isoformat(), updated_at.isoformat(),
+        )
+        activity = (fir_number, "fir_registered", "FIR Registered",
+                    f"FIR registered for {incident_type} incident", officer,
+                    created_at.isoformat(), created_at.isoformat())
+        return record, activity
+
+
+def seed(path=LOCAL_DB_PATH, count=100000, batch=50000, seed=42, years=3, reset=False):
+    client = LocalSupabaseClient(path=path, latency_ms=0)
+    conn = client.connection()
+    if reset:
+        conn.executescript("DELETE FROM case_activities; DELETE FROM fir_records; "
+                           "DELETE FROM fir_sequences; DELETE FROM fir_rollups;")
+
+    sequences = {(row[0], row[1], row[2]): row[3] for row in
+                 conn.execute("SELECT station, year, month, last_value FROM fir_sequences")}
+    generator = FIRGenerator(seed=seed, years=years, sequences=sequences)
+
+    conn.execute("PRAGMA synchronous=OFF")
+    drop_rollup_triggers(conn)
+    fir_sql = (f"INSERT INTO fir_records ({', '.join(FIR_INSERT_COLUMNS)}) "
+               f"VALUES ({', '.join('?' * len(FIR_INSERT_COLUMNS))})")
+    activity_sql = (f"INSERT INTO case_activities ({', '.join(ACTIVITY_INSERT_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(ACTIVITY_INSERT_COLUMNS))})")
+
+    started = time.perf_counter()
+    written = 0
+    try:
+        while written < count:
+            size = min(batch, count - written)
+            rows = [generator.record() for _ in range(size)]
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(fir_sql, [r for r, _ in rows])
+            conn.executemany(activity_sql, [a for _, a in rows])
+            conn.execute("COMMIT")
+            written += size
+            rate = written / max(time.perf_counter() - started, 1e-9)
+            logger.info(f"📥 {written:,}/{count:,} FIRs ({rate:,.0f}/s)")
+
+        conn.execute("BEGIN IMMEDIATE")
+        for user in DEMO_USERS:
+            columns = ", ".join(user)
+            conn.execute(f"INSERT OR IGNORE INTO users ({columns}) VALUES ({', '.join('?' * len(user))})",
+                         list(user.values()))
+        conn.executemany(
+            "INSERT INTO fir_sequences (station, year, month, last_value) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (station, year, month) DO UPDATE SET last_value = MAX(last_value, excluded.last_value)",
+            [(*key, value) for key, value in generator.sequences.items()],
+        )
+        buckets = rebuild_rollups(conn)
+        conn.execute("COMMIT")
+    finally:
+        create_rollup_triggers(conn)
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+    conn.execute("ANALYZE")
+    total = conn.execute("SELECT COUNT(*) FROM fir_records").fetchone()[0]
+    logger.info(f"✅ Seeded {written:,} FIRs in {time.perf_counter() - started:.1f}s "
+                f"({total:,} in table, {buckets:,} rollup buckets)")
+    return {"written": written, "total": total, "rollup_buckets": buckets}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the local SQLite backend with synthetic FIRs")
+    parser.add_argument("--path", default=LOCAL_DB_PATH)
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--reset", action="store_true", help="delete existing FIRs, activities and rollups first")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    seed(path=args.path, count=args.count, batch=args.batch, seed=args.seed, years=args.years, reset=args.reset)
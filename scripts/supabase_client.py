@@ -1,45 +1,200 @@
 import os
+import base64
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
+from scripts.projections import select_list
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+KEYSET_PAGE_SIZE = int(os.getenv("KEYSET_PAGE_SIZE", 500))
+DB_BACKEND = os.getenv("DB_BACKEND", "supabase")  # supabase | sqlite
+
+
+def create_db_client(url=None, key=None):
+    """Supabase client, or the embedded SQLite stand-in when DB_BACKEND=sqlite"""
+    if DB_BACKEND == "sqlite":
+        from scripts.local_supabase import LocalSupabaseClient
+        return LocalSupabaseClient()
+    return create_client(url, key)
+
+
+def month_bounds(year, month):
+    """[start, end) ISO dates for a calendar month"""
+    next_month = month + 1 if month < 12 else 1
+    next_year = year if month < 12 else year + 1
+    return f"{year}-{month:02d}-01", f"{next_year}-{next_month:02d}-01"
+
+
+def apply_fir_filters(query, filters=None):
+    """Apply the /api/fir/search filters to a fir_records query"""
+    if filters:
+        if filters.get('start_date') and filters.get('end_date'):
+            query = query.gte('incident_date', filters['start_date'])\
+                        .lte('incident_date', filters['end_date'])
+        
+        if filters.get('date'):
+            query = query.eq('incident_date', filters['date'])
+        
+        if filters.get('incident_type'):
+            query = query.eq('incident_type', filters['incident_type'])
+        
+        if filters.get('police_station'):
+            query = query.eq('police_station', filters['police_station'])
+        
+        if filters.get('district'):
+            query = query.eq('district', filters['district'])
+        
+        if filters.get('ipc_section'):
+            query = query.ilike('ipc_sections', f'%{filters["ipc_section"]}%')
+        
+        if filters.get('search_text'):
+            query = query.ilike('incident_description', f'%{filters["search_text"]}%')
+    return query
+
+
+def _quote(value):
+    """PostgREST logic-tree value, quoted so timestamps and text with , . : ( ) survive"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def keyset_after(keys, row):
+    """PostgREST or=() filter for rows strictly after ``row`` in ``keys`` order.
+
+    keys is [(column, desc), ...]; (a, b) after (x, y) means
+    a > x OR (a = x AND b > y), with < for descending columns.
+    """
+    clauses = []
+    for i, (column, desc) in enumerate(keys):
+        condition = f"{column}.{'lt' if desc else 'gt'}.{_quote(row[column])}"
+        equal = [f"{c}.eq.{_quote(row[c])}" for c, _ in keys[:i]]
+        clauses.append(f"and({','.join(equal + [condition])})" if equal else condition)
+    return ",".join(clauses)
+
+
+def keyset_scan(make_query, keys, page_size=KEYSET_PAGE_SIZE):
+    """Yield rows of ``make_query()`` in ``keys`` order, fetching one page at a time.
+
+    Each page resumes strictly after the last row of the previous page
+    instead of using OFFSET, so every page costs the same and rows are
+    neither skipped nor repeated while the table changes. The last key
+    should be unique (e.g. id) and no key may be NULL.
+    """
+    last = None
+    while True:
+        query = make_query()
+        if last is not None:
+            query = query.or_(keyset_after(keys, last))
+        for column, desc in keys:
+            query = query.order(column, desc=desc)
+        rows = query.limit(page_size).execute().data or []
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last = rows[-1]
+
+
+def clean_fir_record(fir_data):
+    """fir_records row with None values replaced by column defaults"""
+    clean_data = {}
+    for key, value in fir_data.items():
+        if value is None:
+            # Set appropriate defaults for None values
+            if key in ['victim_age']:
+                clean_data[key] = 0
+            elif key in ['ipc_sections']:
+                clean_data[key] = '[]'
+            else:
+                clean_data[key] = ''
+        else:
+            clean_data[key] = value
+    return clean_data
+
+
+def missing_rpc(error):
+    """True when PostgREST reports that the function is not installed"""
+    return getattr(error, "code", None) == "PGRST202" or "PGRST202" in str(error)
+
+
+def encode_cursor(keys, row, direction="next"):
+    """Opaque page cursor holding the ``keys`` values of ``row``"""
+    payload = {"d": direction, "k": [row[column] for column, _ in keys]}
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(keys, cursor):
+    """(direction, row) from encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction, values = payload["d"], payload["k"]
+        if direction not in ("next", "prev") or len(values) != len(keys):
+            raise ValueError(cursor)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return direction, {column: value for (column, _), value in zip(keys, values)}
+
+
+def keyset_page(query, keys, limit, cursor=None):
+    """One page of ``query`` in ``keys`` order, positioned by an opaque cursor.
+
+    A "next" cursor resumes after the last row of a page, a "prev" cursor
+    returns the rows just before the first one (fetched in reverse order,
+    then flipped). One extra row is fetched to know whether more exist.
+    Returns {"rows", "next_cursor", "prev_cursor", "count"}; count is only
+    set when ``query`` was built with select(..., count=...).
+    """
+    direction, anchor = decode_cursor(keys, cursor) if cursor else ("next", None)
+    order = keys if direction == "next" else [(column, not desc) for column, desc in keys]
+
+    if anchor is not None:
+        query = query.or_(keyset_after(order, anchor))
+    for column, desc in order:
+        query = query.order(column, desc=desc)
+    response = query.limit(limit + 1).execute()
+
+    rows = response.data or []
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "prev":
+        rows.reverse()
+
+    has_next = more if direction == "next" else anchor is not None
+    has_prev = anchor is not None if direction == "next" else more
+    return {
+        "rows": rows,
+        "next_cursor": encode_cursor(keys, rows[-1], "next") if rows and has_next else None,
+        "prev_cursor": encode_cursor(keys, rows[0], "prev") if rows and has_prev else None,
+        "count": getattr(response, "count", None),
+    }
+
+
 class SupabaseFIRClient:
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL")
         # Prefer service role key if available, otherwise fall back to anon key
         self.key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
         
-        if not self.url or not self.key:
+        if DB_BACKEND != "sqlite" and (not self.url or not self.key):
             raise ValueError("Supabase URL and Key must be set in environment variables")
         
-        self.supabase: Client = create_client(self.url, self.key)
-        logger.info("✅ Supabase client initialized successfully")
+        self.supabase: Client = create_db_client(self.url, self.key)
+        self._write_rpcs = True
+        logger.info(f"✅ Supabase client initialized successfully (backend: {DB_BACKEND})")
     
     def store_fir_record(self, fir_data):
         """Store FIR record in Supabase with proper error handling"""
         try:
             logger.info(f"💾 Attempting to store FIR record: {fir_data.get('fir_number', 'Unknown')}")
             
-            # Clean the data - remove None values and handle special cases
-            clean_data = {}
-            for key, value in fir_data.items():
-                if value is None:
-                    # Set appropriate defaults for None values
-                    if key in ['victim_age']:
-                        clean_data[key] = 0
-                    elif key in ['ipc_sections']:
-                        clean_data[key] = '[]'
-                    else:
-                        clean_data[key] = ''
-                else:
-                    clean_data[key] = value
+            clean_data = clean_fir_record(fir_data)
             
             # Ensure required fields are present
             if 'fir_number' not in clean_data:
@@ -62,34 +217,82 @@ class SupabaseFIRClient:
             logger.error(f"💥 Exception in store_fir_record for {fir_data.get('fir_number', 'Unknown')}: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def search_fir_records(self, filters=None):
-        """Search FIR records with various filters"""
+    def register_fir(self, fir_data, activity_data):
+        """Insert the FIR and its first case activity in one transaction (register_fir RPC).
+
+        Falls back to store_fir_record + create_case_activity (two round
+        trips, not atomic) until sql/fir_write_rpcs.sql is installed.
+        """
+        clean_data = clean_fir_record(fir_data)
+        if 'fir_number' not in clean_data:
+            logger.error("❌ Missing fir_number in FIR data")
+            return {"success": False, "error": "FIR number is required"}
+        
+        if self._write_rpcs:
+            try:
+                response = self.supabase.rpc("register_fir", {
+                    "p_record": clean_data,
+                    "p_activity": activity_data
+                }).execute()
+                logger.info(f"✅ FIR and activity stored in one transaction: {clean_data['fir_number']}")
+                return {"success": True, "id": (response.data or {}).get('id'), "activity_recorded": True}
+            except Exception as e:
+                if not missing_rpc(e):
+                    logger.error(f"💥 register_fir failed for {clean_data['fir_number']}: {str(e)}")
+                    return {"success": False, "error": str(e)}
+                self._write_rpcs = False
+                logger.warning("⚠️ Write RPCs not installed, using separate FIR and activity inserts")
+        
+        result = self.store_fir_record(clean_data)
+        if result['success']:
+            activity = self.create_case_activity({**activity_data, 'fir_number': clean_data['fir_number']})
+            result['activity_recorded'] = activity['success']
+        return result
+    
+    def update_case_status(self, fir_number, status, notes, activity_data):
+        """Set status and notes and append the status_change activity in one transaction.
+
+        Returns {"success", "found"}; falls back to an update followed by an
+        activity insert when the update_fir_status RPC is not installed.
+        """
+        if self._write_rpcs:
+            try:
+                response = self.supabase.rpc("update_fir_status", {
+                    "p_fir_number": fir_number,
+                    "p_status": status,
+                    "p_notes": notes,
+                    "p_activity": activity_data
+                }).execute()
+                return {"success": True, "found": bool(response.data), "activity_recorded": bool(response.data)}
+            except Exception as e:
+                if not missing_rpc(e):
+                    logger.error(f"💥 update_fir_status failed for {fir_number}: {str(e)}")
+                    return {"success": False, "error": str(e)}
+                self._write_rpcs = False
+                logger.warning("⚠️ Write RPCs not installed, using separate status update and activity insert")
+        
         try:
-            query = self.supabase.table("fir_records").select("*")
-            
-            if filters:
-                if filters.get('start_date') and filters.get('end_date'):
-                    query = query.gte('incident_date', filters['start_date'])\
-                                .lte('incident_date', filters['end_date'])
-                
-                if filters.get('date'):
-                    query = query.eq('incident_date', filters['date'])
-                
-                if filters.get('incident_type'):
-                    query = query.eq('incident_type', filters['incident_type'])
-                
-                if filters.get('police_station'):
-                    query = query.eq('police_station', filters['police_station'])
-                
-                if filters.get('district'):
-                    query = query.eq('district', filters['district'])
-                
-                if filters.get('ipc_section'):
-                    query = query.ilike('ipc_sections', f'%{filters["ipc_section"]}%')
-                
-                if filters.get('search_text'):
-                    query = query.ilike('incident_description', f'%{filters["search_text"]}%')
-            
+            response = self.supabase.table("fir_records")\
+                .update({
+                    'status': status,
+                    'investigation_notes': notes,
+                    'updated_at': datetime.now(timezone.utc).isoformat()
+                })\
+                .eq('fir_number', fir_number)\
+                .execute()
+        except Exception as e:
+            logger.error(f"💥 Status update error for {fir_number}: {str(e)}")
+            return {"success": False, "error": str(e)}
+        
+        if not response.data:
+            return {"success": True, "found": False}
+        activity = self.create_case_activity({**activity_data, 'fir_number': fir_number, 'new_value': status})
+        return {"success": True, "found": True, "activity_recorded": activity['success']}
+    
+    def search_fir_records(self, filters=None, columns=None):
+        """Search FIR records with various filters (columns: projection, None for all)"""
+        try:
+            query = apply_fir_filters(self.supabase.table("fir_records").select(select_list(columns)), filters)
             query = query.order('created_at', desc=True)
             response = query.execute()
             
@@ -100,13 +303,21 @@ class SupabaseFIRClient:
             logger.error(f"💥 FIR search error: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def get_fir_by_number(self, fir_number):
+    def iter_search_records(self, filters=None, page_size=KEYSET_PAGE_SIZE, columns=None):
+        """Stream search results (newest first) page by page with a keyset cursor"""
+        return keyset_scan(
+            lambda: apply_fir_filters(self.supabase.table("fir_records").select(select_list(columns)), filters),
+            [("created_at", True), ("id", True)],
+            page_size,
+        )
+    
+    def get_fir_by_number(self, fir_number, columns=None):
         """Get specific FIR by FIR number"""
         try:
             logger.info(f"🔍 Fetching FIR: {fir_number}")
             
             response = self.supabase.table("fir_records")\
-                .select("*")\
+                .select(select_list(columns))\
                 .eq("fir_number", fir_number)\
                 .execute()
             
@@ -121,18 +332,15 @@ class SupabaseFIRClient:
             logger.error(f"💥 Get FIR error for {fir_number}: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def get_monthly_report(self, year, month):
+    def get_monthly_report(self, year, month, columns=None):
         """Get monthly FIR report"""
         try:
-            start_date = f"{year}-{month:02d}-01"
-            next_month = month + 1 if month < 12 else 1
-            next_year = year if month < 12 else year + 1
-            end_date = f"{next_year}-{next_month:02d}-01"
+            start_date, end_date = month_bounds(year, month)
             
             logger.info(f"📊 Generating monthly report for {month}/{year}")
             
             response = self.supabase.table("fir_records")\
-                .select("*")\
+                .select(select_list(columns))\
                 .gte('incident_date', start_date)\
                 .lt('incident_date', end_date)\
                 .order('incident_date')\
@@ -145,28 +353,45 @@ class SupabaseFIRClient:
             logger.error(f"💥 Monthly report error for {month}/{year}: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    def iter_monthly_report(self, year, month, page_size=KEYSET_PAGE_SIZE, columns=None):
+        """Stream the monthly report (by incident date) page by page with a keyset cursor"""
+        start_date, end_date = month_bounds(year, month)
+        return keyset_scan(
+            lambda: self.supabase.table("fir_records")
+                .select(select_list(columns))
+                .gte('incident_date', start_date)
+                .lt('incident_date', end_date),
+            [("incident_date", False), ("id", False)],
+            page_size,
+        )
+    
+    def iter_firs_registered_in_month(self, year, month, page_size=KEYSET_PAGE_SIZE):
+        """Yield every FIR whose number was issued in the month (STATION/YYYY/MM/NNNN), page by page"""
+        return keyset_scan(
+            lambda: self.supabase.table("fir_records")
+                .select("*")
+                .like('fir_number', f'%/{year}/{month:02d}/%'),
+            [("fir_number", False)],
+            page_size,
+        )
+    
     def get_crime_statistics(self, start_date, end_date):
         """Get crime statistics for dashboard"""
         try:
             logger.info(f"📈 Getting crime statistics from {start_date} to {end_date}")
             
-            response = self.supabase.table("fir_records")\
-                .select("incident_type")\
-                .gte('incident_date', start_date)\
-                .lte('incident_date', end_date)\
-                .execute()
+            from scripts.rollups import rollup_counts, rollup_total
             
-            type_counts = {}
-            for record in response.data:
-                incident_type = record['incident_type']
-                type_counts[incident_type] = type_counts.get(incident_type, 0) + 1
+            counts = rollup_counts(self.supabase, start_date, end_date, ["total", "incident_type"])
+            type_counts = counts["incident_type"]
+            total_records = rollup_total(counts)
             
-            logger.info(f"✅ Crime statistics generated: {len(response.data)} total records")
+            logger.info(f"✅ Crime statistics generated: {total_records} total records")
             
             return {
                 "success": True,
                 "type_counts": type_counts,
-                "total_records": len(response.data),
+                "total_records": total_records,
                 "date_range": {"start": start_date, "end": end_date}
             }
             
@@ -174,6 +399,49 @@ class SupabaseFIRClient:
             logger.error(f"💥 Crime statistics error: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    def mark_pdf_failed(self, fir_number, error, activity_data=None):
+        """Clear pdf_path on a FIR whose PDF could not be rendered and log it on the case.
+
+        One transaction through the mark_fir_pdf_failed RPC; falls back to an
+        update followed by an activity insert when the RPC is not installed.
+        """
+        activity_data = {
+            'activity_type': 'pdf_failed',
+            'title': 'PDF Generation Failed',
+            'description': f'The FIR PDF could not be generated: {error}',
+            **(activity_data or {})
+        }
+        if self._write_rpcs:
+            try:
+                response = self.supabase.rpc("mark_fir_pdf_failed", {
+                    "p_fir_number": fir_number,
+                    "p_activity": activity_data
+                }).execute()
+                if response.data:
+                    logger.warning(f"⚠️ Recorded PDF failure for FIR: {fir_number}")
+                return {"success": True, "found": bool(response.data), "activity_recorded": bool(response.data)}
+            except Exception as e:
+                if not missing_rpc(e):
+                    logger.error(f"💥 Could not record PDF failure for {fir_number}: {str(e)}")
+                    return {"success": False, "error": str(e)}
+                self._write_rpcs = False
+                logger.warning("⚠️ Write RPCs not installed, using separate PDF update and activity insert")
+
+        try:
+            response = self.supabase.table("fir_records").update({
+                'pdf_path': None,
+                'updated_at': datetime.now(timezone.utc).isoformat()
+            }).eq('fir_number', fir_number).execute()
+        except Exception as e:
+            logger.error(f"💥 Could not record PDF failure for {fir_number}: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+        if not response.data:
+            return {"success": True, "found": False}
+        activity = self.create_case_activity({**activity_data, 'fir_number': fir_number})
+        logger.warning(f"⚠️ Recorded PDF failure for FIR: {fir_number}")
+        return {"success": True, "found": True, "activity_recorded": activity['success']}
+    
     def create_case_activity(self, activity_data):
         """Create a case activity record"""
         try:
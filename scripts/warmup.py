@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+import logging
+from functools import wraps
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+RETRY_AFTER = int(os.getenv("WARMUP_RETRY_AFTER", 5))
+
+COLD = "cold"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class Component:
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.state = COLD
+        self.error = None
+        self.seconds = None
+        self._lock = threading.Lock()
+
+    def status(self):
+        return {"state": self.state, "seconds": self.seconds, "error": self.error}
+
+
+class ServiceRegistry:
+    """Slow startup work (models, indexes) warmed in a background thread.
+
+    Components warm one at a time in registration order, so a loader may
+    rely on anything registered before it. Routes guarded with
+    ``requires()`` answer 503 + Retry-After until their components are ready
+    instead of blocking the request on a model load.
+    """
+
+    def __init__(self):
+        self._components = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, name, loader):
+        """Add a component; registering an existing name is a no-op."""
+        with self._lock:
+            if name not in self._components:
+                self._components[name] = Component(name, loader)
+
+    def warm(self, name):
+        """Run a component's loader in the calling thread (if it has not run yet)."""
+        component = self._components[name]
+        with component._lock:
+            if component.state != COLD:
+                return component.state == READY
+            component.state = WARMING
+            t0 = time.time()
+            try:
+                component.loader()
+                component.state = READY
+                logger.info(f"🔥 {name} warmed in {time.time() - t0:.2f}s")
+            except Exception as e:
+                component.state = FAILED
+                component.error = str(e)
+                logger.error(f"❌ {name} failed to warm: {e}")
+            component.seconds = round(time.time() - t0, 3)
+        return component.state == READY
+
+    def warm_all(self):
+        while True:
+            pending = [name for name, c in list(self._components.items()) if c.state == COLD]
+            if not pending:
+                return
+            for name in pending:
+                self.warm(name)
+
+    def start(self):
+        """Start background warmup; safe to call repeatedly."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not any(c.state == COLD for c in self._components.values()):
+                return
+            self._thread = threading.Thread(target=self.warm_all, name="warmup", daemon=True)
+            self._thread.start()
+
+    def state(self, name):
+        component = self._components.get(name)
+        return component.state if component else None
+
+    def cold(self, *names):
+        """Names among ``names`` that are registered but not yet loaded."""
+        return [name for name in names if self.state(name) in (COLD, WARMING)]
+
+    def settled(self):
+        """Every component has finished warming, successfully or not."""
+        return all(c.state in (READY, FAILED) for c in list(self._components.values()))
+
+    def ready(self):
+        return all(c.state == READY for c in list(self._components.values()))
+
+    def failed(self):
+        return {name: c.error for name, c in list(self._components.items()) if c.state == FAILED}
+
+    def status(self):
+        return {
+            "ready": self.ready(),
+            "failed": self.failed(),
+            "components": {name: c.status() for name, c in list(self._components.items())},
+        }
+
+    def requires(self, *names):
+        """Route decorator: fast 503 with Retry-After while any of ``names`` is still warming.
+
+        Failed components do not block the route; its own "not available"
+        handling applies as before.
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                cold = self.cold(*names)
+                if cold:
+                    from flask import jsonify
+
+                    self.start()
+                    response = jsonify({
+                        "success": False,
+                        "error": "Service is warming up, retry shortly",
+                        "warming": cold,
+                    })
+                    response.status_code = 503
+                    response.headers["Retry-After"] = str(RETRY_AFTER)
+                    return response
+                return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+# Process-wide registry shared by fir_api, chatbot_api and hf_app
+registry = ServiceRegistry()
+
+
+def warm_embedding_model():
+    from scripts.embedding_service import get_embedding_service
+
+    get_embedding_service().encode("warmup")
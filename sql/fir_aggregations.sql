@@ -0,0 +1,24 @@
+-- Grouped counts over fir_records (scripts/aggregations.py)
+-- Returns one row per bucket instead of every matching FIR.
+
+CREATE INDEX IF NOT EXISTS idx_fir_records_incident_date ON fir_records (incident_date);
+
+CREATE OR REPLACE FUNCTION fir_group_counts(p_column TEXT, p_start_date DATE DEFAULT NULL, p_end_date DATE DEFAULT NULL)
+RETURNS TABLE (key TEXT, count BIGINT)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    IF p_column NOT IN ('status', 'incident_type', 'incident_location', 'police_station', 'district') THEN
+        RAISE EXCEPTION 'cannot group fir_records by %', p_column;
+    END IF;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT %I::TEXT, COUNT(*) FROM fir_records
+         WHERE ($1 IS NULL OR incident_date >= $1)
+           AND ($2 IS NULL OR incident_date <= $2)
+         GROUP BY 1',
+        p_column
+    ) USING p_start_date, p_end_date;
+END;
+$$;
@@ -0,0 +1,107 @@
+-- Analytics rollups (scripts/rollups.py)
+-- One counter per (incident day, dimension, key), kept current by a trigger
+-- in the same transaction as the fir_records write, so dashboards read
+-- O(buckets) rows instead of O(cases).
+--
+-- dimensions: total, status, incident_type, incident_location,
+--             police_station, district, hour
+-- NULL or empty values are counted under the key ''.
+
+CREATE TABLE IF NOT EXISTS fir_rollups (
+    day DATE NOT NULL,
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, dimension, key)
+);
+
+CREATE OR REPLACE FUNCTION fir_rollup_buckets(r fir_records)
+RETURNS TABLE (day DATE, dimension TEXT, key TEXT)
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT COALESCE(r.incident_date::DATE, r.created_at::DATE), d.dimension, COALESCE(d.key, '')
+    FROM (VALUES
+        ('total', 'all'),
+        ('status', r.status::TEXT),
+        ('incident_type', r.incident_type::TEXT),
+        ('incident_location', r.incident_location::TEXT),
+        ('police_station', r.police_station::TEXT),
+        ('district', r.district::TEXT),
+        ('hour', NULLIF(split_part(r.incident_time::TEXT, ':', 1), ''))
+    ) AS d(dimension, key);
+$$;
+
+CREATE OR REPLACE FUNCTION fir_rollups_apply(r fir_records, delta INTEGER)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO fir_rollups AS f (day, dimension, key, count)
+    SELECT b.day, b.dimension, b.key, delta FROM fir_rollup_buckets(r) AS b
+    ON CONFLICT (day, dimension, key)
+    DO UPDATE SET count = f.count + EXCLUDED.count;
+$$;
+
+CREATE OR REPLACE FUNCTION fir_rollups_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND
+       (OLD.status, OLD.incident_type, OLD.incident_date, OLD.incident_time,
+        OLD.incident_location, OLD.police_station, OLD.district)
+       IS NOT DISTINCT FROM
+       (NEW.status, NEW.incident_type, NEW.incident_date, NEW.incident_time,
+        NEW.incident_location, NEW.police_station, NEW.district) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fir_rollups_apply(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fir_rollups_apply(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS fir_rollups_maintain ON fir_records;
+CREATE TRIGGER fir_rollups_maintain
+AFTER INSERT OR DELETE OR UPDATE OF status, incident_type, incident_date, incident_time,
+                                    incident_location, police_station, district
+ON fir_records
+FOR EACH ROW EXECUTE FUNCTION fir_rollups_trigger();
+
+-- Summed buckets for an incident_date range
+CREATE OR REPLACE FUNCTION fir_rollup_counts(p_start_date DATE DEFAULT NULL, p_end_date DATE DEFAULT NULL)
+RETURNS TABLE (dimension TEXT, key TEXT, count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT r.dimension, r.key, SUM(r.count)::BIGINT
+    FROM fir_rollups AS r
+    WHERE (p_start_date IS NULL OR r.day >= p_start_date)
+      AND (p_end_date IS NULL OR r.day <= p_end_date)
+    GROUP BY r.dimension, r.key
+    HAVING SUM(r.count) <> 0;
+$$;
+
+-- Backfill: rebuild every counter from fir_records (python -m scripts.rollups backfill)
+CREATE OR REPLACE FUNCTION rebuild_fir_rollups()
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n BIGINT;
+BEGIN
+    -- Block writers so no trigger update lands between the delete and the insert
+    LOCK TABLE fir_records IN SHARE MODE;
+    DELETE FROM fir_rollups;
+    INSERT INTO fir_rollups (day, dimension, key, count)
+    SELECT b.day, b.dimension, b.key, COUNT(*)
+    FROM fir_records AS r, LATERAL fir_rollup_buckets(r) AS b
+    GROUP BY b.day, b.dimension, b.key;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$;
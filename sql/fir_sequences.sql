@@ -0,0 +1,47 @@
+-- FIR number sequences (FIR_SEQUENCE_BACKEND=supabase)
+-- One counter per police station and month; the upsert row lock
+-- serializes concurrent allocations.
+
+CREATE TABLE IF NOT EXISTS fir_sequences (
+    station TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    last_value INTEGER NOT NULL,
+    PRIMARY KEY (station, year, month)
+);
+
+CREATE OR REPLACE FUNCTION next_fir_sequence(p_station TEXT, p_year INTEGER, p_month INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    INSERT INTO fir_sequences AS s (station, year, month, last_value)
+    VALUES (p_station, p_year, p_month, 1)
+    ON CONFLICT (station, year, month)
+    DO UPDATE SET last_value = s.last_value + 1
+    RETURNING last_value;
+$$;
+
+CREATE OR REPLACE FUNCTION release_fir_sequence(p_station TEXT, p_year INTEGER, p_month INTEGER, p_value INTEGER)
+RETURNS BOOLEAN
+LANGUAGE sql
+AS $$
+    WITH released AS (
+        UPDATE fir_sequences
+        SET last_value = last_value - 1
+        WHERE station = p_station AND year = p_year AND month = p_month AND last_value = p_value
+        RETURNING 1
+    )
+    SELECT EXISTS (SELECT 1 FROM released);
+$$;
+
+-- Seed counters from FIRs that already exist, so numbering continues after them
+INSERT INTO fir_sequences (station, year, month, last_value)
+SELECT split_part(fir_number, '/', 1),
+       split_part(fir_number, '/', 2)::INTEGER,
+       split_part(fir_number, '/', 3)::INTEGER,
+       MAX(split_part(fir_number, '/', 4)::INTEGER)
+FROM fir_records
+WHERE fir_number ~ '^[A-Z0-9]+/[0-9]{4}/[0-9]{2}/[0-9]+$'
+GROUP BY 1, 2, 3
+ON CONFLICT (station, year, month)
+DO UPDATE SET last_value = GREATEST(fir_sequences.last_value, EXCLUDED.last_value);
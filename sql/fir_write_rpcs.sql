@@ -0,0 +1,82 @@
+-- Transactional FIR writes (SupabaseFIRClient.register_fir / update_case_status /
+-- mark_pdf_failed)
+-- Each function writes fir_records and appends the case_activities row in
+-- one transaction, so the API makes a single round trip per write.
+
+CREATE OR REPLACE FUNCTION register_fir(p_record JSONB, p_activity JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    cols TEXT;
+    new_id BIGINT;
+BEGIN
+    -- Insert only the keys that were sent so column defaults still apply
+    SELECT string_agg(quote_ident(k), ', ') INTO cols
+    FROM jsonb_object_keys(p_record) AS k;
+
+    EXECUTE format(
+        'INSERT INTO fir_records (%s) SELECT %s FROM jsonb_populate_record(NULL::fir_records, $1) RETURNING id',
+        cols, cols
+    ) INTO new_id USING p_record;
+
+    INSERT INTO case_activities (fir_number, activity_type, title, description, officer_name, officer_badge)
+    SELECT p_record->>'fir_number', a.activity_type, a.title, a.description, a.officer_name, a.officer_badge
+    FROM jsonb_populate_record(NULL::case_activities, p_activity) AS a;
+
+    RETURN jsonb_build_object('id', new_id);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION update_fir_status(p_fir_number TEXT, p_status TEXT, p_notes TEXT, p_activity JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    fir_id BIGINT;
+    previous TEXT;
+BEGIN
+    SELECT id, status INTO fir_id, previous
+    FROM fir_records
+    WHERE fir_number = p_fir_number
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE fir_records
+    SET status = p_status, investigation_notes = p_notes, updated_at = now()
+    WHERE id = fir_id;
+
+    INSERT INTO case_activities (fir_number, activity_type, title, description, previous_value, new_value, officer_name, officer_badge)
+    SELECT p_fir_number, a.activity_type, a.title, a.description, previous, p_status, a.officer_name, a.officer_badge
+    FROM jsonb_populate_record(NULL::case_activities, p_activity) AS a;
+
+    RETURN jsonb_build_object('id', fir_id, 'previous_status', previous);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION mark_fir_pdf_failed(p_fir_number TEXT, p_activity JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    fir_id BIGINT;
+BEGIN
+    UPDATE fir_records
+    SET pdf_path = NULL, updated_at = now()
+    WHERE fir_number = p_fir_number
+    RETURNING id INTO fir_id;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO case_activities (fir_number, activity_type, title, description, officer_name, officer_badge)
+    SELECT p_fir_number, a.activity_type, a.title, a.description, a.officer_name, a.officer_badge
+    FROM jsonb_populate_record(NULL::case_activities, p_activity) AS a;
+
+    RETURN jsonb_build_object('id', fir_id);
+END;
+$$;